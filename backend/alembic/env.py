@@ -39,6 +39,14 @@ def run_migrations_offline() -> None:
 
 
 def run_migrations_online() -> None:
+    # A caller (e.g. tests) may pass its own connection in config.attributes
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -0,0 +1,32 @@
+"""Blind search index
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "search_tokens",
+        sa.Column("token", sa.String(16), primary_key=True),
+        sa.Column("entity_type", sa.String(20), primary_key=True),
+        sa.Column("entity_id", sa.String(36), primary_key=True),
+        sa.Column("patient_id", sa.String(36), nullable=False),
+    )
+    op.create_index("ix_search_tokens_entity", "search_tokens", ["entity_type", "entity_id"])
+    op.create_index("ix_search_tokens_patient_id", "search_tokens", ["patient_id"])
+    # Tokens are keyed with the app secret, so existing rows are indexed by
+    # `python manage.py rebuild-search-index --if-stale` (run by entrypoint.sh).
+
+
+def downgrade() -> None:
+    op.drop_table("search_tokens")
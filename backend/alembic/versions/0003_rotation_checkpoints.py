@@ -0,0 +1,30 @@
+"""Key rotation checkpoints
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "rotation_checkpoints",
+        sa.Column("table_name", sa.String(64), primary_key=True),
+        sa.Column("key_fingerprint", sa.String(16), nullable=False),
+        sa.Column("last_id", sa.String(36), nullable=True),
+        sa.Column("rows_rotated", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("done", sa.Boolean, nullable=False, server_default="false"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("rotation_checkpoints")
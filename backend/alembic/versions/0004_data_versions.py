@@ -0,0 +1,29 @@
+"""Per-table data versions
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+TABLES = ("patients", "appointments", "symptom_logs", "medications", "medication_doses")
+
+
+def upgrade() -> None:
+    data_versions = op.create_table(
+        "data_versions",
+        sa.Column("table_name", sa.String(64), primary_key=True),
+        sa.Column("version", sa.BigInteger, nullable=False, server_default="0"),
+    )
+    op.bulk_insert(data_versions, [{"table_name": t, "version": 0} for t in TABLES])
+
+
+def downgrade() -> None:
+    op.drop_table("data_versions")
@@ -0,0 +1,72 @@
+"""Composite and partial indexes for the crud query shapes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00.000000
+
+Lists filter by patient (or medication) and page newest-first on
+(timestamp, id); the calendar ranges over the timestamp. A B-tree on
+(patient_id, timestamp, id) serves both, scanned backwards for DESC, and
+(timestamp, id) serves the unfiltered lists and ranges. The single-column
+patient_id / medication_id indexes are prefixes of the new ones and are
+dropped.
+
+Active medications are `start_date <= :to AND (is_ongoing OR end_date >= :from)`:
+a partial index on the (few) ongoing rows and one on (end_date, start_date)
+let PostgreSQL answer the OR with a BitmapOr instead of a scan.
+
+Check the resulting plans with `python -m benchmarks.explain_plans`.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_appointments_patient_datetime", "appointments", ["patient_id", "datetime", "id"])
+    op.create_index("ix_appointments_datetime_id", "appointments", ["datetime", "id"])
+    op.drop_index("ix_appointments_patient_id", table_name="appointments")
+    op.drop_index("ix_appointments_datetime", table_name="appointments")
+
+    op.create_index("ix_symptom_logs_patient_logged_at", "symptom_logs", ["patient_id", "logged_at", "id"])
+    op.create_index("ix_symptom_logs_logged_at_id", "symptom_logs", ["logged_at", "id"])
+    op.drop_index("ix_symptom_logs_patient_id", table_name="symptom_logs")
+    op.drop_index("ix_symptom_logs_logged_at", table_name="symptom_logs")
+
+    op.create_index("ix_medications_patient_start_date", "medications", ["patient_id", "start_date", "id"])
+    op.create_index("ix_medications_start_date_id", "medications", ["start_date", "id"])
+    op.create_index(
+        "ix_medications_ongoing_start_date", "medications", ["start_date"],
+        postgresql_where=sa.text("is_ongoing"),
+    )
+    op.create_index("ix_medications_end_date_start_date", "medications", ["end_date", "start_date"])
+    op.drop_index("ix_medications_patient_id", table_name="medications")
+
+    op.create_index("ix_medication_doses_medication_taken_at", "medication_doses", ["medication_id", "taken_at", "id"])
+    op.drop_index("ix_medication_doses_medication_id", table_name="medication_doses")
+
+
+def downgrade() -> None:
+    op.create_index("ix_medication_doses_medication_id", "medication_doses", ["medication_id"])
+    op.drop_index("ix_medication_doses_medication_taken_at", table_name="medication_doses")
+
+    op.create_index("ix_medications_patient_id", "medications", ["patient_id"])
+    op.drop_index("ix_medications_end_date_start_date", table_name="medications")
+    op.drop_index("ix_medications_ongoing_start_date", table_name="medications")
+    op.drop_index("ix_medications_start_date_id", table_name="medications")
+    op.drop_index("ix_medications_patient_start_date", table_name="medications")
+
+    op.create_index("ix_symptom_logs_logged_at", "symptom_logs", ["logged_at"])
+    op.create_index("ix_symptom_logs_patient_id", "symptom_logs", ["patient_id"])
+    op.drop_index("ix_symptom_logs_logged_at_id", table_name="symptom_logs")
+    op.drop_index("ix_symptom_logs_patient_logged_at", table_name="symptom_logs")
+
+    op.create_index("ix_appointments_datetime", "appointments", ["datetime"])
+    op.create_index("ix_appointments_patient_id", "appointments", ["patient_id"])
+    op.drop_index("ix_appointments_datetime_id", table_name="appointments")
+    op.drop_index("ix_appointments_patient_datetime", table_name="appointments")
@@ -0,0 +1,43 @@
+"""Daily dose rollup for adherence
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00.000000
+
+medication_dose_days holds one row per (medication, UTC day) with the number
+and total quantity of doses logged, kept current by dose_rollup.add(). It is
+backfilled here from existing doses; `python manage.py rebuild-dose-rollup`
+does the same at any later time.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "medication_dose_days",
+        sa.Column(
+            "medication_id", sa.String(36), sa.ForeignKey("medications.id", ondelete="CASCADE"), primary_key=True,
+        ),
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("doses", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("quantity", sa.Float, nullable=False, server_default="0"),
+    )
+    op.execute(
+        """
+        INSERT INTO medication_dose_days (medication_id, day, doses, quantity)
+        SELECT medication_id, (taken_at AT TIME ZONE 'UTC')::date, count(*), sum(quantity)
+        FROM medication_doses
+        GROUP BY 1, 2
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("medication_dose_days")
@@ -0,0 +1,58 @@
+"""Per-day calendar summary for the month heat map
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00.000000
+
+calendar_day_summary holds one row per (patient, UTC day) with the number of
+appointments, symptom logs and ended medications that day and the highest
+symptom severity, kept current by calendar_summary.py. It is backfilled here
+from existing records; `python manage.py rebuild-calendar-summary` does the
+same at any later time.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "calendar_day_summary",
+        sa.Column("patient_id", sa.String(36), sa.ForeignKey("patients.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("appointments", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("symptoms", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("medications", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("max_severity", sa.Integer, nullable=False, server_default="0"),
+    )
+    op.create_index("ix_calendar_day_summary_day", "calendar_day_summary", ["day", "patient_id"])
+    op.execute(
+        """
+        INSERT INTO calendar_day_summary (patient_id, day, appointments, symptoms, medications, max_severity)
+        SELECT patient_id, day, sum(appointments), sum(symptoms), sum(medications), max(max_severity)
+        FROM (
+            SELECT patient_id, (datetime AT TIME ZONE 'UTC')::date AS day,
+                   1 AS appointments, 0 AS symptoms, 0 AS medications, 0 AS max_severity
+            FROM appointments
+            UNION ALL
+            SELECT patient_id, (logged_at AT TIME ZONE 'UTC')::date, 0, 1, 0, severity
+            FROM symptom_logs
+            UNION ALL
+            SELECT patient_id, d::date, 0, 0, 1, 0
+            FROM medications,
+                 generate_series(start_date::timestamp, end_date::timestamp, interval '1 day') AS d
+            WHERE NOT is_ongoing AND end_date IS NOT NULL
+        ) AS events
+        GROUP BY 1, 2
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_calendar_day_summary_day", table_name="calendar_day_summary")
+    op.drop_table("calendar_day_summary")
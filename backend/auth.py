@@ -1,5 +1,11 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -7,6 +13,7 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from config import get_settings
+import metrics
 import secrets_manager
 
 settings = get_settings()
@@ -25,6 +32,59 @@ def verify_password(plain: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
 
+# ── Password hashing pool ─────────────────────────────────────────────────────
+# bcrypt is deliberately slow. Running it on FastAPI's shared threadpool would
+# let a burst of logins take the threads that serve every other sync route, so
+# it gets its own bounded pool. Counted on the event loop, so no lock needed.
+
+_hash_executor = ThreadPoolExecutor(max_workers=settings.password_hash_workers, thread_name_prefix="bcrypt")
+_hash_pending = 0
+
+
+def hash_pending() -> int:
+    return _hash_pending
+
+
+def _timed(operation: str, fn):
+    histogram = metrics.PASSWORD_HASH_SECONDS.labels(operation)
+
+    def run(*args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+    return run
+
+
+_timed_verify = _timed("verify", verify_password)
+_timed_hash = _timed("hash", hash_password)
+
+
+async def _run_hashing(fn, *args):
+    global _hash_pending
+    if _hash_pending >= settings.password_hash_workers + settings.password_hash_queue:
+        metrics.PASSWORD_HASH_REJECTED.inc()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many sign-in attempts in progress, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    _hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _hash_pending -= 1
+
+
+async def verify_password_async(plain: str) -> bool:
+    return await _run_hashing(_timed_verify, plain)
+
+
+async def hash_password_async(plain: str) -> str:
+    return await _run_hashing(_timed_hash, plain)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (
@@ -38,6 +98,70 @@ def decode_token(token: str) -> dict:
     return jwt.decode(token, secrets_manager.get_jwt_key(), algorithms=[settings.jwt_algorithm])
 
 
+class _TokenCache:
+    """
+    Verified claims by SHA-256 of the token, held until the token's exp. The
+    whole cache is dropped when the JWT signing key changes, so a token is
+    never accepted on the strength of a key that is no longer in use.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: OrderedDict[bytes, Tuple[dict, float]] = OrderedDict()
+        self._signing_key: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _check_key(self) -> None:
+        key = secrets_manager.get_jwt_key()
+        if key != self._signing_key:
+            self._data.clear()
+            self._signing_key = key
+
+    def get(self, digest: bytes) -> Optional[dict]:
+        with self._lock:
+            self._check_key()
+            entry = self._data.get(digest)
+            if entry is None:
+                return None
+            payload, exp = entry
+            if exp <= time.time():
+                del self._data[digest]
+                return None
+            self._data.move_to_end(digest)
+            return payload
+
+    def put(self, digest: bytes, payload: dict) -> None:
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)):
+            return
+        with self._lock:
+            self._check_key()
+            self._data[digest] = (payload, float(exp))
+            self._data.move_to_end(digest)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_token_cache = _TokenCache(settings.token_cache_max_entries)
+
+
+def verify_token(token: str) -> dict:
+    """decode_token() plus the subject check, memoized per token until it expires."""
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = _token_cache.get(digest)
+    if payload is not None:
+        return payload
+    payload = decode_token(token)
+    if payload.get("sub") != "medvault":
+        raise ValueError("Invalid subject")
+    _token_cache.put(digest, payload)
+    return payload
+
+
 def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
 ):
@@ -48,10 +172,7 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     try:
-        payload = decode_token(credentials.credentials)
-        if payload.get("sub") != "medvault":
-            raise ValueError("Invalid subject")
-        return payload
+        return verify_token(credentials.credentials)
     except (JWTError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
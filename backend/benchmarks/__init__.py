@@ -0,0 +1,17 @@
+"""
+Micro- and macro-benchmarks. Run from the backend directory, e.g.:
+
+    python -m benchmarks.bench_decrypt
+    python -m benchmarks.suite --output results.json
+
+benchmarks.generator seeds a deterministic family history (into SQLite or
+PostgreSQL) for the suite and for benchmarks that need a populated database.
+
+Benchmarks use a throwaway secrets file unless SECRETS_FILE is set, so they
+never touch a real vault's keys.
+"""
+
+import os
+import tempfile
+
+os.environ.setdefault("SECRETS_FILE", os.path.join(tempfile.mkdtemp(prefix="medvault-bench-"), "secrets.json"))
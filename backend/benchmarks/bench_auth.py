@@ -0,0 +1,59 @@
+"""
+Cost of the auth dependency with and without the verified-token cache.
+
+    python -m benchmarks.bench_auth [--calls 20000] [--repeat 5]
+
+Prints one JSON object with the best-of-N time per get_current_user() call
+for a cold cache (full JWT verification every call) and a warm cache.
+"""
+
+import argparse
+import json
+import time
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+import benchmarks  # noqa: F401  (isolated secrets file)
+import auth
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=auth.create_access_token({"sub": "medvault"}))
+
+    def uncached():
+        for _ in range(args.calls):
+            auth._token_cache.clear()
+            auth.get_current_user(creds)
+
+    def cached():
+        for _ in range(args.calls):
+            auth.get_current_user(creds)
+
+    auth.get_current_user(creds)
+    uncached_s = _best(uncached, args.repeat)
+    auth.get_current_user(creds)
+    cached_s = _best(cached, args.repeat)
+    print(json.dumps({
+        "calls": args.calls,
+        "uncached_us_per_call": round(uncached_s / args.calls * 1e6, 2),
+        "cached_us_per_call": round(cached_s / args.calls * 1e6, 2),
+        "speedup": round(uncached_s / cached_s, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Calendar data path: four sequential ORM queries vs. one UNION ALL.
+
+    python -m benchmarks.bench_calendar [--database-url URL] [--patients 4]
+        [--years 5] [--repeat 5]
+
+Seeds a throwaway database with benchmarks.generator (a temporary SQLite
+file unless --database-url points at an empty PostgreSQL database), then
+times loading one month and one year of calendar data both ways, including
+decryption. The "legacy" path
+is what the calendar route did before crud.calendar existed. Prints one JSON
+object with best-of-N times and statement counts, and fails if the two paths
+disagree on which events exist.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+import benchmarks  # noqa: F401  (isolated secrets file)
+from benchmarks import generator
+from database import Base
+from models import Patient
+import crud.appointment as appt_crud
+import crud.calendar as calendar_crud
+import crud.medication as med_crud
+import crud.patient as patient_crud
+import crud.symptom_log as symptom_crud
+
+
+_FIELDS = {
+    "patient": ["id", "name", "color"],
+    "appointment": ["id", "patient_id", "datetime", "provider_name", "reason", "follow_up_required"],
+    "symptom": ["id", "patient_id", "logged_at", "severity", "description"],
+    "medication": ["id", "patient_id", "name", "dosage", "frequency_per_day", "start_date", "end_date", "is_ongoing"],
+}
+
+
+def _legacy(db: Session, from_dt: datetime, to_dt: datetime) -> set:
+    patients = {p.id: p for p in patient_crud.get_patients(db, fields=_FIELDS["patient"])}
+    ids = set()
+    for a in appt_crud.get_appointments(db, from_dt=from_dt, to_dt=to_dt, fields=_FIELDS["appointment"]):
+        if a.patient_id in patients:
+            ids.add(a.id)
+    for s in symptom_crud.get_symptom_logs(db, from_dt=from_dt, to_dt=to_dt, fields=_FIELDS["symptom"]):
+        if s.patient_id in patients:
+            ids.add(s.id)
+    for m in med_crud.get_active_medications_for_range(db, from_dt.date(), to_dt.date(), fields=_FIELDS["medication"]):
+        if m.patient_id in patients:
+            ids.add(m.id)
+    return ids
+
+
+def _union(db: Session, from_dt: datetime, to_dt: datetime) -> set:
+    return {row["id"] for row in calendar_crud.get_events(db, from_dt, to_dt)}
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--patients", type=int, default=4)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    url = args.database_url or "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="medvault-bench-"), "bench.db")
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    statements = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(*_):
+        nonlocal statements
+        statements += 1
+
+    with Session(engine) as db:
+        if not db.query(Patient).first():
+            generator.seed(db, args.patients, args.years)
+
+    # The decrypt cache would hide decryption cost after the first run
+    import encryption
+    encryption.settings.decrypt_cache_enabled = False
+
+    windows = {
+        "month": (datetime(2022, 3, 1, tzinfo=timezone.utc), datetime(2022, 3, 31, 23, 59, tzinfo=timezone.utc)),
+        "year": (datetime(2022, 1, 1, tzinfo=timezone.utc), datetime(2022, 12, 31, 23, 59, tzinfo=timezone.utc)),
+    }
+    results = {"database": engine.dialect.name, "windows": {}}
+    for name, (from_dt, to_dt) in windows.items():
+        out = {}
+        expected = None
+        for label, fn in (("legacy", _legacy), ("union_all", _union)):
+            with Session(engine) as db:
+                before = statements
+                ids = fn(db, from_dt, to_dt)
+                out[f"{label}_statements"] = statements - before
+            if expected is None:
+                expected = ids
+            elif ids != expected:
+                print(f"{name}: union_all returned different events than legacy", file=sys.stderr)
+                sys.exit(1)
+
+            def run():
+                with Session(engine) as db:
+                    fn(db, from_dt, to_dt)
+            out[f"{label}_s"] = round(_best(run, args.repeat), 4)
+        out["events"] = len(expected)
+        out["speedup"] = round(out["legacy_s"] / out["union_all_s"], 2)
+        results["windows"][name] = out
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Serial vs. batched/parallel decryption of a large result set.
+
+    python -m benchmarks.bench_decrypt [--rows 5000] [--workers 2,4,8] [--repeat 5]
+
+Prints one JSON object with the best-of-N timing for the serial path and for
+encryption.decrypt_many() at each worker count, and fails if any output
+differs from the serial path. The decryption cache is disabled, so every
+run measures real decryption.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import benchmarks  # noqa: F401  (isolated secrets file)
+import encryption
+
+
+def _ciphertexts(rows: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    words = "pain fever headache knee follow-up referral dose nausea rash clinic".split()
+    # Two encrypted columns per row, short descriptions and longer notes
+    values = []
+    for _ in range(rows):
+        values.append(encryption.encrypt(" ".join(rng.choices(words, k=rng.randint(2, 8)))))
+        values.append(encryption.encrypt(" ".join(rng.choices(words, k=rng.randint(20, 120)))))
+    return values
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--workers", default="2,4,8")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    # The decrypt cache would turn every run after the warm-up into cache hits
+    encryption.settings.decrypt_cache_enabled = False
+
+    values = _ciphertexts(args.rows)
+    expected = [encryption.decrypt(v) for v in values]
+    serial = _best(lambda: [encryption.decrypt(v) for v in values], args.repeat)
+
+    results = {"values": len(values), "cpus": os.cpu_count(), "serial_s": round(serial, 4), "parallel": []}
+    settings = encryption.settings
+    for workers in (int(w) for w in args.workers.split(",")):
+        settings.decrypt_workers = workers
+        encryption._executor = None
+        if encryption.decrypt_many(values) != expected:
+            print(f"decrypt_many output differs from serial path with {workers} workers", file=sys.stderr)
+            sys.exit(1)
+        elapsed = _best(lambda: encryption.decrypt_many(values), args.repeat)
+        results["parallel"].append({
+            "workers": workers,
+            "seconds": round(elapsed, 4),
+            "speedup": round(serial / elapsed, 2),
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Response encoding: Pydantic models + response_model + stdlib json vs. the
+orjson path in responses.py.
+
+    python -m benchmarks.bench_json [--events 5000] [--rows 2000] [--repeat 5]
+
+"calendar" compares what the calendar route used to do (build CalendarEvent
+models, let FastAPI re-validate them against response_model, dump and
+json-encode) with building plain dicts and encoding them once with orjson.
+"list" compares the default response class change alone for a list endpoint
+(validation is unchanged there, only the final encoder differs). Prints one
+JSON object with best-of-N timings; fails if the decoded outputs differ.
+"""
+
+import argparse
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import List
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from responses import FastJSONResponse, blank
+from schemas.appointment import AppointmentResponse
+from schemas.calendar import CalendarEvent, CalendarResponse
+
+
+def _event_dicts(count: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    template = blank(CalendarEvent)
+    events = []
+    for i in range(count):
+        kind = rng.choice(("appointment", "symptom", "medication"))
+        events.append(dict(
+            template,
+            id=str(uuid.uuid4()),
+            type=kind,
+            patient_id=str(uuid.uuid4()),
+            patient_name=f"Patient {i % 4}",
+            patient_color="#4A6FA5",
+            datetime=start + timedelta(hours=rng.randrange(24 * 365)),
+            title="Dr Example" if kind == "appointment" else "Ibuprofen 200mg",
+            detail="routine follow-up for recurring knee pain",
+            follow_up_required=False if kind == "appointment" else None,
+            severity=rng.randint(1, 5) if kind == "symptom" else None,
+            is_ongoing=False if kind == "medication" else None,
+        ))
+    return events
+
+
+def _rows(count: int) -> list:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        SimpleNamespace(
+            id=str(uuid.uuid4()), patient_id=str(uuid.uuid4()), datetime=start + timedelta(hours=i),
+            provider_name="Dr Example", location="Clinic", reason="knee pain",
+            follow_up_required=False, notes="bring previous scans",
+        )
+        for i in range(count)
+    ]
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    events = _event_dicts(args.events)
+    calendar_model = TypeAdapter(CalendarResponse)
+
+    def calendar_legacy() -> bytes:
+        resp = CalendarResponse(events=[CalendarEvent(**e) for e in events])
+        # FastAPI: dump the returned model, validate against response_model, serialize
+        validated = calendar_model.validate_python(resp.model_dump())
+        return JSONResponse(calendar_model.dump_python(validated, mode="json")).body
+
+    def calendar_fast() -> bytes:
+        return FastJSONResponse({"events": events}).body
+
+    list_model = TypeAdapter(List[AppointmentResponse])
+    rows = _rows(args.rows)
+
+    def list_with(response_class):
+        def run() -> bytes:
+            return response_class(list_model.dump_python(list_model.validate_python(rows, from_attributes=True), mode="json")).body
+        return run
+
+    if json.loads(calendar_legacy()) != json.loads(calendar_fast()):
+        raise SystemExit("calendar outputs differ")
+    if json.loads(list_with(JSONResponse)()) != json.loads(list_with(FastJSONResponse)()):
+        raise SystemExit("list outputs differ")
+
+    results = {}
+    for name, legacy, fast, size in (
+        ("calendar", calendar_legacy, calendar_fast, args.events),
+        ("list", list_with(JSONResponse), list_with(FastJSONResponse), args.rows),
+    ):
+        legacy_s = _best(legacy, args.repeat)
+        fast_s = _best(fast, args.repeat)
+        results[name] = {
+            "items": size,
+            "legacy_s": round(legacy_s, 4),
+            "fast_s": round(fast_s, 4),
+            "speedup": round(legacy_s / fast_s, 2),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
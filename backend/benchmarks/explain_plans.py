@@ -0,0 +1,170 @@
+"""
+Query plan check: EXPLAIN every hot crud query and fail on sequential scans.
+
+    python -m benchmarks.explain_plans --database-url postgresql://... [--patients 100]
+        [--years 10] [--min-rows 2000]
+
+Needs a PostgreSQL database at the latest migration (alembic upgrade head);
+an empty one is seeded with benchmarks.generator first, then ANALYZEd. Each
+case calls the real crud function, captures the statements it sends, and
+runs EXPLAIN (FORMAT JSON) on them with the same parameters. A case fails
+if any plan node is a Seq Scan on a table holding at least --min-rows rows —
+small tables are cheaper to scan and the planner is right to do so.
+
+Prints one JSON object (per case: statements, scanned relations, index
+names used, failures) and exits 1 if any case failed. The test suite runs
+the same check() on a smaller generated history when DATABASE_URL points at
+PostgreSQL (tests/test_query_plans.py).
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, event, func, select, text
+from sqlalchemy.orm import Session
+
+import benchmarks  # noqa: F401  (isolated secrets file)
+from benchmarks import generator
+from models import Patient, MedicationDose
+from pagination import PageParams
+import crud.appointment as appt_crud
+import crud.calendar as calendar_crud
+import crud.medication as med_crud
+import crud.symptom_log as symptom_crud
+import crud.symptom_trends as trends_crud
+
+
+def _page(limit: int = 50, cursor: str = None) -> PageParams:
+    return PageParams(limit=limit, cursor=cursor, count=False)
+
+
+def _cases(db: Session):
+    patient_id = db.scalar(select(Patient.id).order_by(Patient.id).limit(1))
+    medication_id = db.scalar(
+        select(MedicationDose.medication_id)
+        .group_by(MedicationDose.medication_id)
+        .order_by(func.count().desc(), MedicationDose.medication_id)
+        .limit(1)
+    )
+    year = generator.END_DATE.year - 1
+    from_dt = datetime(year, 3, 1, tzinfo=timezone.utc)
+    to_dt = datetime(year, 3, 31, 23, 59, 59, tzinfo=timezone.utc)
+
+    def second_page(fn, *args):
+        first = fn(db, *args, _page())
+        return fn(db, *args, _page(cursor=first.next_cursor))
+
+    return {
+        "appointments_by_patient": lambda: appt_crud.get_appointments(db, patient_id=patient_id),
+        "appointments_by_patient_month": lambda: appt_crud.get_appointments(db, patient_id=patient_id, from_dt=from_dt, to_dt=to_dt),
+        "appointments_month": lambda: appt_crud.get_appointments(db, from_dt=from_dt, to_dt=to_dt),
+        "appointments_page": lambda: second_page(appt_crud.get_appointments_page),
+        "symptoms_by_patient": lambda: symptom_crud.get_symptom_logs(db, patient_id=patient_id),
+        "symptoms_by_patient_month": lambda: symptom_crud.get_symptom_logs(db, patient_id=patient_id, from_dt=from_dt, to_dt=to_dt),
+        "symptoms_month": lambda: symptom_crud.get_symptom_logs(db, from_dt=from_dt, to_dt=to_dt),
+        "symptoms_page": lambda: second_page(symptom_crud.get_symptom_logs_page),
+        "symptom_trends_by_patient": lambda: trends_crud.get_symptom_trends(db, "week", patient_id=patient_id),
+        "medications_by_patient": lambda: med_crud.get_medications(db, patient_id=patient_id),
+        "medications_page": lambda: second_page(med_crud.get_medications_page),
+        "medications_active_month": lambda: med_crud.get_active_medications_for_range(db, from_dt.date(), to_dt.date()),
+        "medications_active_month_by_patient": lambda: med_crud.get_active_medications_for_range(
+            db, from_dt.date(), to_dt.date(), patient_id=patient_id,
+        ),
+        "doses_by_medication": lambda: med_crud.get_doses(db, medication_id),
+        "doses_page": lambda: second_page(med_crud.get_doses_page, medication_id),
+        "calendar_month": lambda: calendar_crud.get_events(db, from_dt, to_dt),
+        "calendar_month_by_patient": lambda: calendar_crud.get_events(db, from_dt, to_dt, patient_id=patient_id),
+        "calendar_summary_month": lambda: calendar_crud.get_day_summary(db, from_dt.date(), to_dt.date()),
+        "calendar_summary_month_by_patient": lambda: calendar_crud.get_day_summary(
+            db, from_dt.date(), to_dt.date(), patient_id=patient_id,
+        ),
+    }
+
+
+def _walk(node: dict):
+    yield node
+    for child in node.get("Plans", ()):
+        yield from _walk(child)
+
+
+def table_sizes(db: Session) -> dict:
+    """Planner row estimates of every table (current after ANALYZE)."""
+    return dict(db.execute(text(
+        "SELECT relname, reltuples::bigint FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+    )).all())
+
+
+def check(engine, min_rows: int = 2000) -> dict:
+    """
+    EXPLAIN every case on an ANALYZEd database. Returns per case the
+    statement count, scanned relations, index names used and failures.
+    """
+    with Session(engine) as db:
+        sizes = table_sizes(db)
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not statement.startswith("EXPLAIN"):
+            captured.append((statement, parameters))
+
+    results = {}
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        with Session(engine) as db:
+            for name, fn in _cases(db).items():
+                captured.clear()
+                fn()
+                statements = list(captured)
+                scanned, indexes, failures = set(), set(), []
+                for statement, parameters in statements:
+                    plan = db.connection().exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+                    for node in _walk(plan[0]["Plan"]):
+                        relation = node.get("Relation Name")
+                        if relation:
+                            scanned.add(relation)
+                        if node.get("Index Name"):
+                            indexes.add(node["Index Name"])
+                        if node["Node Type"] == "Seq Scan" and sizes.get(relation, 0) >= min_rows:
+                            failures.append(f"Seq Scan on {relation} ({sizes[relation]} rows)")
+                results[name] = {
+                    "statements": len(statements),
+                    "relations": sorted(scanned),
+                    "indexes": sorted(indexes),
+                    "failures": failures,
+                }
+                db.rollback()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return {"table_rows": sizes, "cases": results}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--patients", type=int, default=100)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--min-rows", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.database_url)
+    if engine.dialect.name != "postgresql":
+        parser.error("plans are only meaningful on PostgreSQL")
+
+    with Session(engine) as db:
+        if not db.query(Patient).first():
+            generator.seed(db, args.patients, args.years)
+        db.execute(text("ANALYZE"))
+        db.commit()
+
+    report = check(engine, args.min_rows)
+    print(json.dumps(report, indent=2))
+    failed = [name for name, r in report["cases"].items() if r["failures"]]
+    if failed:
+        print("Sequential scans on large tables: " + ", ".join(failed), file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Deterministic synthetic family history.
+
+    python -m benchmarks.generator --database-url URL [--patients 4] [--years 5] [--seed 1]
+
+Generates N patients with Y years of appointments, symptom logs, medications
+and doses ending at END_DATE. The same arguments always produce the same
+rows (ids included), so benchmark numbers are comparable across commits.
+Text fields are drawn from a small medical vocabulary with realistic lengths:
+short descriptions, notes from a few words to a few paragraphs, many left
+empty.
+
+Rows are written with multi-row INSERTs in batches, with their blind-index
+tokens, calendar summary, dose rollup and data versions, exactly as
+/api/import would leave them. Tables are created if missing; an empty
+PostgreSQL database or a SQLite file both work.
+"""
+
+import argparse
+import random
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterator, List, Tuple
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+import benchmarks  # noqa: F401  (isolated secrets file)
+from database import Base
+from models import Patient, Appointment, SymptomLog, Medication, MedicationDose
+import calendar_summary
+import data_versions
+import dose_rollup
+import search_index
+
+END_DATE = date(2026, 1, 1)
+BATCH_SIZE = 1000
+
+_FIRST_NAMES = ["Alice", "Ben", "Chloe", "David", "Emma", "Felix", "Grace", "Hugo", "Iris", "Jonas"]
+_COLORS = ["#4A6FA5", "#C0392B", "#27AE60", "#8E44AD", "#D35400", "#16A085", "#2C3E50", "#F39C12"]
+_PROVIDERS = ["Dr Martin", "Dr Peeters", "Dr Janssens", "Dr Claes", "Dr Wouters", "Dr Maes", "Dr Jacobs"]
+_LOCATIONS = ["General practice", "City hospital", "Pediatric clinic", "Dental office", "Physiotherapy center"]
+_REASONS = [
+    "annual check-up", "follow-up for knee pain", "vaccination", "persistent cough", "blood test results",
+    "allergy consultation", "dental cleaning", "ear infection", "back pain", "skin rash", "eye exam",
+]
+_SYMPTOMS = [
+    "headache", "fever", "sore throat", "stomach ache", "knee pain", "runny nose", "fatigue", "nausea",
+    "dizziness", "rash on arms", "back pain", "earache", "cough at night",
+]
+_MEDICATIONS = [
+    ("Ibuprofen", "200mg"), ("Paracetamol", "500mg"), ("Amoxicillin", "250mg"), ("Cetirizine", "10mg"),
+    ("Omeprazole", "20mg"), ("Vitamin D", "1000IU"), ("Salbutamol", "100mcg"), ("Loratadine", "10mg"),
+]
+_WORDS = (
+    "patient reports improvement after rest, recommended to continue treatment and monitor symptoms; "
+    "follow-up appointment scheduled if no change within two weeks. mild swelling noted, no fever, "
+    "prescribed medication with food twice daily, referral to specialist discussed, bring previous "
+    "scans and vaccination booklet to next visit, hydration and sleep advised"
+).split()
+
+
+class Generator:
+    def __init__(self, patients: int = 4, years: int = 5, seed: int = 1):
+        self.patients = patients
+        self.years = years
+        self.rng = random.Random(seed)
+        self.start = END_DATE - timedelta(days=365 * years)
+
+    def _id(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def _text(self, low: int, high: int) -> str:
+        return " ".join(self.rng.choices(_WORDS, k=self.rng.randint(low, high)))
+
+    def _notes(self):
+        roll = self.rng.random()
+        if roll < 0.5:
+            return None
+        if roll < 0.85:
+            return self._text(4, 25)
+        return self._text(60, 250)
+
+    def _moment(self, day: date, first_hour: int = 0, last_hour: int = 23) -> datetime:
+        t = time(self.rng.randint(first_hour, last_hour), self.rng.choice((0, 15, 30, 45)))
+        return datetime.combine(day, t, tzinfo=timezone.utc)
+
+    def _day(self) -> date:
+        return self.start + timedelta(days=self.rng.randrange((END_DATE - self.start).days))
+
+    def records(self) -> Iterator[Tuple[str, dict]]:
+        """Yield (entity type, row) with parents before their children."""
+        for i in range(self.patients):
+            patient_id = self._id()
+            yield "patient", {
+                "id": patient_id,
+                "name": f"{_FIRST_NAMES[i % len(_FIRST_NAMES)]} {i // len(_FIRST_NAMES) + 1}",
+                "date_of_birth": date(1950 + self.rng.randrange(70), self.rng.randint(1, 12), self.rng.randint(1, 28)),
+                "color": _COLORS[i % len(_COLORS)],
+                "notes": self._notes(),
+            }
+            for _ in range(self.years * self.rng.randint(8, 20)):
+                yield "appointment", {
+                    "id": self._id(),
+                    "patient_id": patient_id,
+                    "datetime": self._moment(self._day(), 8, 17),
+                    "provider_name": self.rng.choice(_PROVIDERS),
+                    "location": self.rng.choice(_LOCATIONS),
+                    "reason": self.rng.choice(_REASONS),
+                    "follow_up_required": self.rng.random() < 0.2,
+                    "notes": self._notes(),
+                }
+            for _ in range(self.years * self.rng.randint(40, 120)):
+                logged_at = self._moment(self._day())
+                resolved = self.rng.random() < 0.6
+                yield "symptom", {
+                    "id": self._id(),
+                    "patient_id": patient_id,
+                    "logged_at": logged_at,
+                    "severity": self.rng.randint(1, 5),
+                    "description": self.rng.choice(_SYMPTOMS),
+                    "resolved_at": logged_at + timedelta(hours=self.rng.randint(2, 24 * 14)) if resolved else None,
+                    "notes": self._notes(),
+                }
+            yield from self._medications(patient_id)
+
+    def _medications(self, patient_id: str) -> Iterator[Tuple[str, dict]]:
+        for _ in range(self.years * self.rng.randint(2, 6)):
+            name, dosage = self.rng.choice(_MEDICATIONS)
+            start = self._day()
+            ongoing = self.rng.random() < 0.1
+            end = None if ongoing else min(start + timedelta(days=self.rng.randint(3, 90)), END_DATE)
+            per_day = self.rng.choice((1, 1, 2, 3))
+            med_id = self._id()
+            yield "medication", {
+                "id": med_id,
+                "patient_id": patient_id,
+                "name": name,
+                "dosage": dosage,
+                "frequency_per_day": per_day,
+                "start_date": start,
+                "end_date": end,
+                "is_ongoing": ongoing,
+                "schedule_notes": self.rng.choice((None, "with food", "before bed", "morning and evening")),
+                "notes": self._notes(),
+            }
+            day, last = start, end or END_DATE
+            while day < last:
+                for slot in range(per_day):
+                    if self.rng.random() < 0.85:  # adherence
+                        hour = 8 + slot * (12 // per_day)
+                        yield "dose", {
+                            "id": self._id(),
+                            "medication_id": med_id,
+                            "taken_at": datetime.combine(day, time(hour, self.rng.randrange(60)), tzinfo=timezone.utc),
+                            "quantity": 1.0,
+                            "notes": None if self.rng.random() < 0.95 else self._text(2, 8),
+                        }
+                day += timedelta(days=1)
+
+
+_MODELS = {
+    "patient": Patient,
+    "appointment": Appointment,
+    "symptom": SymptomLog,
+    "medication": Medication,
+    "dose": MedicationDose,
+}
+
+
+def seed(db: Session, patients: int = 4, years: int = 5, seed: int = 1) -> Dict[str, int]:
+    """Write the generated history through db. Returns row counts per entity type."""
+    Base.metadata.create_all(db.get_bind())
+    counts = {entity: 0 for entity in _MODELS}
+    batches: Dict[str, List[dict]] = {entity: [] for entity in _MODELS}
+
+    def flush(entity: str) -> None:
+        rows = batches[entity]
+        if not rows:
+            return
+        db.execute(insert(_MODELS[entity]), rows)
+        if entity in search_index.SEARCH_FIELDS:
+            search_index.index_new_rows(db, entity, rows)
+        if entity in calendar_summary.ENTITIES:
+            calendar_summary.add(db, entity, rows)
+        if entity == "dose":
+            dose_rollup.add(db, rows)
+        counts[entity] += len(rows)
+        batches[entity] = []
+
+    # Flush in dependency order so foreign keys always resolve
+    for entity, row in Generator(patients, years, seed).records():
+        batches[entity].append(row)
+        if len(batches[entity]) >= BATCH_SIZE:
+            for e in _MODELS:
+                flush(e)
+    for e in _MODELS:
+        flush(e)
+    data_versions.bump(db, *data_versions.TABLES)
+    db.commit()
+    return counts
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--patients", type=int, default=4)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.database_url)
+    with Session(engine) as db:
+        counts = seed(db, args.patients, args.years, args.seed)
+    print(", ".join(f"{n} {entity}s" for entity, n in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
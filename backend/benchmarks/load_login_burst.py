@@ -0,0 +1,101 @@
+"""
+CRUD latency during a burst of login attempts, against a running instance.
+
+    python -m benchmarks.load_login_burst --url http://localhost:8000 --password ... \
+        [--requests 200] [--concurrency 8] [--logins 200] [--login-concurrency 32]
+
+Measures GET /api/patients latency on its own, then again while a burst of
+(wrong-password) logins is in flight. Prints one JSON object with p50/p95/max
+for both phases and how the login attempts were answered (401 = checked,
+429 = rejected by the full bcrypt queue). With the isolated bcrypt pool the
+two CRUD phases should be close.
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _request(url: str, method: str = "GET", body: dict | None = None, token: str | None = None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    if token:
+        req.add_header("Authorization", f"Bearer {token}")
+    try:
+        with urllib.request.urlopen(req, timeout=60) as res:
+            return res.status, res.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def _crud_latencies(base: str, token: str, count: int, concurrency: int) -> list:
+    def one(_):
+        start = time.perf_counter()
+        status, _ = _request(f"{base}/api/patients", token=token)
+        if status != 200:
+            raise RuntimeError(f"GET /api/patients returned {status}")
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        return list(pool.map(one, range(count)))
+
+
+def _summary(latencies: list) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--login-concurrency", type=int, default=32)
+    args = parser.parse_args(argv)
+    base = args.url.rstrip("/")
+
+    status, body = _request(f"{base}/api/auth/login", "POST", {"password": args.password})
+    if status != 200:
+        raise SystemExit(f"login failed with {status}: {body!r}")
+    token = json.loads(body)["access_token"]
+
+    baseline = _crud_latencies(base, token, args.requests, args.concurrency)
+
+    outcomes = Counter()
+    lock = threading.Lock()
+
+    def attempt(_):
+        status, _ = _request(f"{base}/api/auth/login", "POST", {"password": "wrong-password"})
+        with lock:
+            outcomes[status] += 1
+
+    burst = ThreadPoolExecutor(args.login_concurrency)
+    futures = [burst.submit(attempt, i) for i in range(args.logins)]
+    time.sleep(0.2)  # let the burst build up
+    during = _crud_latencies(base, token, args.requests, args.concurrency)
+    for f in futures:
+        f.result()
+    burst.shutdown()
+
+    print(json.dumps({
+        "baseline": _summary(baseline),
+        "during_login_burst": _summary(during),
+        "login_responses": {str(k): v for k, v in sorted(outcomes.items())},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
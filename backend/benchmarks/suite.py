@@ -0,0 +1,283 @@
+"""
+End-to-end benchmark suite over a generated family history.
+
+    python -m benchmarks.suite [--database-url URL] [--patients 4] [--years 5]
+        [--rounds 20] [--only calendar] [--output results.json]
+        [--compare baseline.json]
+
+Seeds a database with benchmarks.generator (a temporary SQLite file unless
+--database-url points at a PostgreSQL database; an already seeded one is
+reused as is), points the app's sessions at it and drives the real ASGI app
+in-process, middleware included, for:
+
+- calendar: GET /api/calendar for a week, a month and a year (compact, as
+  the calendar view asks for it)
+- search: a short (3-letter) and a long (phrase) query
+- list: the patient, appointment, symptom and medication list endpoints
+- encryption: EncryptedString bind + result round-trips, short and long
+- auth: POST /api/auth/login (one bcrypt verification per round)
+
+Every case runs once as a warm-up (which must succeed), then --rounds
+timed rounds. The decryption cache is disabled unless --decrypt-cache is
+given, so repeated rounds measure the same work as the first.
+
+Output is one JSON document shaped like pytest-benchmark's (a "machine_info"/
+"commit_info" header and per-case "stats" in seconds), written to --output
+or stdout. With --compare, a table of median ratios against an earlier
+result file is printed to stderr, so two commits can be compared with:
+
+    git checkout A && python -m benchmarks.suite --output a.json
+    git checkout B && python -m benchmarks.suite --compare a.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+
+import benchmarks  # noqa: F401  (isolated secrets file)
+from benchmarks import generator
+import database
+from models import Patient
+
+PASSWORD = "benchmark-password"
+
+_GROUPS = ("calendar", "search", "list", "encryption", "auth")
+
+
+def _async_url(url: str) -> str:
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith(("postgresql:", "postgresql+psycopg2:")):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    return url
+
+
+class _Client:
+    """Just enough of an HTTP client to call the ASGI app without a network or httpx."""
+
+    def __init__(self, app, token: Optional[str] = None):
+        self.app = app
+        self.token = token
+
+    async def request(self, method: str, path: str, params: Optional[dict] = None,
+                      body: Optional[dict] = None) -> Tuple[int, bytes]:
+        headers = [(b"host", b"bench"), (b"accept-encoding", b"identity")]
+        if self.token:
+            headers.append((b"authorization", f"Bearer {self.token}".encode()))
+        payload = b""
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers += [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())]
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+            "query_string": urlencode(params or {}).encode(), "root_path": "",
+            "headers": headers, "client": ("127.0.0.1", 0), "server": ("bench", 80),
+        }
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": payload, "more_body": False}
+            return {"type": "http.disconnect"}
+
+        status = 0
+        chunks: List[bytes] = []
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return status, b"".join(chunks)
+
+
+def _stats(times: List[float]) -> dict:
+    return {
+        "min": min(times),
+        "max": max(times),
+        "mean": statistics.fmean(times),
+        "median": statistics.median(times),
+        "stddev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "rounds": len(times),
+    }
+
+
+async def _measure(fn: Callable[[], Awaitable[Tuple[int, int]]], rounds: int) -> Tuple[dict, dict]:
+    status, size = await fn()
+    if status != 200:
+        raise RuntimeError(f"warm-up returned HTTP {status}")
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await fn()
+        times.append(time.perf_counter() - start)
+    return _stats(times), {"status": status, "bytes": size}
+
+
+def _cases(client: _Client, login_client: _Client):
+    def get(path, **params):
+        async def call():
+            status, body = await client.request("GET", path, params)
+            return status, len(body)
+        return call
+
+    def calendar(start: str, end: str):
+        return get("/api/calendar", **{"from": start, "to": end, "compact": "true"})
+
+    def round_trip(text: str):
+        from encryption import EncryptedString
+        column = EncryptedString()
+
+        async def call():
+            column.process_result_value(column.process_bind_param(text, None), None)
+            return 200, len(text)
+        return call
+
+    async def login():
+        status, body = await login_client.request("POST", "/api/auth/login", body={"password": PASSWORD})
+        return status, len(body)
+
+    year = generator.END_DATE.year - 1
+    return [
+        ("calendar", "calendar_week", calendar(f"{year}-03-02T00:00:00Z", f"{year}-03-08T23:59:59Z")),
+        ("calendar", "calendar_month", calendar(f"{year}-03-01T00:00:00Z", f"{year}-03-31T23:59:59Z")),
+        ("calendar", "calendar_year", calendar(f"{year}-01-01T00:00:00Z", f"{year}-12-31T23:59:59Z")),
+        ("search", "search_short", get("/api/search", q="kne")),
+        ("search", "search_long", get("/api/search", q="follow-up for knee pain")),
+        ("list", "list_patients", get("/api/patients")),
+        ("list", "list_appointments", get("/api/appointments")),
+        ("list", "list_symptoms", get("/api/symptoms")),
+        ("list", "list_medications", get("/api/medications")),
+        ("encryption", "encrypted_string_short", round_trip("knee pain after running")),
+        ("encryption", "encrypted_string_long", round_trip("Follow-up after knee surgery, mild swelling, no fever. " * 30)),
+        ("auth", "login", login),
+    ]
+
+
+def _commit_info() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(
+                ["git", *args], capture_output=True, text=True, check=True,
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return {
+        "id": git("rev-parse", "HEAD"),
+        "branch": git("rev-parse", "--abbrev-ref", "HEAD"),
+        "dirty": bool(git("status", "--porcelain")),
+    }
+
+
+def _compare(current: dict, baseline_path: str) -> None:
+    with open(baseline_path) as f:
+        baseline = {b["name"]: b["stats"]["median"] for b in json.load(f)["benchmarks"]}
+    print(f"{'case':<26}{'baseline ms':>12}{'current ms':>12}{'ratio':>8}", file=sys.stderr)
+    for bench in current["benchmarks"]:
+        before = baseline.get(bench["name"])
+        now = bench["stats"]["median"]
+        ratio = f"{now / before:.2f}" if before else "-"
+        before_ms = f"{before * 1000:.2f}" if before else "-"
+        print(f"{bench['name']:<26}{before_ms:>12}{now * 1000:>12.2f}{ratio:>8}", file=sys.stderr)
+
+
+async def _run(args, url: str) -> dict:
+    # Import the app only once sessions point at the benchmark database
+    import auth
+    import secrets_manager
+    from main import app
+
+    if not secrets_manager.is_configured():
+        secrets_manager.save_password_hash(auth.hash_password(PASSWORD))
+    client = _Client(app, auth.create_access_token({"sub": "medvault"}))
+    login_client = _Client(app)
+
+    results = []
+    for group, name, fn in _cases(client, login_client):
+        if args.only and group not in args.only:
+            continue
+        rounds = min(args.rounds, 5) if group == "auth" else args.rounds
+        stats, extra = await _measure(fn, rounds)
+        results.append({"group": group, "name": name, "stats": stats, "extra_info": extra})
+    return {
+        "machine_info": {
+            "python_version": platform.python_version(),
+            "python_implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "cpu_count": os.cpu_count(),
+        },
+        "commit_info": _commit_info(),
+        "datetime": datetime.now(timezone.utc).isoformat(),
+        "params": {
+            "database": url.split(":", 1)[0],
+            "patients": args.patients,
+            "years": args.years,
+            "seed": args.seed,
+            "rounds": args.rounds,
+            "decrypt_cache": args.decrypt_cache,
+        },
+        "benchmarks": results,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--patients", type=int, default=4)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--only", action="append", choices=_GROUPS)
+    parser.add_argument("--decrypt-cache", action="store_true")
+    parser.add_argument("--output")
+    parser.add_argument("--compare")
+    args = parser.parse_args(argv)
+
+    url = args.database_url or "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="medvault-bench-"), "bench.db")
+    engine = create_engine(url)
+    with Session(engine) as db:
+        database.Base.metadata.create_all(engine)
+        if not db.query(Patient).first():
+            counts = generator.seed(db, args.patients, args.years, args.seed)
+            print("seeded " + ", ".join(f"{n} {entity}s" for entity, n in counts.items()), file=sys.stderr)
+    database.SessionLocal.configure(bind=engine)
+    database.AsyncSessionLocal.configure(bind=create_async_engine(_async_url(url)))
+
+    import encryption
+    encryption.settings.decrypt_cache_enabled = args.decrypt_cache
+
+    results = asyncio.run(_run(args, url))
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        _compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
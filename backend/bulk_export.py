@@ -0,0 +1,122 @@
+"""
+Streaming full-vault export.
+
+Rows are read through server-side cursors (yield_per) one partition at a
+time, decrypted as each partition arrives and written out immediately, so
+memory use does not grow with the size of the vault. Encrypted columns are
+selected as raw ciphertext and decrypted with encryption.decrypt_many,
+bypassing the plaintext cache so an export does not evict the hot entries.
+
+NDJSON (default): every record is one line with a "type" key, in the order
+patient, appointment, symptom, medication, dose, so parents always precede
+their children. The field set is that of the import schemas, which makes the
+output a valid /api/import body as-is.
+
+CSV: one entity per export (?type=), with a header row. Missing values are
+empty cells.
+
+On PostgreSQL the whole export runs in one REPEATABLE READ transaction, so it
+is a consistent snapshot even while the app keeps writing.
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Iterator, List, Optional
+
+from sqlalchemy import String, select, type_coerce
+
+from bulk_import import ENTITIES
+from config import get_settings
+from database import SessionLocal
+from encryption import EncryptedString, decrypt_many
+
+settings = get_settings()
+
+
+def _columns(entity: str):
+    """(column names, select expressions) for an entity, encrypted ones as raw ciphertext."""
+    spec = ENTITIES[entity]
+    table = spec.model.__table__
+    names = ["id"] + [name for name in spec.schema.model_fields if name in table.c and name != "id"]
+    exprs = [
+        type_coerce(table.c[name], String).label(name) if isinstance(table.c[name].type, EncryptedString)
+        else table.c[name]
+        for name in names
+    ]
+    return names, exprs
+
+
+def _rows(db, entity: str) -> Iterator[List[dict]]:
+    """Yield decrypted rows of one entity, a partition at a time."""
+    names, exprs = _columns(entity)
+    table = ENTITIES[entity].model.__table__
+    encrypted = [n for n in names if isinstance(table.c[n].type, EncryptedString)]
+    result = db.execute(
+        select(*exprs),
+        execution_options={"yield_per": settings.export_batch_size},
+    )
+    for partition in result.mappings().partitions():
+        rows = [dict(r) for r in partition]
+        slots = [(row, n) for row in rows for n in encrypted if row[n] is not None]
+        plain = decrypt_many([row[n] for row, n in slots], use_cache=False)
+        for (row, n), value in zip(slots, plain):
+            row[n] = value
+        yield rows
+
+
+def _session():
+    db = SessionLocal()
+    if db.get_bind().dialect.name == "postgresql":
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    return db
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def ndjson(entities: Optional[List[str]] = None) -> Iterator[bytes]:
+    """Generate the export as NDJSON. Run by StreamingResponse in a worker thread."""
+    db = _session()
+    try:
+        for entity in entities or list(ENTITIES):
+            for rows in _rows(db, entity):
+                yield "".join(
+                    json.dumps({"type": entity, **row}, default=_json_default) + "\n" for row in rows
+                ).encode()
+    finally:
+        db.close()
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def csv_rows(entity: str) -> Iterator[bytes]:
+    """Generate one entity as CSV with a header row."""
+    names, _ = _columns(entity)
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(names)
+    db = _session()
+    try:
+        for rows in _rows(db, entity):
+            for row in rows:
+                writer.writerow([_cell(row[n]) for n in names])
+            yield buf.getvalue().encode()
+            buf.seek(0)
+            buf.truncate()
+        if buf.tell():
+            yield buf.getvalue().encode()
+    finally:
+        db.close()
@@ -0,0 +1,240 @@
+"""
+Streaming bulk import of NDJSON or CSV.
+
+The request body is read chunk by chunk and never held in memory as a whole.
+Each record is validated against the import schemas (the create schemas plus
+an optional id) and buffered; once a batch is full, or the record type
+changes, the batch is written in its own transaction from a worker thread:
+one multi-row INSERT for the records (encryption happens in the same pass)
+and one for their blind-index tokens.
+
+NDJSON: one JSON object per line, with a "type" key (patient, appointment,
+symptom, medication, dose) unless ?type= is given for the whole body. This is
+the format written by /api/export.
+
+CSV: a header row of field names, then one record per row; ?type= is
+required. Empty cells are treated as missing.
+
+Rows that fail validation, duplicate an existing id, or reference a missing
+patient/medication are skipped and reported by line number; the rest of the
+import continues. Parents must appear before their children (earlier in the
+file, or already in the database).
+"""
+
+import codecs
+import csv
+import json
+import uuid
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from starlette.concurrency import run_in_threadpool
+
+from config import get_settings
+from database import SessionLocal
+from models import Patient, Appointment, SymptomLog, Medication, MedicationDose
+from schemas.imports import (
+    PatientImport, AppointmentImport, SymptomLogImport, MedicationImport, MedicationDoseImport,
+    ImportReport, ImportRowError,
+)
+import search_index
+import data_versions
+import dose_rollup
+import calendar_summary
+
+settings = get_settings()
+
+MAX_REPORTED_ERRORS = 1000
+
+
+@dataclass(frozen=True)
+class _Entity:
+    model: type
+    schema: type[BaseModel]
+    parent_field: Optional[str] = None
+    parent_model: Optional[type] = None
+    indexed: bool = False  # has blind-index search fields
+
+
+ENTITIES: Dict[str, _Entity] = {
+    "patient": _Entity(Patient, PatientImport),
+    "appointment": _Entity(Appointment, AppointmentImport, "patient_id", Patient, indexed=True),
+    "symptom": _Entity(SymptomLog, SymptomLogImport, "patient_id", Patient, indexed=True),
+    "medication": _Entity(Medication, MedicationImport, "patient_id", Patient, indexed=True),
+    "dose": _Entity(MedicationDose, MedicationDoseImport, "medication_id", Medication),
+}
+
+
+@dataclass
+class _Report:
+    imported: Dict[str, int] = field(default_factory=lambda: {k: 0 for k in ENTITIES})
+    errors: List[ImportRowError] = field(default_factory=list)
+    error_count: int = 0
+
+    def error(self, line: int, message: str, entity: Optional[str] = None) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(ImportRowError(line=line, type=entity, error=message))
+
+    def result(self) -> ImportReport:
+        return ImportReport(imported=self.imported, error_count=self.error_count, errors=self.errors)
+
+
+# ── Reading ───────────────────────────────────────────────────────────────────
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buf = ""
+    first = True
+    async for chunk in chunks:
+        buf += decoder.decode(chunk)
+        if first and buf:
+            buf = buf.lstrip("\ufeff")
+            first = False
+        *lines, buf = buf.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+        if len(buf) > settings.import_max_line_bytes:
+            raise HTTPException(status_code=413, detail="Import line too long")
+    buf += decoder.decode(b"", final=True)
+    if buf:
+        yield buf.rstrip("\r")
+
+
+async def _records(chunks: AsyncIterator[bytes], is_csv: bool) -> AsyncIterator[Tuple[int, str]]:
+    """Yield (first line number, record text). CSV records may span lines inside quotes."""
+    line_no = 0
+    pending: List[str] = []
+    start = 0
+    async for line in _lines(chunks):
+        line_no += 1
+        if not is_csv:
+            yield line_no, line
+            continue
+        if not pending:
+            start = line_no
+        pending.append(line)
+        text = "\n".join(pending)
+        if text.count('"') % 2 == 0:
+            pending = []
+            yield start, text
+    if pending:
+        yield start, "\n".join(pending)
+
+
+# ── Writing ───────────────────────────────────────────────────────────────────
+
+def _write_batch(entity: str, rows: List[Tuple[int, BaseModel]]) -> Tuple[int, List[Tuple[int, str]]]:
+    """Insert one batch in its own transaction. Returns (inserted, [(line, error)])."""
+    spec = ENTITIES[entity]
+    errors: List[Tuple[int, str]] = []
+    records: List[Tuple[int, dict]] = []
+    seen = set()
+    for line, row in rows:
+        data = row.model_dump()
+        data["id"] = data.get("id") or str(uuid.uuid4())
+        if data["id"] in seen:
+            errors.append((line, f"Duplicate id {data['id']} in import"))
+            continue
+        seen.add(data["id"])
+        records.append((line, data))
+
+    db = SessionLocal()
+    try:
+        existing = set(db.scalars(select(spec.model.id).where(spec.model.id.in_(seen))))
+        parents = set()
+        if spec.parent_field:
+            wanted = {d[spec.parent_field] for _, d in records}
+            parents = set(db.scalars(select(spec.parent_model.id).where(spec.parent_model.id.in_(wanted))))
+
+        valid = []
+        for line, data in records:
+            if data["id"] in existing:
+                errors.append((line, f"Record {data['id']} already exists"))
+            elif spec.parent_field and data[spec.parent_field] not in parents:
+                errors.append((line, f"Unknown {spec.parent_field} {data[spec.parent_field]}"))
+            else:
+                valid.append(data)
+
+        if valid:
+            db.execute(insert(spec.model), valid)
+            if spec.indexed:
+                search_index.index_new_rows(db, entity, valid)
+            if spec.model is MedicationDose:
+                dose_rollup.add(db, valid)
+            if entity in calendar_summary.ENTITIES:
+                calendar_summary.add(db, entity, valid)
+            data_versions.bump(db, spec.model.__tablename__)
+            db.commit()
+        return len(valid), errors
+    except Exception as e:
+        db.rollback()
+        return 0, errors + [(line, f"Batch failed: {e.__class__.__name__}") for line, _ in records]
+    finally:
+        db.close()
+
+
+async def _flush(entity: Optional[str], rows: list, report: _Report) -> None:
+    if not rows:
+        return
+    inserted, errors = await run_in_threadpool(_write_batch, entity, rows)
+    report.imported[entity] += inserted
+    for line, message in errors:
+        report.error(line, message, entity)
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in e.errors())
+
+
+async def run(chunks: AsyncIterator[bytes], is_csv: bool, default_type: Optional[str]) -> ImportReport:
+    report = _Report()
+    header: Optional[List[str]] = None
+    batch_entity: Optional[str] = None
+    batch: list = []
+
+    async for line, text in _records(chunks, is_csv):
+        if is_csv:
+            values = next(csv.reader([text]), [])
+            if header is None:
+                header = [h.strip() for h in values]
+                continue
+            if not any(values):
+                continue
+            if len(values) != len(header):
+                report.error(line, f"Expected {len(header)} columns, got {len(values)}", default_type)
+                continue
+            raw = {k: v for k, v in zip(header, values) if v != ""}
+            entity = default_type
+        else:
+            if not text.strip():
+                continue
+            try:
+                raw = json.loads(text)
+            except ValueError:
+                report.error(line, "Invalid JSON")
+                continue
+            if not isinstance(raw, dict):
+                report.error(line, "Expected a JSON object")
+                continue
+            entity = raw.pop("type", None) or default_type
+
+        if entity not in ENTITIES:
+            report.error(line, f"Unknown record type {entity!r}")
+            continue
+        try:
+            row = ENTITIES[entity].schema.model_validate(raw)
+        except ValidationError as e:
+            report.error(line, _validation_message(e), entity)
+            continue
+
+        if entity != batch_entity or len(batch) >= settings.import_batch_size:
+            await _flush(batch_entity, batch, report)
+            batch_entity, batch = entity, []
+        batch.append((line, row))
+
+    await _flush(batch_entity, batch, report)
+    return report.result()
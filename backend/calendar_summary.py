@@ -0,0 +1,198 @@
+"""
+Per-day calendar summary (calendar_day_summary), for the calendar month view.
+
+One row per (patient, UTC day) with the number of appointments, symptom
+logs and active medications that day and the highest symptom severity. The
+month view reads it with one range scan instead of loading and decrypting
+every event of the month.
+
+Write paths keep it current in the same transaction as the write:
+
+- inserts (crud creates, bulk import, the benchmark generator) call add(),
+  which increments the affected rows with an upsert;
+- updates and deletes call refresh() with the span() of the record before
+  and after the change, which recounts those days from the source tables —
+  a maximum cannot be decremented — and overwrites their rows, deleting
+  those of days left with no events.
+
+Medications are counted on every day of their span, but only once they
+have an end date: ongoing medications would need rows for every future day,
+so readers count those from the medications table. A medication that is
+neither ongoing nor has an end date is on no day at all, as everywhere else
+(crud.medication.active_between).
+Patients cascade their rows away on delete.
+
+To rebuild it from the source tables (e.g. after restoring a backup taken
+before the summary existed):
+
+    docker-compose exec app python manage.py rebuild-calendar-summary
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from dose_rollup import day_of
+from models import Appointment, SymptomLog, Medication, CalendarDaySummary
+
+ENTITIES = ("appointment", "symptom", "medication")
+
+_table = CalendarDaySummary.__table__
+
+# (patient_id, day) -> [appointments, symptoms, medications, max_severity]
+_Totals = Dict[Tuple[str, date], List[int]]
+Span = Tuple[str, date, date]  # patient_id, first day, last day
+
+
+def _totals() -> _Totals:
+    return defaultdict(lambda: [0, 0, 0, 0])
+
+
+def _count_appointment(totals: _Totals, patient_id: str, at: datetime) -> None:
+    totals[(patient_id, day_of(at))][0] += 1
+
+
+def _count_symptom(totals: _Totals, patient_id: str, at: datetime, severity: int) -> None:
+    entry = totals[(patient_id, day_of(at))]
+    entry[1] += 1
+    entry[3] = max(entry[3], severity)
+
+
+def _count_medication(totals: _Totals, patient_id: str, first: date, last: date) -> None:
+    day = first
+    while day <= last:
+        totals[(patient_id, day)][2] += 1
+        day += timedelta(days=1)
+
+
+def _rows(totals: _Totals) -> List[dict]:
+    return [
+        {
+            "patient_id": patient_id,
+            "day": day,
+            "appointments": appointments,
+            "symptoms": symptoms,
+            "medications": medications,
+            "max_severity": max_severity,
+        }
+        for (patient_id, day), (appointments, symptoms, medications, max_severity) in totals.items()
+    ]
+
+
+def _upsert(db: Session, totals: _Totals, replace: bool = False) -> None:
+    """Add totals to existing rows, or overwrite them with replace (recounted totals)."""
+    is_postgresql = db.get_bind().dialect.name == "postgresql"
+    stmt = (postgresql if is_postgresql else sqlite).insert(_table)
+    greatest = func.greatest if is_postgresql else func.max  # SQLite's max() is scalar with 2 args
+    new = stmt.excluded
+    if replace:
+        set_ = {c: new[c] for c in ("appointments", "symptoms", "medications", "max_severity")}
+    else:
+        set_ = {
+            "appointments": _table.c.appointments + new.appointments,
+            "symptoms": _table.c.symptoms + new.symptoms,
+            "medications": _table.c.medications + new.medications,
+            "max_severity": greatest(_table.c.max_severity, new.max_severity),
+        }
+    stmt = stmt.on_conflict_do_update(index_elements=[_table.c.patient_id, _table.c.day], set_=set_)
+    db.execute(stmt, _rows(totals))
+
+
+def _is_bounded(start: date, end: Optional[date], is_ongoing: bool) -> bool:
+    return not is_ongoing and end is not None and end >= start
+
+
+def add(db: Session, entity: str, rows: Iterable[dict]) -> None:
+    """Count new records of an ENTITIES type (dicts of their columns) into the summary. Call before commit."""
+    totals = _totals()
+    for row in rows:
+        if entity == "appointment":
+            _count_appointment(totals, row["patient_id"], row["datetime"])
+        elif entity == "symptom":
+            _count_symptom(totals, row["patient_id"], row["logged_at"], row["severity"])
+        elif _is_bounded(row["start_date"], row.get("end_date"), row.get("is_ongoing", False)):
+            _count_medication(totals, row["patient_id"], row["start_date"], row["end_date"])
+    if totals:
+        _upsert(db, totals)
+
+
+def span(entity: str, record) -> Optional[Span]:
+    """The summary days an ORM record of an ENTITIES type counts on, or None."""
+    if entity == "appointment":
+        day = day_of(record.datetime)
+    elif entity == "symptom":
+        day = day_of(record.logged_at)
+    elif _is_bounded(record.start_date, record.end_date, record.is_ongoing):
+        return record.patient_id, record.start_date, record.end_date
+    else:
+        return None
+    return record.patient_id, day, day
+
+
+def _recount(db: Session, patient_id: str, first: date, last: date) -> _Totals:
+    totals = _totals()
+    start = datetime.combine(first, time.min, tzinfo=timezone.utc)
+    end = datetime.combine(last + timedelta(days=1), time.min, tzinfo=timezone.utc)
+    for (at,) in db.execute(
+        select(Appointment.datetime)
+        .where(Appointment.patient_id == patient_id, Appointment.datetime >= start, Appointment.datetime < end)
+    ):
+        _count_appointment(totals, patient_id, at)
+    for at, severity in db.execute(
+        select(SymptomLog.logged_at, SymptomLog.severity)
+        .where(SymptomLog.patient_id == patient_id, SymptomLog.logged_at >= start, SymptomLog.logged_at < end)
+    ):
+        _count_symptom(totals, patient_id, at, severity)
+    for med_start, med_end in db.execute(
+        select(Medication.start_date, Medication.end_date).where(
+            Medication.patient_id == patient_id,
+            Medication.is_ongoing == False,
+            Medication.start_date <= last,
+            Medication.end_date >= first,
+        )
+    ):
+        _count_medication(totals, patient_id, max(med_start, first), min(med_end, last))
+    return totals
+
+
+def refresh(db: Session, *spans: Optional[Span]) -> None:
+    """Recount the summary on the days of each span from the source tables. Call after the change, before commit."""
+    db.flush()
+    for patient_id, first, last in {s for s in spans if s}:
+        totals = _recount(db, patient_id, first, last)
+        # Upsert rather than delete + insert: a concurrent write to the same
+        # day could insert the row in between and fail on the primary key
+        if totals:
+            _upsert(db, totals, replace=True)
+        db.execute(delete(_table).where(
+            _table.c.patient_id == patient_id, _table.c.day >= first, _table.c.day <= last,
+            _table.c.day.notin_([day for _, day in totals]),
+        ))
+
+
+def rebuild(db: Session, batch_size: int = 5000) -> int:
+    """Recompute the whole summary from the source tables in one transaction. Returns the row count."""
+    totals = _totals()
+    for patient_id, at in db.execute(
+        select(Appointment.patient_id, Appointment.datetime).execution_options(yield_per=batch_size)
+    ):
+        _count_appointment(totals, patient_id, at)
+    for patient_id, at, severity in db.execute(
+        select(SymptomLog.patient_id, SymptomLog.logged_at, SymptomLog.severity)
+        .execution_options(yield_per=batch_size)
+    ):
+        _count_symptom(totals, patient_id, at, severity)
+    for patient_id, start, end in db.execute(
+        select(Medication.patient_id, Medication.start_date, Medication.end_date)
+        .where(Medication.is_ongoing == False, Medication.end_date != None, Medication.end_date >= Medication.start_date)
+    ):
+        _count_medication(totals, patient_id, start, end)
+    db.execute(delete(_table))
+    if totals:
+        db.execute(insert(_table), _rows(totals))
+    db.commit()
+    return len(totals)
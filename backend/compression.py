@@ -0,0 +1,150 @@
+"""
+Content-negotiated compression.
+
+CompressionMiddleware compresses /api/ responses of at least
+settings.compress_min_size bytes with brotli or gzip, whichever the client
+prefers (brotli on a tie). Small responses, responses that already carry a
+Content-Encoding, and non-text content types pass through untouched.
+Streaming responses (the export) are compressed incrementally.
+
+Dynamic responses use fast settings (brotli quality 4, gzip level 6); static
+files are compressed once, at maximum quality, by static_assets.py.
+"""
+
+import gzip
+import zlib
+from typing import Optional
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import get_settings
+
+settings = get_settings()
+
+ENCODINGS = ("br", "gzip")  # server preference on ties
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/manifest+json",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def negotiate(accept_encoding: Optional[str], available=ENCODINGS) -> Optional[str]:
+    """Best encoding in available for an Accept-Encoding header, or None for identity."""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, static: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=11 if static else 4)
+    return gzip.compress(body, compresslevel=9 if static else 6, mtime=0)
+
+
+class _Stream:
+    """Incremental compressor with the same output format as compress()."""
+
+    def __init__(self, encoding: str):
+        self._br = encoding == "br"
+        self._c = brotli.Compressor(quality=4) if self._br else zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def process(self, data: bytes) -> bytes:
+        return self._c.process(data) if self._br else self._c.compress(data)
+
+    def finish(self) -> bytes:
+        return self._c.finish() if self._br else self._c.flush()
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        stream: Optional[_Stream] = None
+
+        async def wrapped_send(message: Message) -> None:
+            nonlocal start, stream
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            more = message.get("more_body", False)
+
+            if stream is None:
+                eligible = (
+                    "content-encoding" not in headers
+                    and is_compressible(headers.get("content-type", ""))
+                    and start["status"] not in (204, 304)
+                )
+                if eligible:
+                    headers.add_vary_header("Accept-Encoding")
+                length = headers.get("content-length")
+                small = int(length) < settings.compress_min_size if length else (
+                    not more and len(body) < settings.compress_min_size
+                )
+                if not eligible or small:
+                    await send(start)
+                    start = None
+                    await send(message)
+                    return
+                headers["Content-Encoding"] = encoding
+                if not more:
+                    payload = compress(body, encoding)
+                    headers["Content-Length"] = str(len(payload))
+                    await send(start)
+                    start = None
+                    await send({"type": "http.response.body", "body": payload})
+                    return
+                # Streaming: length unknown up front
+                del headers["Content-Length"]
+                stream = _Stream(encoding)
+                await send(start)
+
+            chunk = stream.process(body)
+            if not more:
+                chunk += stream.finish()
+            if chunk or not more:
+                await send({"type": "http.response.body", "body": chunk, "more_body": more})
+
+        await self.app(scope, receive, wrapped_send)
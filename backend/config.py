@@ -17,6 +17,52 @@ class Settings(BaseSettings):
     jwt_algorithm: str = "HS256"
     jwt_expire_days: int = 7
 
+    # Bulk decryption of list results (encryption.load_all). 0 workers = serial.
+    decrypt_workers: int = 0
+    decrypt_chunk_size: int = 256
+    decrypt_parallel_min: int = 512  # below this many values, threads cost more than they save
+
+    # In-process LRU of decrypted values, keyed by ciphertext (encryption._PlaintextCache)
+    decrypt_cache_enabled: bool = True
+    decrypt_cache_max_entries: int = 20000
+    decrypt_cache_max_bytes: int = 16 * 1024 * 1024
+
+    # Bulk import: rows validated and inserted per transaction
+    import_batch_size: int = 500
+    import_max_line_bytes: int = 1024 * 1024
+    # Bulk export: rows fetched per server-side cursor round trip
+    export_batch_size: int = 1000
+
+    # API responses at least this large are gzip/brotli compressed (compression.py)
+    compress_min_size: int = 1024
+
+    # How often the in-memory frontend files are checked for changes on disk (static_assets.py)
+    static_check_seconds: float = 2.0
+
+    # bcrypt runs on its own small pool; requests beyond workers + queue get 429
+    password_hash_workers: int = 2
+    password_hash_queue: int = 8
+
+    # Verified JWT claims kept per process so repeat requests skip signature checks
+    token_cache_max_entries: int = 1024
+
+    # How often each process checks secrets.json for keys added by `manage.py rotate-key`
+    key_reload_seconds: float = 5.0
+    # ...and at most this often when a value fails to decrypt (encryption._decrypt)
+    key_forced_reload_seconds: float = 1.0
+    # Key rotation: rows re-encrypted per transaction, and pause between batches
+    rotation_batch_size: int = 200
+    rotation_pause_seconds: float = 0.05
+
+    # Debug mode adds per-request SQL statistics headers (query_profiler.py)
+    debug: bool = False
+    # Statements slower than this are logged with their route
+    slow_query_ms: float = 200.0
+
+    # Also serve /metrics without auth on this port (0 = only the token-protected /metrics route)
+    metrics_port: int = 0
+    metrics_host: str = "0.0.0.0"
+
     @property
     def database_url(self) -> str:
         return (
@@ -24,6 +70,13 @@ class Settings(BaseSettings):
             f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
         )
 
+    @property
+    def async_database_url(self) -> str:
+        return (
+            f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}"
+            f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
+        )
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -0,0 +1,119 @@
+from typing import List
+from datetime import date
+from sqlalchemy.orm import Session
+from sqlalchemy import Date, DateTime, and_, case, cast, func, literal, literal_column, select, true
+from crud.medication import active_between
+from models.medication import Medication
+from models.medication_dose_day import MedicationDoseDay
+
+
+def _active_days(from_date: date, to_date: date):
+    """
+    LATERAL generate_series of the days each medication is active within
+    [from_date, to_date], clamped the way the calendar clamps medication spans.
+    """
+    first = func.greatest(Medication.start_date, from_date)
+    last = case(
+        (Medication.is_ongoing, literal(to_date, Date)),
+        else_=func.least(Medication.end_date, to_date),
+    )
+    series = func.generate_series(cast(first, DateTime), cast(last, DateTime), literal_column("interval '1 day'"))
+    # AS d(day): a bare alias would name the function's single column "d"
+    return series.table_valued("day").render_derived(name="d").lateral("d")
+
+
+def _daily(from_date: date, to_date: date, *criteria):
+    """
+    One row per active (medication, day) in range: expected = frequency_per_day,
+    taken = doses counted in the rollup. Days come from SQL, so days with no
+    dose at all are present with taken = 0. Medications are active on the
+    same days as in the calendar (crud.medication.active_between).
+    """
+    d = _active_days(from_date, to_date)
+    day = cast(d.c.day, Date)
+    taken = func.coalesce(MedicationDoseDay.doses, 0)
+    return (
+        select(
+            day.label("day"),
+            Medication.id.label("medication_id"),
+            Medication.frequency_per_day.label("expected"),
+            taken.label("taken"),
+            func.least(taken, Medication.frequency_per_day).label("on_schedule"),
+        )
+        .select_from(Medication)
+        .join(d, true())
+        .outerjoin(
+            MedicationDoseDay,
+            and_(MedicationDoseDay.medication_id == Medication.id, MedicationDoseDay.day == day),
+        )
+        .where(active_between(from_date, to_date), *criteria)
+        .subquery()
+    )
+
+
+def _totals(daily):
+    return (
+        func.sum(daily.c.expected).label("expected"),
+        func.sum(daily.c.taken).label("taken"),
+        func.sum(daily.c.on_schedule).label("on_schedule"),
+        func.sum(case((daily.c.on_schedule < daily.c.expected, 1), else_=0)).label("missed_days"),
+    )
+
+
+def _summary(expected: int, taken: int, on_schedule: int, missed_days: int) -> dict:
+    # Extra doses on one day do not make up for a missed one on another
+    return {
+        "expected": expected,
+        "taken": taken,
+        "missed": expected - on_schedule,
+        "missed_days": missed_days,
+        "rate": round(on_schedule / expected, 4) if expected else None,
+    }
+
+
+def _days(db: Session, daily) -> List[dict]:
+    rows = db.execute(
+        select(daily.c.day, *_totals(daily)).group_by(daily.c.day).order_by(daily.c.day)
+    ).all()
+    return [
+        {"day": r.day, "expected": r.expected, "taken": r.taken, "missed": r.expected - r.on_schedule}
+        for r in rows
+    ]
+
+
+def _overall(days: List[dict]) -> dict:
+    expected = sum(d["expected"] for d in days)
+    missed = sum(d["missed"] for d in days)
+    return _summary(expected, sum(d["taken"] for d in days), expected - missed, sum(1 for d in days if d["missed"]))
+
+
+def get_medication_adherence(db: Session, medication_id: str, from_date: date, to_date: date) -> dict:
+    """Expected vs. taken doses per day for one medication."""
+    days = _days(db, _daily(from_date, to_date, Medication.id == medication_id))
+    return {**_overall(days), "days": days}
+
+
+def get_patient_adherence(db: Session, patient_id: str, from_date: date, to_date: date) -> dict:
+    """
+    Expected vs. taken doses per day summed over a patient's medications,
+    plus per-medication totals for the same range.
+    """
+    daily = _daily(from_date, to_date, Medication.patient_id == patient_id)
+    days = _days(db, daily)
+
+    per_med = db.execute(
+        select(Medication.id, Medication.name, Medication.dosage, *_totals(daily))
+        .join(daily, daily.c.medication_id == Medication.id)
+        .group_by(Medication.id, Medication.name, Medication.dosage)
+        .order_by(Medication.name, Medication.id)
+    ).all()
+    medications = [
+        {
+            "medication_id": r.id,
+            "name": r.name,
+            "dosage": r.dosage,
+            **_summary(r.expected, r.taken, r.on_schedule, r.missed_days),
+        }
+        for r in per_med
+    ]
+    return {**_overall(days), "days": days, "medications": medications}
@@ -0,0 +1,36 @@
+"""
+Async crud layer for the API routes.
+
+Each module here mirrors the sync crud module of the same name: every
+function is the sync implementation run on the AsyncSession's connection via
+run_sync, so query logic lives in one place. Database I/O goes through
+asyncpg without holding a threadpool thread, and the decryption of loaded
+rows is handed to a worker thread so it never runs on the event loop.
+"""
+
+import asyncio
+import functools
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from encryption import decrypt_pending, deferred_decryption
+
+
+async def run(db: AsyncSession, fn, *args, **kwargs):
+    """Run sync crud function fn(session, *args, **kwargs) on db, decrypting off the event loop."""
+    def call(session):
+        with deferred_decryption() as pending:
+            return fn(session, *args, **kwargs), pending
+
+    result, pending = await db.run_sync(call)
+    if pending:
+        await asyncio.get_running_loop().run_in_executor(None, decrypt_pending, pending)
+    return result
+
+
+def wrap(fn):
+    """Async twin of a sync crud function: same arguments, AsyncSession instead of Session."""
+    @functools.wraps(fn)
+    async def wrapper(db: AsyncSession, *args, **kwargs):
+        return await run(db, fn, *args, **kwargs)
+    return wrapper
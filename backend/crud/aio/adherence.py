@@ -0,0 +1,5 @@
+import crud.adherence as adherence_crud
+from crud.aio import wrap
+
+get_medication_adherence = wrap(adherence_crud.get_medication_adherence)
+get_patient_adherence = wrap(adherence_crud.get_patient_adherence)
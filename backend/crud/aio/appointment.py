@@ -0,0 +1,9 @@
+import crud.appointment as appt_crud
+from crud.aio import wrap
+
+get_appointments = wrap(appt_crud.get_appointments)
+get_appointments_page = wrap(appt_crud.get_appointments_page)
+get_appointment = wrap(appt_crud.get_appointment)
+create_appointment = wrap(appt_crud.create_appointment)
+update_appointment = wrap(appt_crud.update_appointment)
+delete_appointment = wrap(appt_crud.delete_appointment)
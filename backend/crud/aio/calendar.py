@@ -0,0 +1,5 @@
+import crud.calendar as calendar_crud
+from crud.aio import wrap
+
+get_events = wrap(calendar_crud.get_events)
+get_day_summary = wrap(calendar_crud.get_day_summary)
@@ -0,0 +1,13 @@
+import crud.medication as med_crud
+from crud.aio import wrap
+
+get_medications = wrap(med_crud.get_medications)
+get_medications_page = wrap(med_crud.get_medications_page)
+get_medication = wrap(med_crud.get_medication)
+create_medication = wrap(med_crud.create_medication)
+update_medication = wrap(med_crud.update_medication)
+delete_medication = wrap(med_crud.delete_medication)
+get_doses = wrap(med_crud.get_doses)
+get_doses_page = wrap(med_crud.get_doses_page)
+create_dose = wrap(med_crud.create_dose)
+get_active_medications_for_range = wrap(med_crud.get_active_medications_for_range)
@@ -0,0 +1,8 @@
+import crud.patient as patient_crud
+from crud.aio import wrap
+
+get_patients = wrap(patient_crud.get_patients)
+get_patient = wrap(patient_crud.get_patient)
+create_patient = wrap(patient_crud.create_patient)
+update_patient = wrap(patient_crud.update_patient)
+delete_patient = wrap(patient_crud.delete_patient)
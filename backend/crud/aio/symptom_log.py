@@ -0,0 +1,9 @@
+import crud.symptom_log as symptom_crud
+from crud.aio import wrap
+
+get_symptom_logs = wrap(symptom_crud.get_symptom_logs)
+get_symptom_logs_page = wrap(symptom_crud.get_symptom_logs_page)
+get_symptom_log = wrap(symptom_crud.get_symptom_log)
+create_symptom_log = wrap(symptom_crud.create_symptom_log)
+update_symptom_log = wrap(symptom_crud.update_symptom_log)
+delete_symptom_log = wrap(symptom_crud.delete_symptom_log)
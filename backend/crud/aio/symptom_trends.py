@@ -0,0 +1,4 @@
+import crud.symptom_trends as trends_crud
+from crud.aio import wrap
+
+get_symptom_trends = wrap(trends_crud.get_symptom_trends)
@@ -5,44 +5,89 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from models.appointment import Appointment
 from schemas.appointment import AppointmentCreate, AppointmentUpdate
+import search_index
+import data_versions
+import calendar_summary
+from pagination import Page, PageParams, paginate
+from projection import with_fields
+from encryption import load_all, load_first
 
 
-def get_appointments(
+def _filtered(
     db: Session,
     patient_id: Optional[str] = None,
     from_dt: Optional[datetime] = None,
     to_dt: Optional[datetime] = None,
-) -> List[Appointment]:
-    q = db.query(Appointment)
+    ids=None,
+    fields: Optional[List[str]] = None,
+):
+    q = with_fields(db.query(Appointment), Appointment, fields)
+    if ids is not None:
+        q = q.filter(Appointment.id.in_(ids))
     if patient_id:
         q = q.filter(Appointment.patient_id == patient_id)
     if from_dt:
         q = q.filter(Appointment.datetime >= from_dt)
     if to_dt:
         q = q.filter(Appointment.datetime <= to_dt)
-    return q.order_by(Appointment.datetime.desc()).all()
+    return q
+
+
+def get_appointments(
+    db: Session,
+    patient_id: Optional[str] = None,
+    from_dt: Optional[datetime] = None,
+    to_dt: Optional[datetime] = None,
+    ids=None,
+    fields: Optional[List[str]] = None,
+) -> List[Appointment]:
+    q = _filtered(db, patient_id=patient_id, from_dt=from_dt, to_dt=to_dt, ids=ids, fields=fields)
+    return load_all(q.order_by(Appointment.datetime.desc()))
+
+
+def get_appointments_page(
+    db: Session,
+    params: PageParams,
+    patient_id: Optional[str] = None,
+    from_dt: Optional[datetime] = None,
+    to_dt: Optional[datetime] = None,
+    fields: Optional[List[str]] = None,
+) -> Page:
+    q = _filtered(db, patient_id=patient_id, from_dt=from_dt, to_dt=to_dt, fields=fields)
+    return paginate(q, Appointment.datetime, Appointment.id, params)
 
 
 def get_appointment(db: Session, appointment_id: str) -> Optional[Appointment]:
-    return db.query(Appointment).filter(Appointment.id == appointment_id).first()
+    return load_first(db.query(Appointment).filter(Appointment.id == appointment_id))
 
 
 def create_appointment(db: Session, data: AppointmentCreate) -> Appointment:
     appt = Appointment(id=str(uuid.uuid4()), **data.model_dump())
     db.add(appt)
+    search_index.index_entity(db, "appointment", appt)
+    calendar_summary.add(db, "appointment", [data.model_dump()])
+    data_versions.bump(db, "appointments")
     db.commit()
     db.refresh(appt)
     return appt
 
 
 def update_appointment(db: Session, appt: Appointment, data: AppointmentUpdate) -> Appointment:
+    before = calendar_summary.span("appointment", appt)
     for field, value in data.model_dump(exclude_unset=True).items():
         setattr(appt, field, value)
+    search_index.index_entity(db, "appointment", appt)
+    calendar_summary.refresh(db, before, calendar_summary.span("appointment", appt))
+    data_versions.bump(db, "appointments")
     db.commit()
     db.refresh(appt)
     return appt
 
 
 def delete_appointment(db: Session, appt: Appointment) -> None:
+    before = calendar_summary.span("appointment", appt)
+    search_index.remove_entity(db, "appointment", appt.id)
     db.delete(appt)
+    calendar_summary.refresh(db, before)
+    data_versions.bump(db, "appointments")
     db.commit()
@@ -0,0 +1,177 @@
+from typing import Dict, Optional, List, Tuple
+from datetime import date, datetime, timedelta
+from sqlalchemy.orm import Session
+from sqlalchemy import (
+    Boolean, Date, DateTime, Integer, String, cast, literal, null, select, type_coerce, union_all,
+)
+from crud.medication import active_between
+from models.calendar_day_summary import CalendarDaySummary
+from models.patient import Patient
+from models.appointment import Appointment
+from models.symptom_log import SymptomLog
+from models.medication import Medication
+from encryption import decrypt_rows
+
+
+def _null(type_):
+    return cast(null(), type_)
+
+
+def get_events(
+    db: Session,
+    from_dt: datetime,
+    to_dt: datetime,
+    patient_id: Optional[str] = None,
+) -> List[dict]:
+    """
+    Every calendar event source in [from_dt, to_dt] in one UNION ALL round
+    trip, with patient name/color joined in SQL and only the columns the
+    calendar shows. Each row is a dict with a "kind" of appointment, symptom
+    or medication; "detail" is the only encrypted column and is decrypted in
+    one batch (see encryption.decrypt_rows).
+    """
+    appointments = (
+        select(
+            literal("appointment", String).label("kind"),
+            Appointment.id,
+            Appointment.patient_id,
+            Patient.name.label("patient_name"),
+            Patient.color.label("patient_color"),
+            Appointment.datetime.label("at"),
+            _null(Date).label("start_date"),
+            _null(Date).label("end_date"),
+            Appointment.provider_name.label("title"),
+            type_coerce(Appointment.reason, String).label("detail"),
+            _null(String).label("dosage"),
+            Appointment.follow_up_required,
+            _null(Integer).label("severity"),
+            _null(Boolean).label("is_ongoing"),
+            _null(Integer).label("frequency_per_day"),
+        )
+        .join(Patient, Patient.id == Appointment.patient_id)
+        .where(Appointment.datetime >= from_dt, Appointment.datetime <= to_dt)
+    )
+    symptoms = (
+        select(
+            literal("symptom", String),
+            SymptomLog.id,
+            SymptomLog.patient_id,
+            Patient.name,
+            Patient.color,
+            SymptomLog.logged_at,
+            _null(Date),
+            _null(Date),
+            _null(String),
+            type_coerce(SymptomLog.description, String),
+            _null(String),
+            _null(Boolean),
+            SymptomLog.severity,
+            _null(Boolean),
+            _null(Integer),
+        )
+        .join(Patient, Patient.id == SymptomLog.patient_id)
+        .where(SymptomLog.logged_at >= from_dt, SymptomLog.logged_at <= to_dt)
+    )
+    medications = (
+        select(
+            literal("medication", String),
+            Medication.id,
+            Medication.patient_id,
+            Patient.name,
+            Patient.color,
+            _null(DateTime(timezone=True)),
+            Medication.start_date,
+            Medication.end_date,
+            Medication.name,
+            _null(String),
+            Medication.dosage,
+            _null(Boolean),
+            _null(Integer),
+            Medication.is_ongoing,
+            Medication.frequency_per_day,
+        )
+        .join(Patient, Patient.id == Medication.patient_id)
+        .where(active_between(from_dt.date(), to_dt.date()))
+    )
+    if patient_id:
+        appointments = appointments.where(Appointment.patient_id == patient_id)
+        symptoms = symptoms.where(SymptomLog.patient_id == patient_id)
+        medications = medications.where(Medication.patient_id == patient_id)
+
+    rows = [dict(r) for r in db.execute(union_all(appointments, symptoms, medications)).mappings()]
+    return decrypt_rows(rows, ("detail",))
+
+
+def get_day_summary(
+    db: Session,
+    from_date: date,
+    to_date: date,
+    patient_id: Optional[str] = None,
+) -> List[dict]:
+    """
+    Per day in [from_date, to_date], event counts and max symptom severity of
+    each patient with events that day (with the patient's name and color) and
+    the totals over them. Reads calendar_day_summary (see calendar_summary.py)
+    with one index range scan; ongoing medications are not in it and are
+    added on every day from their start date. Days with no events are left out.
+    """
+    s = CalendarDaySummary
+    stored = (
+        select(
+            s.day, s.patient_id, Patient.name, Patient.color,
+            s.appointments, s.symptoms, s.medications, s.max_severity,
+        )
+        .join(Patient, Patient.id == s.patient_id)
+        .where(s.day >= from_date, s.day <= to_date)
+    )
+    ongoing = (
+        select(Medication.patient_id, Patient.name, Patient.color, Medication.start_date)
+        .join(Patient, Patient.id == Medication.patient_id)
+        .where(active_between(from_date, to_date), Medication.is_ongoing == True)
+    )
+    if patient_id:
+        stored = stored.where(s.patient_id == patient_id)
+        ongoing = ongoing.where(Medication.patient_id == patient_id)
+
+    # (day, patient_id) -> counts, like a calendar_day_summary row
+    entries: Dict[Tuple[date, str], dict] = {}
+
+    def entry(day: date, r) -> dict:
+        key = (day, r.patient_id)
+        if key not in entries:
+            entries[key] = {
+                "patient_id": r.patient_id,
+                "patient_name": r.name,
+                "patient_color": r.color,
+                "appointments": 0,
+                "symptoms": 0,
+                "medications": 0,
+                "max_severity": None,
+            }
+        return entries[key]
+
+    for r in db.execute(stored):
+        e = entry(r.day, r)
+        e.update(appointments=r.appointments, symptoms=r.symptoms, medications=r.medications)
+        e["max_severity"] = r.max_severity or None
+    for r in db.execute(ongoing):
+        day = max(r.start_date, from_date)
+        while day <= to_date:
+            entry(day, r)["medications"] += 1
+            day += timedelta(days=1)
+
+    by_day: Dict[date, List[dict]] = {}
+    for (day, _), e in sorted(entries.items(), key=lambda item: (item[0][0], item[1]["patient_name"])):
+        if e["appointments"] or e["symptoms"] or e["medications"]:
+            by_day.setdefault(day, []).append(e)
+    return [
+        {
+            "day": day,
+            "appointments": sum(p["appointments"] for p in patients),
+            "symptoms": sum(p["symptoms"] for p in patients),
+            "medications": sum(p["medications"] for p in patients),
+            "max_severity": max(p["max_severity"] or 0 for p in patients) or None,
+            "patients": patients,
+        }
+        for day, patients in by_day.items()
+    ]
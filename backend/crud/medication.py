@@ -1,56 +1,100 @@
 import uuid
 from typing import Optional, List
 from datetime import date
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 from models.medication import Medication
 from models.medication_dose import MedicationDose
 from schemas.medication import MedicationCreate, MedicationUpdate, MedicationDoseCreate
+import search_index
+import data_versions
+import calendar_summary
+import dose_rollup
+from pagination import Page, PageParams, paginate
+from projection import with_fields
+from encryption import load_all, load_first
 
 
 def get_medications(
     db: Session,
     patient_id: Optional[str] = None,
+    ids=None,
 ) -> List[Medication]:
     q = db.query(Medication)
+    if ids is not None:
+        q = q.filter(Medication.id.in_(ids))
     if patient_id:
         q = q.filter(Medication.patient_id == patient_id)
-    return q.order_by(Medication.start_date.desc()).all()
+    return load_all(q.order_by(Medication.start_date.desc()))
+
+
+def get_medications_page(
+    db: Session,
+    params: PageParams,
+    patient_id: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+) -> Page:
+    q = with_fields(db.query(Medication), Medication, fields)
+    if patient_id:
+        q = q.filter(Medication.patient_id == patient_id)
+    return paginate(q, Medication.start_date, Medication.id, params)
 
 
 def get_medication(db: Session, medication_id: str) -> Optional[Medication]:
-    return db.query(Medication).filter(Medication.id == medication_id).first()
+    return load_first(db.query(Medication).filter(Medication.id == medication_id))
 
 
 def create_medication(db: Session, data: MedicationCreate) -> Medication:
     med = Medication(id=str(uuid.uuid4()), **data.model_dump())
     db.add(med)
+    search_index.index_entity(db, "medication", med)
+    calendar_summary.add(db, "medication", [data.model_dump()])
+    data_versions.bump(db, "medications")
     db.commit()
     db.refresh(med)
     return med
 
 
 def update_medication(db: Session, med: Medication, data: MedicationUpdate) -> Medication:
+    before = calendar_summary.span("medication", med)
     for field, value in data.model_dump(exclude_unset=True).items():
         setattr(med, field, value)
+    search_index.index_entity(db, "medication", med)
+    calendar_summary.refresh(db, before, calendar_summary.span("medication", med))
+    data_versions.bump(db, "medications")
     db.commit()
     db.refresh(med)
     return med
 
 
 def delete_medication(db: Session, med: Medication) -> None:
+    before = calendar_summary.span("medication", med)
+    search_index.remove_entity(db, "medication", med.id)
     db.delete(med)
+    calendar_summary.refresh(db, before)
+    data_versions.bump(db, "medications", "medication_doses")
     db.commit()
 
 
 def get_doses(db: Session, medication_id: str) -> List[MedicationDose]:
-    return (
+    return load_all(
         db.query(MedicationDose)
         .filter(MedicationDose.medication_id == medication_id)
         .order_by(MedicationDose.taken_at.desc())
-        .all()
     )
 
 
+def get_doses_page(
+    db: Session,
+    medication_id: str,
+    params: PageParams,
+    fields: Optional[List[str]] = None,
+) -> Page:
+    q = with_fields(db.query(MedicationDose), MedicationDose, fields)
+    q = q.filter(MedicationDose.medication_id == medication_id)
+    return paginate(q, MedicationDose.taken_at, MedicationDose.id, params)
+
+
 def create_dose(db: Session, medication_id: str, data: MedicationDoseCreate) -> MedicationDose:
     dose = MedicationDose(
         id=str(uuid.uuid4()),
@@ -58,23 +102,35 @@ def create_dose(db: Session, medication_id: str, data: MedicationDoseCreate) ->
         **data.model_dump(),
     )
     db.add(dose)
+    dose_rollup.add(db, [{"medication_id": medication_id, **data.model_dump()}])
+    data_versions.bump(db, "medication_doses")
     db.commit()
     db.refresh(dose)
     return dose
 
 
+def active_between(from_date: date, to_date: date):
+    """
+    Medications taken on at least one day of [from_date, to_date]: started by
+    to_date, and ongoing or ended on or after from_date. A medication that is
+    not ongoing and has no end date was stopped on an unknown day and is not
+    active anywhere. Shared by every query that places medications on days.
+    """
+    return and_(
+        Medication.start_date <= to_date,
+        or_(Medication.is_ongoing == True, Medication.end_date >= from_date),
+    )
+
+
 def get_active_medications_for_range(
     db: Session,
     from_date: date,
     to_date: date,
     patient_id: Optional[str] = None,
+    fields: Optional[List[str]] = None,
 ) -> List[Medication]:
     """Return medications whose date range overlaps with [from_date, to_date]."""
-    q = db.query(Medication)
+    q = with_fields(db.query(Medication), Medication, fields)
     if patient_id:
         q = q.filter(Medication.patient_id == patient_id)
-    # Active if: start_date <= to_date AND (is_ongoing OR end_date >= from_date)
-    q = q.filter(Medication.start_date <= to_date)
-    from sqlalchemy import or_
-    q = q.filter(or_(Medication.is_ongoing == True, Medication.end_date >= from_date))
-    return q.all()
+    return load_all(q.filter(active_between(from_date, to_date)))
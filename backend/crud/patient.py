@@ -3,20 +3,27 @@ from typing import Optional, List
 from sqlalchemy.orm import Session
 from models.patient import Patient
 from schemas.patient import PatientCreate, PatientUpdate
+import search_index
+import data_versions
+import patient_directory
+from projection import with_fields
+from encryption import load_all, load_first
 
 
-def get_patients(db: Session) -> List[Patient]:
-    return db.query(Patient).order_by(Patient.name).all()
+def get_patients(db: Session, fields: Optional[List[str]] = None) -> List[Patient]:
+    return load_all(with_fields(db.query(Patient), Patient, fields).order_by(Patient.name))
 
 
 def get_patient(db: Session, patient_id: str) -> Optional[Patient]:
-    return db.query(Patient).filter(Patient.id == patient_id).first()
+    return load_first(db.query(Patient).filter(Patient.id == patient_id))
 
 
 def create_patient(db: Session, data: PatientCreate) -> Patient:
     patient = Patient(id=str(uuid.uuid4()), **data.model_dump())
     db.add(patient)
+    data_versions.bump(db, "patients")
     db.commit()
+    patient_directory.invalidate()
     db.refresh(patient)
     return patient
 
@@ -24,11 +31,17 @@ def create_patient(db: Session, data: PatientCreate) -> Patient:
 def update_patient(db: Session, patient: Patient, data: PatientUpdate) -> Patient:
     for field, value in data.model_dump(exclude_unset=True).items():
         setattr(patient, field, value)
+    data_versions.bump(db, "patients")
     db.commit()
+    patient_directory.invalidate()
     db.refresh(patient)
     return patient
 
 
 def delete_patient(db: Session, patient: Patient) -> None:
+    search_index.remove_patient(db, patient.id)
     db.delete(patient)
+    # Cascades to every record of the patient
+    data_versions.bump(db, *data_versions.TABLES)
     db.commit()
+    patient_directory.invalidate()
@@ -4,44 +4,89 @@ from datetime import datetime
 from sqlalchemy.orm import Session
 from models.symptom_log import SymptomLog
 from schemas.symptom_log import SymptomLogCreate, SymptomLogUpdate
+import search_index
+import data_versions
+import calendar_summary
+from pagination import Page, PageParams, paginate
+from projection import with_fields
+from encryption import load_all, load_first
 
 
-def get_symptom_logs(
+def _filtered(
     db: Session,
     patient_id: Optional[str] = None,
     from_dt: Optional[datetime] = None,
     to_dt: Optional[datetime] = None,
-) -> List[SymptomLog]:
-    q = db.query(SymptomLog)
+    ids=None,
+    fields: Optional[List[str]] = None,
+):
+    q = with_fields(db.query(SymptomLog), SymptomLog, fields)
+    if ids is not None:
+        q = q.filter(SymptomLog.id.in_(ids))
     if patient_id:
         q = q.filter(SymptomLog.patient_id == patient_id)
     if from_dt:
         q = q.filter(SymptomLog.logged_at >= from_dt)
     if to_dt:
         q = q.filter(SymptomLog.logged_at <= to_dt)
-    return q.order_by(SymptomLog.logged_at.desc()).all()
+    return q
+
+
+def get_symptom_logs(
+    db: Session,
+    patient_id: Optional[str] = None,
+    from_dt: Optional[datetime] = None,
+    to_dt: Optional[datetime] = None,
+    ids=None,
+    fields: Optional[List[str]] = None,
+) -> List[SymptomLog]:
+    q = _filtered(db, patient_id=patient_id, from_dt=from_dt, to_dt=to_dt, ids=ids, fields=fields)
+    return load_all(q.order_by(SymptomLog.logged_at.desc()))
+
+
+def get_symptom_logs_page(
+    db: Session,
+    params: PageParams,
+    patient_id: Optional[str] = None,
+    from_dt: Optional[datetime] = None,
+    to_dt: Optional[datetime] = None,
+    fields: Optional[List[str]] = None,
+) -> Page:
+    q = _filtered(db, patient_id=patient_id, from_dt=from_dt, to_dt=to_dt, fields=fields)
+    return paginate(q, SymptomLog.logged_at, SymptomLog.id, params)
 
 
 def get_symptom_log(db: Session, log_id: str) -> Optional[SymptomLog]:
-    return db.query(SymptomLog).filter(SymptomLog.id == log_id).first()
+    return load_first(db.query(SymptomLog).filter(SymptomLog.id == log_id))
 
 
 def create_symptom_log(db: Session, data: SymptomLogCreate) -> SymptomLog:
     log = SymptomLog(id=str(uuid.uuid4()), **data.model_dump())
     db.add(log)
+    search_index.index_entity(db, "symptom", log)
+    calendar_summary.add(db, "symptom", [data.model_dump()])
+    data_versions.bump(db, "symptom_logs")
     db.commit()
     db.refresh(log)
     return log
 
 
 def update_symptom_log(db: Session, log: SymptomLog, data: SymptomLogUpdate) -> SymptomLog:
+    before = calendar_summary.span("symptom", log)
     for field, value in data.model_dump(exclude_unset=True).items():
         setattr(log, field, value)
+    search_index.index_entity(db, "symptom", log)
+    calendar_summary.refresh(db, before, calendar_summary.span("symptom", log))
+    data_versions.bump(db, "symptom_logs")
     db.commit()
     db.refresh(log)
     return log
 
 
 def delete_symptom_log(db: Session, log: SymptomLog) -> None:
+    before = calendar_summary.span("symptom", log)
+    search_index.remove_entity(db, "symptom", log.id)
     db.delete(log)
+    calendar_summary.refresh(db, before)
+    data_versions.bump(db, "symptom_logs")
     db.commit()
@@ -0,0 +1,183 @@
+"""
+Symptom severity trends per patient per day, week or month.
+
+Everything is aggregated in SQL on the plaintext columns (logged_at,
+severity, resolved_at), so no description or note is ever loaded or
+decrypted. Buckets are UTC calendar days, ISO weeks (starting Monday) or
+months of logged_at, like the rest of the calendar.
+
+Results are cached in process, keyed by the query and the "symptom_logs"
+data version: any symptom write (here or in another worker) bumps the
+version, so the next call recomputes. The version is read before the
+aggregates, so a concurrent write can only cause an extra recompute, never a
+stale hit.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import Date, Integer, cast, extract, func, literal, select
+from sqlalchemy.orm import Session
+
+from models.data_version import DataVersion
+from models.symptom_log import SymptomLog
+
+BUCKETS = ("day", "week", "month")
+DEFAULT_WINDOWS = {"day": 7, "week": 4, "month": 3}
+
+_CACHE_SIZE = 64
+_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _ordinal(bucket: str, start):
+    """
+    Consecutive integers for consecutive buckets, so a RANGE window over them
+    spans calendar time and skips buckets with no logs.
+    """
+    if bucket == "month":
+        return cast(extract("year", start) * 12 + extract("month", start), Integer)
+    days = cast(start, Date) - literal(date(1970, 1, 5), Date)  # a Monday
+    return days // 7 if bucket == "week" else days
+
+
+def _criteria(patient_id: Optional[str], from_dt: Optional[datetime], to_dt: Optional[datetime]) -> list:
+    criteria = []
+    if patient_id:
+        criteria.append(SymptomLog.patient_id == patient_id)
+    if from_dt:
+        criteria.append(SymptomLog.logged_at >= from_dt)
+    if to_dt:
+        criteria.append(SymptomLog.logged_at <= to_dt)
+    return criteria
+
+
+def _resolution_hours():
+    return extract("epoch", SymptomLog.resolved_at - SymptomLog.logged_at) / 3600.0
+
+
+def _buckets(db: Session, bucket: str, window: int, criteria: list) -> list:
+    start = func.date_trunc(bucket, func.timezone("UTC", SymptomLog.logged_at))
+    hours = _resolution_hours()
+    per_bucket = (
+        select(
+            SymptomLog.patient_id,
+            start.label("start"),
+            func.count().label("count"),
+            func.sum(SymptomLog.severity).label("total"),
+            func.max(SymptomLog.severity).label("max"),
+            func.count(SymptomLog.resolved_at).label("resolved"),
+            func.avg(hours).label("resolution_hours"),
+        )
+        .where(*criteria)
+        .group_by(SymptomLog.patient_id, start)
+        .subquery()
+    )
+    b = per_bucket.c
+
+    def rolling(column):
+        return func.sum(column).over(
+            partition_by=b.patient_id, order_by=_ordinal(bucket, b.start), range_=(-(window - 1), 0),
+        )
+
+    rows = db.execute(
+        select(
+            b.patient_id,
+            cast(b.start, Date).label("start"),
+            b.count,
+            b.total,
+            b.max,
+            b.resolved,
+            b.resolution_hours,
+            rolling(b.total).label("rolling_total"),
+            rolling(b.count).label("rolling_count"),
+        ).order_by(b.patient_id, b.start)
+    ).all()
+    return [
+        {
+            "patient_id": r.patient_id,
+            "start": r.start,
+            "count": r.count,
+            "mean_severity": round(r.total / r.count, 3),
+            "max_severity": r.max,
+            "rolling_mean_severity": round(r.rolling_total / r.rolling_count, 3),
+            "resolved": r.resolved,
+            "mean_resolution_hours": _hours(r.resolution_hours),
+        }
+        for r in rows
+    ]
+
+
+def _resolution(db: Session, criteria: list) -> list:
+    hours = _resolution_hours()
+    rows = db.execute(
+        select(
+            SymptomLog.patient_id,
+            func.count(SymptomLog.resolved_at).label("resolved"),
+            (func.count() - func.count(SymptomLog.resolved_at)).label("unresolved"),
+            func.avg(hours).label("mean"),
+            func.percentile_cont(0.5).within_group(hours).label("median"),
+            func.percentile_cont(0.9).within_group(hours).label("p90"),
+        )
+        .where(*criteria)
+        .group_by(SymptomLog.patient_id)
+        .order_by(SymptomLog.patient_id)
+    ).all()
+    return [
+        {
+            "patient_id": r.patient_id,
+            "resolved": r.resolved,
+            "unresolved": r.unresolved,
+            "mean_hours": _hours(r.mean),
+            "median_hours": _hours(r.median),
+            "p90_hours": _hours(r.p90),
+        }
+        for r in rows
+    ]
+
+
+def _hours(value) -> Optional[float]:
+    return round(float(value), 2) if value is not None else None
+
+
+def _version(db: Session) -> int:
+    version = db.scalar(select(DataVersion.version).where(DataVersion.table_name == "symptom_logs"))
+    return version or 0
+
+
+def get_symptom_trends(
+    db: Session,
+    bucket: str = "week",
+    window: Optional[int] = None,
+    patient_id: Optional[str] = None,
+    from_dt: Optional[datetime] = None,
+    to_dt: Optional[datetime] = None,
+) -> dict:
+    """
+    Severity count/mean/max per patient per bucket with a rolling mean over
+    the last `window` buckets (weighted by count), plus time-to-resolution
+    stats per patient over the same logs.
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of {', '.join(BUCKETS)}")
+    window = window or DEFAULT_WINDOWS[bucket]
+    key = (_version(db), bucket, window, patient_id, from_dt, to_dt)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    criteria = _criteria(patient_id, from_dt, to_dt)
+    result = {
+        "bucket": bucket,
+        "window": window,
+        "buckets": _buckets(db, bucket, window, criteria),
+        "resolution": _resolution(db, criteria),
+    }
+    with _lock:
+        _cache[key] = result
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
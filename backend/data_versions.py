@@ -0,0 +1,77 @@
+"""
+Per-table data versions and conditional GET.
+
+Every crud write bumps the version of the tables it touches, in the same
+transaction as the write, so a version change is visible exactly when the
+data is. Read endpoints declare the tables their response depends on:
+
+    _etag=Depends(data_versions.conditional("appointments"))
+
+The dependency reads those versions (one small query) and derives an ETag
+from them plus the path and query string. If the client's If-None-Match
+matches, the request ends with 304 before any heavy query or decryption runs;
+otherwise the ETag is attached to the response.
+
+Versions are read before the data, so a write racing with a read can only
+make the ETag older than the body — the next request then misses and gets
+fresh data. It never makes stale data look current.
+"""
+
+import hashlib
+from typing import Dict, Iterable
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database import get_async_db
+from models.data_version import DataVersion
+
+TABLES = ("patients", "appointments", "symptom_logs", "medications", "medication_doses")
+
+_versions = DataVersion.__table__
+
+
+def bump(db: Session, *tables: str) -> None:
+    """Increment the version of each table. Call before the write's commit."""
+    for table_name in tables:
+        result = db.execute(
+            update(_versions)
+            .where(_versions.c.table_name == table_name)
+            .values(version=_versions.c.version + 1)
+        )
+        if result.rowcount == 0:
+            db.execute(insert(_versions).values(table_name=table_name, version=1))
+
+
+def _etag(request: Request, versions: Dict[str, int], tables: Iterable[str]) -> str:
+    parts = [request.url.path, *sorted(request.query_params.multi_items())]
+    parts += [(t, versions.get(t, 0)) for t in tables]
+    return 'W/"' + hashlib.sha256(repr(parts).encode()).hexdigest()[:32] + '"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    tags = {t.strip() for t in if_none_match.split(",")}
+    return "*" in tags or etag in tags or etag[2:] in tags
+
+
+def conditional(*tables: str):
+    """Dependency answering If-None-Match with 304 when none of tables changed."""
+
+    async def dependency(
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_async_db),
+    ) -> None:
+        rows = await db.execute(
+            select(_versions.c.table_name, _versions.c.version).where(_versions.c.table_name.in_(tables))
+        )
+        etag = _etag(request, dict(rows.all()), tables)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return dependency
@@ -1,12 +1,28 @@
+"""
+Database engines and sessions.
+
+The API routes use the async engine (asyncpg) through get_async_db and the
+crud.aio wrappers. The sync engine (psycopg2) remains for Alembic, manage.py
+maintenance commands, and the sync crud functions that crud.aio runs via
+AsyncSession.run_sync.
+
+Both pools are the metrics.py subclasses, which record checkouts and wait time,
+and both engines feed query_profiler's per-request statement counts.
+"""
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from config import get_settings
+from metrics import TimedAsyncQueuePool, TimedQueuePool
+import query_profiler
 
 
 settings = get_settings()
 
 engine = create_engine(
     settings.database_url,
+    poolclass=TimedQueuePool,
     pool_pre_ping=True,
     pool_size=5,
     max_overflow=10,
@@ -14,6 +30,22 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(
+    settings.async_database_url,
+    poolclass=TimedAsyncQueuePool,
+    pool_pre_ping=True,
+    pool_size=5,
+    max_overflow=10,
+)
+
+query_profiler.instrument(engine)
+query_profiler.instrument(async_engine.sync_engine)
+
+# expire_on_commit=False: attribute access after commit must not trigger implicit IO
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession,
+)
+
 
 class Base(DeclarativeBase):
     pass
@@ -25,3 +57,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,81 @@
+"""
+Daily rollup of logged doses (medication_dose_days), for adherence queries.
+
+Adherence compares, per day, a medication's frequency_per_day with the number
+of doses taken. Counting raw medication_doses rows for that gets slower with
+every year of history. Instead, every write path that inserts doses
+(crud.medication.create_dose, bulk import, the benchmark generator) calls
+add() in the same transaction, which increments one row per
+(medication, day) with an upsert. Medications cascade their rollup rows away
+on delete.
+
+Days are UTC calendar days of taken_at, like the calendar's medication spans.
+
+To rebuild it from the doses table (e.g. after restoring a backup taken
+before the rollup existed):
+
+    docker-compose exec app python manage.py rebuild-dose-rollup
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models import MedicationDose, MedicationDoseDay
+
+_table = MedicationDoseDay.__table__
+
+
+def day_of(taken_at: datetime) -> date:
+    if taken_at.tzinfo is not None:
+        taken_at = taken_at.astimezone(timezone.utc)
+    return taken_at.date()
+
+
+def _upsert(db: Session, totals: Dict[Tuple[str, date], list]) -> None:
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(_table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[_table.c.medication_id, _table.c.day],
+        set_={
+            "doses": _table.c.doses + stmt.excluded.doses,
+            "quantity": _table.c.quantity + stmt.excluded.quantity,
+        },
+    )
+    db.execute(stmt, [
+        {"medication_id": med_id, "day": day, "doses": doses, "quantity": quantity}
+        for (med_id, day), (doses, quantity) in totals.items()
+    ])
+
+
+def add(db: Session, doses: Iterable[dict]) -> None:
+    """Count new doses (dicts with medication_id, taken_at, quantity) into the rollup. Call before commit."""
+    totals: Dict[Tuple[str, date], list] = defaultdict(lambda: [0, 0.0])
+    for dose in doses:
+        entry = totals[(dose["medication_id"], day_of(dose["taken_at"]))]
+        entry[0] += 1
+        entry[1] += dose.get("quantity") or 1.0
+    if totals:
+        _upsert(db, totals)
+
+
+def rebuild(db: Session, batch_size: int = 5000) -> int:
+    """Recompute the whole rollup from medication_doses in one transaction. Returns the row count."""
+    totals: Dict[Tuple[str, date], list] = defaultdict(lambda: [0, 0.0])
+    rows = db.execute(
+        select(MedicationDose.medication_id, MedicationDose.taken_at, MedicationDose.quantity)
+        .execution_options(yield_per=batch_size)
+    )
+    for med_id, taken_at, quantity in rows:
+        entry = totals[(med_id, day_of(taken_at))]
+        entry[0] += 1
+        entry[1] += quantity
+    db.execute(delete(_table))
+    if totals:
+        _upsert(db, totals)
+    db.commit()
+    return len(totals)
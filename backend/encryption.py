@@ -2,37 +2,362 @@
 Application-level field encryption using Fernet symmetric encryption.
 
 Encrypted fields store Fernet ciphertext (base64-encoded, prefixed with 'gAAAAA').
-This means SQL LIKE queries on encrypted fields are not possible — search is
-performed by fetching candidates and filtering in Python after auto-decryption.
+This means SQL LIKE queries on encrypted fields are not possible — search
+narrows candidates with the keyed blind index in search_index.py, then filters
+in Python after auto-decryption.
 
-Key rotation: decrypt all records with old key, re-encrypt with new key.
-See README for the key rotation procedure.
+Large list queries go through load_all(), which loads ciphertext untouched and
+decrypts every encrypted column of the result in chunks, optionally on a
+bounded thread pool (settings.decrypt_workers). Under deferred_decryption()
+(used by the async crud layer), load_all() leaves the ciphertext in place and
+records it so the caller can decrypt it off the event loop.
+
+Decrypted values are memoized in a bounded LRU keyed by ciphertext. Fernet
+embeds a random IV in every token, so a ciphertext maps to exactly one
+plaintext and is a safe cache key; an edited field gets a new ciphertext and
+therefore a new entry. The cache is cleared whenever the key set changes.
+
+Key rotation: values are decrypted with a MultiFernet over every key in
+secrets_manager (primary first) and encrypted with the primary key only.
+key_rotation.py re-encrypts stored data under a new primary key while the app
+stays online; this module notices the rewritten secrets file within
+settings.key_reload_seconds, or as soon as a value fails to decrypt. Forced
+reloads happen at most once per settings.key_forced_reload_seconds, and a
+ciphertext that still fails is remembered until the key set changes, so
+corrupt values do not re-read the secrets file on every request.
 """
 
-from cryptography.fernet import Fernet, InvalidToken
-from sqlalchemy import String
+import functools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from sqlalchemy import String, inspect
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.types import TypeDecorator
+
+from config import get_settings
+import metrics
 import secrets_manager
 
+settings = get_settings()
+
+_DECRYPT_ERROR = "[decryption error]"
+
+
+class _PlaintextCache:
+    """
+    Thread-safe LRU bounded by entry count and by approximate bytes of
+    ciphertext + plaintext held. The lock only guards dict operations.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: OrderedDict[str, str] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= len(key) + len(old)
+            self._data[key] = value
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                k, v = self._data.popitem(last=False)
+                self._bytes -= len(k) + len(v)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": settings.decrypt_cache_enabled,
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_cache = _PlaintextCache(settings.decrypt_cache_max_entries, settings.decrypt_cache_max_bytes)
+
+
+class _FailedTokens:
+    """
+    Bounded LRU of ciphertexts that failed to decrypt, each tagged with the
+    MultiFernet it failed under: an entry only counts while that key set is
+    current.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, MultiFernet] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def has(self, token: str, fernet: MultiFernet) -> bool:
+        with self._lock:
+            return self._data.get(token) is fernet
+
+    def add(self, token: str, fernet: MultiFernet) -> None:
+        with self._lock:
+            self._data[token] = fernet
+            self._data.move_to_end(token)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_failed = _FailedTokens(1024)
+
+
+def cache_stats() -> dict:
+    return _cache.stats()
+
+
+def _init_fernet(keys: tuple) -> MultiFernet:
+    return MultiFernet([Fernet(k.encode()) for k in keys])
+
+
+# secrets_manager already ran _load() at import time, so the keys exist
+_keys = tuple(secrets_manager.get_encryption_keys())
+_fernet = _init_fernet(_keys)
+_next_key_check = time.monotonic() + settings.key_reload_seconds
+_next_forced_check = 0.0
+_forced_lock = threading.Lock()
+
 
-def _init_fernet() -> Fernet:
-    # secrets_manager already ran _load() at import time, so the key exists
-    return Fernet(secrets_manager.get_encryption_key().encode())
+def refresh_keys(force: bool = False) -> bool:
+    """
+    Pick up keys added or retired by another process. Cheap enough for the hot
+    path: the secrets file is only stat()ed every key_reload_seconds unless
+    force is set. Returns True if the key set changed.
+    """
+    global _fernet, _keys, _next_key_check
+    now = time.monotonic()
+    if not force and now < _next_key_check:
+        return False
+    _next_key_check = now + settings.key_reload_seconds
+    secrets_manager.reload_if_changed()
+    keys = tuple(secrets_manager.get_encryption_keys())
+    if keys == _keys:
+        return False
+    _keys, _fernet = keys, _init_fernet(keys)
+    _cache.clear()
+    _failed.clear()
+    return True
 
 
-_fernet = _init_fernet()
+def _refresh_after_failure() -> bool:
+    """refresh_keys(force=True), at most once per key_forced_reload_seconds across threads."""
+    global _next_forced_check
+    with _forced_lock:
+        now = time.monotonic()
+        if now < _next_forced_check:
+            return False
+        _next_forced_check = now + settings.key_forced_reload_seconds
+        return refresh_keys(force=True)
 
 
 def encrypt(value: str) -> str:
-    return _fernet.encrypt(value.encode()).decode()
+    refresh_keys()
+    start = time.perf_counter()
+    token = _fernet.encrypt(value.encode()).decode()
+    metrics.ENCRYPT_SECONDS.observe(time.perf_counter() - start)
+    return token
 
 
-def decrypt(value: str) -> str:
+def decrypt(value: str, use_cache: bool = True) -> str:
+    """use_cache=False is for one-off bulk reads (exports) that would only evict hot entries."""
+    start = time.perf_counter()
+    plain = _decrypt(value, use_cache)
+    metrics.DECRYPT_VALUES.inc()
+    metrics.DECRYPT_SECONDS.inc(time.perf_counter() - start)
+    return plain
+
+
+def _decrypt(value: str, use_cache: bool = True) -> str:
+    refresh_keys()
+    use_cache = use_cache and settings.decrypt_cache_enabled
+    if use_cache:
+        cached = _cache.get(value)
+        if cached is not None:
+            return cached
+    fernet = _fernet
+    if _failed.has(value, fernet):
+        return _DECRYPT_ERROR
     try:
-        return _fernet.decrypt(value.encode()).decode()
+        plain = fernet.decrypt(value.encode()).decode()
     except InvalidToken:
+        # The value may be under a key this process has not loaded yet (or
+        # another thread just loaded)
+        if _refresh_after_failure() or _fernet is not fernet:
+            return _decrypt(value, use_cache)
         # Return a placeholder rather than crashing; log the issue
-        return "[decryption error]"
+        _failed.add(value, fernet)
+        return _DECRYPT_ERROR
+    if use_cache:
+        _cache.put(value, plain)
+    return plain
+
+
+# ── Bulk decryption ───────────────────────────────────────────────────────────
+
+class _Ciphertext(str):
+    """Marks a column value that was loaded raw by load_all() and still needs decrypting."""
+
+
+# True while load_all() is running its query in this thread/task
+_raw_results: ContextVar[bool] = ContextVar("_raw_results", default=False)
+# Set by deferred_decryption(): load_all() appends its pending values here instead of decrypting
+_deferred: ContextVar[Optional[list]] = ContextVar("_deferred", default=None)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.decrypt_workers, thread_name_prefix="decrypt",
+                )
+    return _executor
+
+
+def _decrypt_chunk(values: List[str], use_cache: bool = True) -> List[str]:
+    return [_decrypt(v, use_cache) for v in values]
+
+
+def decrypt_many(values: List[str], use_cache: bool = True) -> List[str]:
+    """
+    Decrypt a list of ciphertexts, preserving order. Output is identical to
+    calling decrypt() on each value; large inputs are split into chunks and
+    spread over the decrypt thread pool when one is configured.
+    """
+    start = time.perf_counter()
+    if settings.decrypt_workers <= 0 or len(values) < settings.decrypt_parallel_min:
+        out = _decrypt_chunk(values, use_cache)
+    else:
+        size = settings.decrypt_chunk_size
+        chunks = [values[i:i + size] for i in range(0, len(values), size)]
+        out = []
+        fn = functools.partial(_decrypt_chunk, use_cache=use_cache)
+        for result in _get_executor().map(fn, chunks):
+            out.extend(result)
+    # Recorded once per batch, not per value
+    elapsed = time.perf_counter() - start
+    metrics.DECRYPT_VALUES.inc(len(values))
+    metrics.DECRYPT_SECONDS.inc(elapsed)
+    metrics.DECRYPT_BATCH_SECONDS.observe(elapsed)
+    return out
+
+
+def load_all(q) -> list:
+    """
+    Equivalent to q.all() for entity queries, but EncryptedString columns are
+    decrypted in one batch after the rows are loaded instead of one value at a
+    time inside the result loop.
+    """
+    token = _raw_results.set(True)
+    try:
+        items = q.all()
+    finally:
+        _raw_results.reset(token)
+
+    pending = []
+    for obj in items:
+        state = inspect(obj, raiseerr=False)
+        if state is None:
+            continue
+        for key, value in state.dict.items():
+            if isinstance(value, _Ciphertext):
+                pending.append((obj, key, value))
+
+    deferred = _deferred.get()
+    if deferred is not None:
+        deferred.extend(pending)
+    else:
+        decrypt_pending(pending)
+    return items
+
+
+def load_first(q):
+    """Equivalent to q.first(), decrypting through load_all()."""
+    items = load_all(q.limit(1))
+    return items[0] if items else None
+
+
+def decrypt_rows(rows: List[dict], keys) -> List[dict]:
+    """
+    load_all() for Core result rows turned into dicts: the values under keys
+    are raw ciphertext (selected with type_coerce(col, String)) and are
+    decrypted in one batch, or deferred under deferred_decryption().
+    """
+    pending = [(row, key, row[key]) for row in rows for key in keys if row[key] is not None]
+    deferred = _deferred.get()
+    if deferred is not None:
+        deferred.extend(pending)
+    else:
+        decrypt_pending(pending)
+    return rows
+
+
+def decrypt_pending(pending: list) -> None:
+    """Decrypt (obj, attribute, ciphertext) entries collected by load_all() or decrypt_rows()."""
+    if not pending:
+        return
+    plain = decrypt_many([str(v) for _, _, v in pending])
+    for (obj, key, _), value in zip(pending, plain):
+        if isinstance(obj, dict):
+            obj[key] = value
+        else:
+            # Bypass change tracking so the object is not marked dirty
+            set_committed_value(obj, key, value)
+
+
+@contextmanager
+def deferred_decryption():
+    """
+    Within this block load_all() does not decrypt; it yields the list that
+    collects pending values, to be passed to decrypt_pending() later.
+    """
+    pending: list = []
+    token = _deferred.set(pending)
+    try:
+        yield pending
+    finally:
+        _deferred.reset(token)
 
 
 class EncryptedString(TypeDecorator):
@@ -48,7 +373,9 @@ class EncryptedString(TypeDecorator):
         return encrypt(str(value))
 
     def process_result_value(self, value, dialect):
-        """Decrypt value after reading from DB."""
+        """Decrypt value after reading from DB (deferred to load_all() in bulk mode)."""
         if value is None:
             return None
+        if _raw_results.get():
+            return _Ciphertext(value)
         return decrypt(value)
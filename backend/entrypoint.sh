@@ -3,6 +3,7 @@ set -e
 
 echo "Running database migrations..."
 alembic upgrade head
+python manage.py rebuild-search-index --if-stale
 
 echo "Starting server..."
 exec uvicorn main:app --host 0.0.0.0 --port 8000
@@ -0,0 +1,189 @@
+"""
+Online, resumable encryption key rotation.
+
+    python manage.py rotate-key         # start a rotation, or resume one
+    python manage.py retire-old-keys    # once rotation has completed
+
+Starting a rotation adds a fresh Fernet key as the primary key in
+secrets.json; the previous keys stay listed so everything stays readable. The
+running app notices the new key set within settings.key_reload_seconds (see
+encryption.refresh_keys), so after a short grace period all new writes use the
+new key. The job then walks every table with EncryptedString columns in
+primary-key order, one batch per transaction, re-encrypting values that are
+not yet under the primary key.
+
+Each batch commits together with a checkpoint row (rotation_checkpoints), so
+an interrupted job resumes where it stopped. Values are only overwritten if
+they still hold the ciphertext that was read, so a concurrent edit from the
+app is never clobbered. Batches are small and separated by a short pause so
+the app keeps serving requests while the job runs.
+"""
+
+import hashlib
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+import sqlalchemy as sa
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from sqlalchemy.orm import Session
+
+from config import get_settings
+from database import Base
+from encryption import EncryptedString
+import models  # noqa: F401  (populate Base.metadata)
+from models.rotation_checkpoint import RotationCheckpoint
+import secrets_manager
+
+settings = get_settings()
+
+
+def fingerprint(key: str) -> str:
+    """Short, non-secret identifier for a key."""
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def encrypted_tables() -> Dict[str, List[str]]:
+    """table name -> names of its EncryptedString columns."""
+    out = {}
+    for table in Base.metadata.sorted_tables:
+        cols = [c.name for c in table.columns if isinstance(c.type, EncryptedString)]
+        if cols:
+            out[table.name] = cols
+    return out
+
+
+def _checkpoint(db: Session, table_name: str, key_fp: str) -> RotationCheckpoint:
+    cp = db.get(RotationCheckpoint, table_name)
+    if cp is None:
+        cp = RotationCheckpoint(table_name=table_name)
+        db.add(cp)
+    if cp.key_fingerprint != key_fp:
+        # Left over from an earlier rotation — start this table from the top
+        cp.key_fingerprint = key_fp
+        cp.last_id = None
+        cp.rows_rotated = 0
+        cp.done = False
+        cp.updated_at = datetime.now(timezone.utc)
+    return cp
+
+
+def is_complete(db: Session) -> bool:
+    """True if every encrypted table has been fully re-encrypted under the primary key."""
+    key_fp = fingerprint(secrets_manager.get_encryption_key())
+    for table_name in encrypted_tables():
+        cp = db.get(RotationCheckpoint, table_name)
+        if cp is None or cp.key_fingerprint != key_fp or not cp.done:
+            return False
+    return True
+
+
+def in_progress(db: Session) -> bool:
+    return len(secrets_manager.get_encryption_keys()) > 1 and not is_complete(db)
+
+
+def begin() -> str:
+    """Add a new primary key. Returns its fingerprint."""
+    key = Fernet.generate_key().decode()
+    secrets_manager.add_encryption_key(key)
+    return fingerprint(key)
+
+
+def grace_period() -> float:
+    """How long to wait after begin() for every app process to load the new key."""
+    return settings.key_reload_seconds * 2 + 1
+
+
+def _rotate_batch(db: Session, table_name: str, columns: List[str], cp: RotationCheckpoint,
+                  primary: Fernet, multi: MultiFernet, batch_size: int) -> tuple[int, int, bool]:
+    # Untyped table so values are read and written as raw ciphertext
+    raw = sa.table(table_name, sa.column("id"), *(sa.column(c) for c in columns))
+    q = sa.select(raw).order_by(raw.c.id).limit(batch_size)
+    if cp.last_id is not None:
+        q = q.where(raw.c.id > cp.last_id)
+    rows = db.execute(q).all()
+
+    updates: Dict[str, list] = {c: [] for c in columns}
+    unreadable = 0
+    for row in rows:
+        for c in columns:
+            value = getattr(row, c)
+            if value is None:
+                continue
+            token = value.encode()
+            try:
+                primary.decrypt(token)
+                continue  # already under the primary key
+            except InvalidToken:
+                pass
+            try:
+                new = multi.rotate(token).decode()
+            except InvalidToken:
+                unreadable += 1
+                continue
+            updates[c].append({"_id": row.id, "_old": value, "_new": new})
+
+    rotated = 0
+    for c, params in updates.items():
+        if not params:
+            continue
+        stmt = (
+            sa.update(raw)
+            .where(raw.c.id == sa.bindparam("_id"))
+            .where(raw.c[c] == sa.bindparam("_old"))
+            .values({c: sa.bindparam("_new")})
+        )
+        db.execute(stmt, params)
+        rotated += len(params)
+
+    finished = len(rows) < batch_size
+    if rows:
+        cp.last_id = rows[-1].id
+    cp.rows_rotated += rotated
+    cp.done = finished
+    cp.updated_at = datetime.now(timezone.utc)
+    db.commit()
+    return rotated, unreadable, finished
+
+
+def run(
+    db: Session,
+    batch_size: int | None = None,
+    pause: float | None = None,
+    log: Callable[[str], None] = print,
+) -> int:
+    """Re-encrypt every table under the current primary key, resuming from checkpoints."""
+    batch_size = batch_size or settings.rotation_batch_size
+    pause = settings.rotation_pause_seconds if pause is None else pause
+
+    keys = secrets_manager.get_encryption_keys()
+    primary = Fernet(keys[0].encode())
+    multi = MultiFernet([Fernet(k.encode()) for k in keys])
+    key_fp = fingerprint(keys[0])
+
+    total = 0
+    for table_name, columns in encrypted_tables().items():
+        cp = _checkpoint(db, table_name, key_fp)
+        db.commit()
+        if cp.done:
+            log(f"{table_name}: already done ({cp.rows_rotated} values)")
+            continue
+        unreadable = 0
+        while True:
+            rotated, bad, finished = _rotate_batch(db, table_name, columns, cp, primary, multi, batch_size)
+            total += rotated
+            unreadable += bad
+            if finished:
+                break
+            time.sleep(pause)
+        log(f"{table_name}: {cp.rows_rotated} values re-encrypted")
+        if unreadable:
+            log(f"{table_name}: WARNING {unreadable} values could not be decrypted with any key and were left as-is")
+    return total
+
+
+def retire_old_keys(db: Session) -> int:
+    """Drop old keys once rotation is complete. Returns how many were retired."""
+    if not is_complete(db):
+        raise RuntimeError("Rotation has not completed; run `manage.py rotate-key` first.")
+    return len(secrets_manager.retire_old_encryption_keys())
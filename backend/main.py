@@ -1,13 +1,41 @@
-from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse
 import os
 
 from routers import auth, patients, appointments, symptoms, medications, calendar, search
-from routers import setup
+from routers import setup, imports, exports
 import secrets_manager
+from auth import get_current_user
+from config import get_settings
+from responses import FastJSONResponse
+from compression import CompressionMiddleware
+import metrics
+import query_profiler
+import static_assets
 
-app = FastAPI(title="MedVault", version="1.0.0", docs_url=None, redoc_url=None, openapi_url=None)
+settings = get_settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.metrics_port:
+        metrics.serve(settings.metrics_port, settings.metrics_host)
+    yield
+
+
+app = FastAPI(
+    title="MedVault",
+    version="1.0.0",
+    docs_url=None,
+    redoc_url=None,
+    openapi_url=None,
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
+)
+
+# Innermost, so it sees each route's own response (and its Content-Length)
+app.add_middleware(CompressionMiddleware)
 
 
 @app.middleware("http")
@@ -27,6 +55,17 @@ async def setup_guard(request: Request, call_next):
     return await call_next(request)
 
 
+app.add_middleware(query_profiler.QueryProfilerMiddleware)
+
+# Outermost, so request latency covers every other middleware
+app.add_middleware(metrics.MetricsMiddleware)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint(_=Depends(get_current_user)):
+    return metrics.response()
+
+
 # Setup (must be first so it works before the app is configured)
 app.include_router(setup.router)
 
@@ -38,29 +77,35 @@ app.include_router(symptoms.router)
 app.include_router(medications.router)
 app.include_router(calendar.router)
 app.include_router(search.router)
+app.include_router(imports.router)
+app.include_router(exports.router)
 
-# Serve frontend static files
+# Serve frontend static files (from memory, precompressed — see static_assets.py)
 frontend_path = os.path.join(os.path.dirname(__file__), "frontend")
 if os.path.isdir(frontend_path):
-    app.mount("/css", StaticFiles(directory=os.path.join(frontend_path, "css")), name="css")
-    app.mount("/js", StaticFiles(directory=os.path.join(frontend_path, "js")), name="js")
-    app.mount("/assets", StaticFiles(directory=os.path.join(frontend_path, "assets")), name="assets")
+    assets = static_assets.AssetStore(frontend_path)
+    assets.preload()
+
+    @app.get("/css/{path:path}", include_in_schema=False)
+    def serve_css(path: str, request: Request):
+        return static_assets.serve(assets, f"css/{path}", request)
+
+    @app.get("/js/{path:path}", include_in_schema=False)
+    def serve_js(path: str, request: Request):
+        return static_assets.serve(assets, f"js/{path}", request)
+
+    @app.get("/assets/{path:path}", include_in_schema=False)
+    def serve_assets(path: str, request: Request):
+        return static_assets.serve(assets, f"assets/{path}", request)
 
     @app.get("/manifest.json", include_in_schema=False)
-    def serve_manifest():
-        return FileResponse(
-            os.path.join(frontend_path, "manifest.json"),
-            media_type="application/manifest+json",
-        )
+    def serve_manifest(request: Request):
+        return static_assets.serve(assets, "manifest.json", request)
 
     @app.get("/sw.js", include_in_schema=False)
-    def serve_sw():
-        return FileResponse(
-            os.path.join(frontend_path, "sw.js"),
-            media_type="application/javascript",
-        )
+    def serve_sw(request: Request):
+        return static_assets.serve(assets, "sw.js", request)
 
     @app.get("/{full_path:path}", include_in_schema=False)
-    def serve_spa(full_path: str):
-        index = os.path.join(frontend_path, "index.html")
-        return FileResponse(index)
+    def serve_spa(full_path: str, request: Request):
+        return static_assets.serve(assets, "index.html", request)
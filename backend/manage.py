@@ -0,0 +1,112 @@
+"""
+Maintenance commands, run inside the app container:
+
+    docker-compose exec app python manage.py <command>
+
+Commands:
+    rebuild-search-index [--if-stale]   Re-derive the blind search index
+    rebuild-dose-rollup                 Recount the per-day dose rollup used by adherence
+    rebuild-calendar-summary            Recount the per-day calendar summary used by the heat map
+    rotate-key                          Start (or resume) an online encryption key rotation
+    retire-old-keys                     Drop pre-rotation keys once rotate-key has completed
+"""
+
+import argparse
+import sys
+import time
+
+from database import SessionLocal
+import calendar_summary
+import dose_rollup
+import key_rotation
+import search_index
+
+
+def rebuild_search_index(args) -> None:
+    db = SessionLocal()
+    try:
+        if args.if_stale and not search_index.is_stale(db):
+            print("Search index is up to date.")
+            return
+        count = search_index.rebuild(db)
+        print(f"Search index rebuilt: {count} records indexed.")
+    finally:
+        db.close()
+
+
+def rebuild_dose_rollup(args) -> None:
+    db = SessionLocal()
+    try:
+        count = dose_rollup.rebuild(db)
+        print(f"Dose rollup rebuilt: {count} medication-days.")
+    finally:
+        db.close()
+
+
+def rebuild_calendar_summary(args) -> None:
+    db = SessionLocal()
+    try:
+        count = calendar_summary.rebuild(db)
+        print(f"Calendar summary rebuilt: {count} patient-days.")
+    finally:
+        db.close()
+
+
+def rotate_key(args) -> None:
+    db = SessionLocal()
+    try:
+        if key_rotation.in_progress(db):
+            print("Resuming interrupted key rotation.")
+        else:
+            fp = key_rotation.begin()
+            wait = key_rotation.grace_period()
+            print(f"New primary key {fp} added. Waiting {wait:.0f}s for the app to load it...")
+            time.sleep(wait)
+        total = key_rotation.run(db, batch_size=args.batch_size, pause=args.pause)
+        print(f"Key rotation complete: {total} values re-encrypted.")
+        print("Old keys are still accepted for decryption. Once you have verified the data,")
+        print("run `python manage.py retire-old-keys`.")
+    finally:
+        db.close()
+
+
+def retire_old_keys(args) -> None:
+    db = SessionLocal()
+    try:
+        retired = key_rotation.retire_old_keys(db)
+        print(f"Retired {retired} old key(s).")
+    except RuntimeError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="manage.py", description="MedVault maintenance commands")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("rebuild-search-index", help="Rebuild the blind search index from all records")
+    p.add_argument("--if-stale", action="store_true", help="Only rebuild if the index is empty but records exist")
+    p.set_defaults(func=rebuild_search_index)
+
+    p = sub.add_parser("rebuild-dose-rollup", help="Recount medication_dose_days from all logged doses")
+    p.set_defaults(func=rebuild_dose_rollup)
+
+    p = sub.add_parser("rebuild-calendar-summary", help="Recount calendar_day_summary from all records")
+    p.set_defaults(func=rebuild_calendar_summary)
+
+    p = sub.add_parser("rotate-key", help="Re-encrypt all data under a new key while the app stays online")
+    p.add_argument("--batch-size", type=int, default=None, help="Rows per transaction")
+    p.add_argument("--pause", type=float, default=None, help="Seconds to sleep between batches")
+    p.set_defaults(func=rotate_key)
+
+    p = sub.add_parser("retire-old-keys", help="Remove old encryption keys after a completed rotation")
+    p.set_defaults(func=retire_old_keys)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
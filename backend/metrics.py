@@ -0,0 +1,192 @@
+"""
+Prometheus metrics.
+
+Exported at GET /metrics (requires a valid token, like the API) and, if
+settings.metrics_port is set, without auth on that separate port — meant for
+a scraper on the Docker network, since the port is not published.
+
+- medvault_http_request_duration_seconds{method,route,status}: latency per
+  route template (not raw path, so ids do not explode the label set), and
+  medvault_http_requests_in_progress
+- medvault_db_pool_*{pool}: connection checkouts and time spent waiting for
+  a connection (including opening a new one), plus checked-out and overflow
+  connections read at scrape time; pool is "sync" (database.engine) or
+  "async" (database.async_engine)
+- medvault_encrypt_seconds, medvault_decrypt_*: field encryption calls and
+  time, decryption recorded per batch rather than per value, and the
+  decryption cache hit/miss counters
+- medvault_password_hash_seconds{operation}: bcrypt time on its pool,
+  medvault_password_hash_rejected_total for 429s, and the pending count
+
+Everything on the hot path is a counter increment or histogram observation:
+prometheus_client holds a per-value lock for a float add, never across I/O.
+Label children are looked up once and kept in plain dicts. Gauges that
+describe current state (pool usage, cache size, pending hashes) are computed
+only when scraped.
+"""
+
+import time
+import weakref
+from typing import Dict, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest, start_http_server
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.responses import Response
+
+# ── HTTP ──────────────────────────────────────────────────────────────────────
+
+REQUEST_SECONDS = Histogram(
+    "medvault_http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+IN_PROGRESS = Gauge("medvault_http_requests_in_progress", "HTTP requests being handled")
+
+_request_children: Dict[Tuple[str, str, str], object] = {}
+
+
+class MetricsMiddleware:
+    """Pure ASGI; times each request from first byte in to the end of the response body."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_PROGRESS.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_PROGRESS.dec()
+            # The router stores the matched route in the (shared) scope
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            key = (scope["method"], route, str(status))
+            child = _request_children.get(key)
+            if child is None:
+                child = _request_children[key] = REQUEST_SECONDS.labels(*key)
+            child.observe(elapsed)
+
+
+# ── Database pools ────────────────────────────────────────────────────────────
+
+POOL_CHECKOUTS = Counter("medvault_db_pool_checkouts_total", "Connections checked out of the pool", ["pool"])
+POOL_WAIT_SECONDS = Histogram(
+    "medvault_db_pool_wait_seconds", "Time to get a connection from the pool", ["pool"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+
+# pool label -> current pool instance (engine.dispose() replaces it)
+_pools: Dict[str, "weakref.ReferenceType"] = {}
+
+
+class _TimedPool:
+    metrics_name = ""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._checkouts = POOL_CHECKOUTS.labels(self.metrics_name)
+        self._wait = POOL_WAIT_SECONDS.labels(self.metrics_name)
+        _pools[self.metrics_name] = weakref.ref(self)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        conn = super()._do_get()
+        self._wait.observe(time.perf_counter() - start)
+        self._checkouts.inc()
+        return conn
+
+
+class TimedQueuePool(_TimedPool, QueuePool):
+    """QueuePool for database.engine that records checkouts and wait time."""
+    metrics_name = "sync"
+
+
+class TimedAsyncQueuePool(_TimedPool, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool for database.async_engine that records checkouts and wait time."""
+    metrics_name = "async"
+
+
+# ── Encryption ────────────────────────────────────────────────────────────────
+
+ENCRYPT_SECONDS = Histogram(
+    "medvault_encrypt_seconds", "Time to encrypt one field value",
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01),
+)
+DECRYPT_VALUES = Counter("medvault_decrypt_values_total", "Field values decrypted (cache hits included)")
+DECRYPT_SECONDS = Counter("medvault_decrypt_seconds_total", "Time spent decrypting field values")
+DECRYPT_BATCH_SECONDS = Histogram(
+    "medvault_decrypt_batch_seconds", "Time to decrypt one batch (encryption.decrypt_many)",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+
+# ── Password hashing ──────────────────────────────────────────────────────────
+
+PASSWORD_HASH_SECONDS = Histogram(
+    "medvault_password_hash_seconds", "bcrypt time per hash or verification", ["operation"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0),
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "medvault_password_hash_rejected_total", "Hashing requests refused with 429 because the pool was full",
+)
+
+
+# ── Scrape-time state ─────────────────────────────────────────────────────────
+
+class _StateCollector:
+    def describe(self):
+        # Nothing to check at registration; collect() only runs on scrape
+        return []
+
+    def collect(self):
+        # Imported here: those modules import this one
+        import auth
+        import encryption
+
+        checked_out = GaugeMetricFamily("medvault_db_pool_checked_out", "Connections currently checked out", labels=["pool"])
+        overflow = GaugeMetricFamily("medvault_db_pool_overflow", "Connections open beyond pool_size", labels=["pool"])
+        size = GaugeMetricFamily("medvault_db_pool_size", "Configured pool size", labels=["pool"])
+        for name, ref in sorted(_pools.items()):
+            pool = ref()
+            if pool is None:
+                continue
+            checked_out.add_metric([name], pool.checkedout())
+            overflow.add_metric([name], max(pool.overflow(), 0))
+            size.add_metric([name], pool.size())
+        yield checked_out
+        yield overflow
+        yield size
+
+        stats = encryption.cache_stats()
+        yield CounterMetricFamily("medvault_decrypt_cache_hits", "Decryption cache hits", value=stats["hits"])
+        yield CounterMetricFamily("medvault_decrypt_cache_misses", "Decryption cache misses", value=stats["misses"])
+        yield GaugeMetricFamily("medvault_decrypt_cache_entries", "Decrypted values cached", value=stats["entries"])
+        yield GaugeMetricFamily("medvault_decrypt_cache_bytes", "Approximate bytes held by the decryption cache", value=stats["bytes"])
+
+        yield GaugeMetricFamily(
+            "medvault_password_hash_pending", "Hashes running or queued on the bcrypt pool", value=auth.hash_pending(),
+        )
+
+
+REGISTRY.register(_StateCollector())
+
+
+def response() -> Response:
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
+
+def serve(port: int, host: str) -> None:
+    """Expose the same registry on its own port from a daemon thread."""
+    start_http_server(port, addr=host, registry=REGISTRY)
@@ -3,5 +3,21 @@ from .appointment import Appointment
 from .symptom_log import SymptomLog
 from .medication import Medication
 from .medication_dose import MedicationDose
+from .medication_dose_day import MedicationDoseDay
+from .calendar_day_summary import CalendarDaySummary
+from .search_token import SearchToken
+from .rotation_checkpoint import RotationCheckpoint
+from .data_version import DataVersion
 
-__all__ = ["Patient", "Appointment", "SymptomLog", "Medication", "MedicationDose"]
+__all__ = [
+    "Patient",
+    "Appointment",
+    "SymptomLog",
+    "Medication",
+    "MedicationDose",
+    "MedicationDoseDay",
+    "CalendarDaySummary",
+    "SearchToken",
+    "RotationCheckpoint",
+    "DataVersion",
+]
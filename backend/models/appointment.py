@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import String, Boolean, ForeignKey
+from sqlalchemy import String, Boolean, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import DateTime
 from database import Base
@@ -19,3 +19,9 @@ class Appointment(Base):
     notes: Mapped[str | None] = mapped_column(EncryptedString, nullable=True)
 
     patient: Mapped["Patient"] = relationship("Patient", back_populates="appointments")
+
+    # Match the crud query shapes (alembic 0005)
+    __table_args__ = (
+        Index("ix_appointments_patient_datetime", "patient_id", "datetime", "id"),
+        Index("ix_appointments_datetime_id", "datetime", "id"),
+    )
@@ -0,0 +1,23 @@
+from sqlalchemy import String, Integer, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.types import Date
+from database import Base
+
+
+class CalendarDaySummary(Base):
+    """Events per patient per (UTC) day — a summary kept by calendar_summary.py."""
+    __tablename__ = "calendar_day_summary"
+
+    patient_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("patients.id", ondelete="CASCADE"), primary_key=True,
+    )
+    day: Mapped[Date] = mapped_column(Date, primary_key=True)
+    appointments: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    symptoms: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    medications: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # ended medications only
+    max_severity: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # 0 = no symptoms
+
+    # The primary key serves one patient's month; this serves everyone's
+    __table_args__ = (
+        Index("ix_calendar_day_summary_day", "day", "patient_id"),
+    )
@@ -0,0 +1,11 @@
+from sqlalchemy import String, BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+from database import Base
+
+
+class DataVersion(Base):
+    """Change counter for one table, bumped by every write — see data_versions.py."""
+    __tablename__ = "data_versions"
+
+    table_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import String, Integer, Boolean, ForeignKey
+from sqlalchemy import String, Integer, Boolean, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import Date
 from database import Base
@@ -24,3 +24,12 @@ class Medication(Base):
     doses: Mapped[list["MedicationDose"]] = relationship(
         "MedicationDose", back_populates="medication", cascade="all, delete-orphan"
     )
+
+    # Match the crud query shapes (alembic 0005); the last two serve the
+    # "is_ongoing OR end_date >= :from" test in active-range queries
+    __table_args__ = (
+        Index("ix_medications_patient_start_date", "patient_id", "start_date", "id"),
+        Index("ix_medications_start_date_id", "start_date", "id"),
+        Index("ix_medications_ongoing_start_date", "start_date", postgresql_where=text("is_ongoing")),
+        Index("ix_medications_end_date_start_date", "end_date", "start_date"),
+    )
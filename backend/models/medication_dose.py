@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import String, Float, ForeignKey
+from sqlalchemy import String, Float, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import DateTime
 from database import Base
@@ -16,3 +16,8 @@ class MedicationDose(Base):
     notes: Mapped[str | None] = mapped_column(EncryptedString, nullable=True)
 
     medication: Mapped["Medication"] = relationship("Medication", back_populates="doses")
+
+    # Match the crud query shapes (alembic 0005)
+    __table_args__ = (
+        Index("ix_medication_doses_medication_taken_at", "medication_id", "taken_at", "id"),
+    )
@@ -0,0 +1,16 @@
+from sqlalchemy import String, Integer, Float, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.types import Date
+from database import Base
+
+
+class MedicationDoseDay(Base):
+    """Doses logged per medication per (UTC) day — a rollup kept by dose_rollup.py."""
+    __tablename__ = "medication_dose_days"
+
+    medication_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("medications.id", ondelete="CASCADE"), primary_key=True,
+    )
+    day: Mapped[Date] = mapped_column(Date, primary_key=True)
+    doses: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    quantity: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
@@ -0,0 +1,16 @@
+from sqlalchemy import String, Integer, Boolean
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.types import DateTime
+from database import Base
+
+
+class RotationCheckpoint(Base):
+    """Progress of the key rotation job through one table — see key_rotation.py."""
+    __tablename__ = "rotation_checkpoints"
+
+    table_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    key_fingerprint: Mapped[str] = mapped_column(String(16), nullable=False)
+    last_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    rows_rotated: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    done: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    updated_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,22 @@
+from sqlalchemy import String, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from database import Base
+
+
+class SearchToken(Base):
+    """
+    Blind index over searchable text. Each row says "entity <entity_id> of
+    <entity_type> contains the n-gram whose keyed HMAC is <token>".
+    No plaintext is stored here — see search_index.py.
+    """
+    __tablename__ = "search_tokens"
+
+    token: Mapped[str] = mapped_column(String(16), primary_key=True)
+    entity_type: Mapped[str] = mapped_column(String(20), primary_key=True)
+    entity_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    patient_id: Mapped[str] = mapped_column(String(36), nullable=False)
+
+    __table_args__ = (
+        Index("ix_search_tokens_entity", "entity_type", "entity_id"),
+        Index("ix_search_tokens_patient_id", "patient_id"),
+    )
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import String, Integer, ForeignKey
+from sqlalchemy import String, Integer, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import DateTime
 from database import Base
@@ -18,3 +18,9 @@ class SymptomLog(Base):
     notes: Mapped[str | None] = mapped_column(EncryptedString, nullable=True)
 
     patient: Mapped["Patient"] = relationship("Patient", back_populates="symptom_logs")
+
+    # Match the crud query shapes (alembic 0005)
+    __table_args__ = (
+        Index("ix_symptom_logs_patient_logged_at", "patient_id", "logged_at", "id"),
+        Index("ix_symptom_logs_logged_at_id", "logged_at", "id"),
+    )
@@ -0,0 +1,98 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Lists are ordered newest-first by (sort column, id). The cursor is an opaque
+base64url token encoding the (sort value, id) of the last row on the previous
+page, so fetching the next page is an indexed range scan rather than an
+OFFSET — page cost stays constant no matter how much history exists.
+
+List endpoints accept:
+    limit   page size (omit for the full list, as before)
+    cursor  X-Next-Cursor value from the previous page
+    count   set to false to skip the X-Total-Count query
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, or_
+
+from encryption import load_all
+
+MAX_LIMIT = 500
+
+
+@dataclass
+class Page:
+    items: List[Any]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+class PageParams:
+    """FastAPI dependency collecting the pagination query parameters."""
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+        cursor: Optional[str] = Query(None),
+        count: bool = Query(True),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.count = count
+
+
+def encode_cursor(sort_value, row_id: str) -> str:
+    raw = json.dumps([sort_value.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, python_type) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+        return python_type.fromisoformat(value), str(row_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(q, sort_col, id_col, params: PageParams) -> Page:
+    """
+    Apply newest-first keyset pagination to q. sort_col must be non-null;
+    id_col breaks ties so rows sharing a timestamp are never skipped.
+    """
+    total = None
+    if params.count and (params.limit is not None or params.cursor):
+        total = q.order_by(None).count()
+
+    if params.cursor:
+        value, row_id = decode_cursor(params.cursor, sort_col.type.python_type)
+        q = q.filter(or_(sort_col < value, and_(sort_col == value, id_col < row_id)))
+
+    q = q.order_by(sort_col.desc(), id_col.desc())
+    if params.limit is None:
+        items = load_all(q)
+        if params.count and total is None:
+            total = len(items)
+        return Page(items=items, total=total)
+
+    # Fetch one extra row to learn whether another page exists
+    rows = load_all(q.limit(params.limit + 1))
+    items = rows[:params.limit]
+    next_cursor = None
+    if len(rows) > params.limit:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, sort_col.key), getattr(last, id_col.key))
+    return Page(items=items, next_cursor=next_cursor, total=total)
+
+
+def set_page_headers(response: Response, page: Page) -> None:
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if page.total is not None:
+        response.headers["X-Total-Count"] = str(page.total)
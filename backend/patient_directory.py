@@ -0,0 +1,65 @@
+"""
+Process-wide directory of patients' id, name and color.
+
+Routes that only need to label records with a patient (search) read it from
+here instead of loading Patient rows, which would also decrypt every
+patient's notes. The directory loads lazily and is reloaded when:
+
+- crud.patient creates, updates or deletes a patient in this process
+  (invalidate()), or
+- the "patients" data version differs from the one it was loaded at, which
+  catches writes made by other workers. The check is a single primary-key
+  lookup per use.
+
+Concurrent reloads each run the (small) query and the newest result is kept;
+nothing is awaited under the lock, so the directory works from any event
+loop or thread.
+"""
+
+import threading
+from typing import Dict, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.data_version import DataVersion
+from models.patient import Patient
+
+
+class PatientEntry(NamedTuple):
+    id: str
+    name: str
+    color: str
+
+
+_entries: Dict[str, PatientEntry] = {}
+_version: Optional[int] = None
+_lock = threading.Lock()
+
+
+def invalidate() -> None:
+    global _version
+    with _lock:
+        _version = None
+
+
+async def _current_version(db: AsyncSession) -> int:
+    version = await db.scalar(select(DataVersion.version).where(DataVersion.table_name == "patients"))
+    return version or 0
+
+
+async def get(db: AsyncSession) -> Dict[str, PatientEntry]:
+    """id -> PatientEntry, reloaded first if patients changed since the last load."""
+    global _entries, _version
+    version = await _current_version(db)
+    if version == _version:
+        return _entries
+    # Version is read before the rows, so a concurrent write can only make the
+    # next check reload again — never leave stale entries.
+    rows = await db.execute(select(Patient.id, Patient.name, Patient.color))
+    entries = {r.id: PatientEntry(r.id, r.name, r.color) for r in rows}
+    with _lock:
+        # Concurrent reloads may finish out of order; keep the newest
+        if _version is None or version >= _version:
+            _entries, _version = entries, version
+    return entries
@@ -0,0 +1,45 @@
+"""
+Field projection for list endpoints.
+
+`?fields=reason,notes` limits a list response to the named fields plus the
+fields its response schema requires. Unrequested columns are deferred with
+SQLAlchemy load_only, so encrypted columns that nobody asked for are never
+fetched from the database and never decrypted.
+
+Routes using projection set response_model_exclude_unset=True so deferred
+fields are omitted from the JSON rather than returned as null.
+"""
+
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy.orm import load_only
+
+
+def parse_fields(fields: Optional[str], schema: type[BaseModel]) -> Optional[List[str]]:
+    """Resolve a comma-separated fields= value against schema. None means all fields."""
+    if not fields:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - schema.model_fields.keys()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(sorted(unknown))}")
+    return [
+        name for name, info in schema.model_fields.items()
+        if name in requested or info.is_required()
+    ]
+
+
+def with_fields(q, model, fields: Optional[Sequence[str]]):
+    """Defer every column of model that is not in fields."""
+    if fields is None:
+        return q
+    return q.options(load_only(*(getattr(model, f) for f in fields)))
+
+
+def project(items: List[Any], fields: Optional[Sequence[str]]) -> List[Any]:
+    """Turn ORM rows into dicts of the loaded fields only, without triggering lazy loads."""
+    if fields is None:
+        return items
+    return [{f: getattr(obj, f) for f in fields} for obj in items]
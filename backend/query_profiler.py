@@ -0,0 +1,164 @@
+"""
+Per-request SQL profiling.
+
+Cursor execute hooks on database.engine and database.async_engine count the
+statements each request runs and the time spent in them. The numbers are
+collected into a Profile held in a ContextVar, so they follow the request
+through run_sync, the threadpool and crud.aio without being passed around.
+
+- With settings.debug, every response carries X-DB-Query-Count,
+  X-DB-Time-Ms and a Server-Timing entry (visible in browser devtools).
+- A statement slower than settings.slow_query_ms is logged to the
+  "medvault.sql" logger with the route that issued it.
+- Lazy relationship loads (Patient.appointments, Medication.doses, ...) are
+  counted per relationship. One relationship lazily loaded for more than one
+  object within a request is an N+1: the crud query should have loaded it up
+  front. It is logged, or raised as NPlusOneError under profile(strict=True).
+
+Tests and benchmarks can profile any block of code directly:
+
+    with query_profiler.profile(strict=True) as p:
+        crud.medication.get_medications(db, patient_id=pid)
+    assert p.count <= 2
+
+The hooks only do a perf_counter() read and a few additions per statement,
+and nothing at all outside a profile.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger("medvault.sql")
+
+
+class NPlusOneError(AssertionError):
+    """A relationship was lazily loaded once per object within a strict profile."""
+
+
+class Profile:
+    def __init__(self, label: str = "", strict: bool = False, scope: Optional[dict] = None):
+        self.label = label
+        self.strict = strict
+        self.scope = scope  # ASGI scope, for the route template once routing has happened
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: List[str] = []  # only under strict, for assertion messages
+        self.lazy_loads: Counter = Counter()  # "Patient.appointments" -> loads
+        self._reported: set = set()
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route") if self.scope else None
+        if route is not None:
+            return f"{self.scope['method']} {route.path}"
+        return self.label
+
+    @property
+    def n_plus_one(self) -> List[str]:
+        """Relationships lazily loaded more than once in this profile."""
+        return sorted(rel for rel, n in self.lazy_loads.items() if n > 1)
+
+    def _record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.seconds += elapsed
+        if self.strict:
+            self.statements.append(statement)
+        if elapsed * 1000 >= settings.slow_query_ms:
+            logger.warning("Slow query (%.1f ms) in %s: %s", elapsed * 1000, self.route or "-", " ".join(statement.split()))
+
+    def _lazy_load(self, relationship: str) -> None:
+        self.lazy_loads[relationship] += 1
+        if self.lazy_loads[relationship] > 1 and relationship not in self._reported:
+            self._reported.add(relationship)
+            message = f"N+1: {relationship} lazily loaded per object in {self.route or '-'}"
+            if self.strict:
+                raise NPlusOneError(message)
+            logger.warning(message)
+
+
+_current: ContextVar[Optional[Profile]] = ContextVar("_current_profile", default=None)
+
+
+def current() -> Optional[Profile]:
+    return _current.get()
+
+
+@contextmanager
+def profile(label: str = "", strict: bool = False, scope: Optional[dict] = None):
+    """Collect SQL statistics for everything run inside the block (nested blocks start fresh)."""
+    p = Profile(label, strict, scope)
+    token = _current.set(p)
+    try:
+        yield p
+    finally:
+        _current.reset(token)
+
+
+# ── Hooks ─────────────────────────────────────────────────────────────────────
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    p = _current.get()
+    if p is None:
+        return
+    starts = conn.info.get("query_start")
+    if starts:
+        p._record(statement, time.perf_counter() - starts.pop())
+
+
+def _on_orm_execute(state) -> None:
+    p = _current.get()
+    if p is None or not state.is_select or state.lazy_loaded_from is None:
+        return
+    prop = state.loader_strategy_path[-1]
+    p._lazy_load(f"{prop.parent.class_.__name__}.{prop.key}")
+
+
+def instrument(engine) -> None:
+    """Attach the cursor hooks to a (sync) Engine; use async_engine.sync_engine for async ones."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# Every Session, including the one behind each AsyncSession
+event.listen(Session, "do_orm_execute", _on_orm_execute)
+
+
+# ── Middleware ────────────────────────────────────────────────────────────────
+
+class QueryProfilerMiddleware:
+    """Profiles each HTTP request; adds the totals as response headers in debug mode."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        with profile(scope["path"], scope=scope) as p:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start" and settings.debug:
+                    ms = f"{p.seconds * 1000:.1f}"
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-db-query-count", str(p.count).encode()),
+                        (b"x-db-time-ms", ms.encode()),
+                        (b"server-timing", f'db;dur={ms};desc="{p.count} queries"'.encode()),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
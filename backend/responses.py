@@ -0,0 +1,45 @@
+"""
+Fast JSON responses.
+
+main.py makes FastJSONResponse the default response class, so every route's
+output is encoded by orjson rather than the stdlib json module.
+
+Large responses (calendar, search) go one step further: the route builds
+plain dicts already in the shape of its response model and returns them with
+prepared(), which skips FastAPI's response_model validation and serialization
+passes — the data is encoded exactly once. The response_model on those
+routes still documents the shape; keeping the dicts in that shape is the
+route's job (see blank()).
+"""
+
+from typing import Any, Dict
+
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+class FastJSONResponse(ORJSONResponse):
+    """orjson, with UTC datetimes written as ...Z like Pydantic does."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+
+
+def blank(model: type[BaseModel]) -> Dict[str, Any]:
+    """Every field of model set to None, as a template for dict(blank, **values)."""
+    return {name: None for name in model.model_fields}
+
+
+def prepared(content: Any, response: Response) -> FastJSONResponse:
+    """
+    Encode content as-is. response is the route's injected Response; headers
+    dependencies set on it (ETag, pagination) are carried over, since FastAPI
+    drops them when a route returns its own Response.
+    """
+    out = FastJSONResponse(content)
+    for key, value in response.headers.items():
+        if key != "content-length":
+            out.headers[key] = value
+    return out
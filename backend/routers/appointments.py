@@ -1,56 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
 
 from auth import get_current_user
-from database import get_db
+import data_versions
+from database import get_async_db
+from pagination import PageParams, set_page_headers
+from projection import parse_fields, project
 from schemas.appointment import AppointmentCreate, AppointmentUpdate, AppointmentResponse
-import crud.appointment as appt_crud
+import crud.aio.appointment as appt_crud
 
 router = APIRouter(prefix="/api/appointments", tags=["appointments"])
 
 
-@router.get("", response_model=List[AppointmentResponse])
-def list_appointments(
+@router.get("", response_model=List[AppointmentResponse], response_model_exclude_unset=True)
+async def list_appointments(
+    response: Response,
     patient_id: Optional[str] = Query(None),
     from_dt: Optional[datetime] = Query(None, alias="from"),
     to_dt: Optional[datetime] = Query(None, alias="to"),
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None),
+    page_params: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(get_current_user),
+    _etag=Depends(data_versions.conditional("appointments")),
 ):
-    return appt_crud.get_appointments(db, patient_id=patient_id, from_dt=from_dt, to_dt=to_dt)
+    selected = parse_fields(fields, AppointmentResponse)
+    page = await appt_crud.get_appointments_page(
+        db, page_params, patient_id=patient_id, from_dt=from_dt, to_dt=to_dt, fields=selected,
+    )
+    set_page_headers(response, page)
+    return project(page.items, selected)
 
 
 @router.post("", response_model=AppointmentResponse, status_code=status.HTTP_201_CREATED)
-def create_appointment(data: AppointmentCreate, db: Session = Depends(get_db), _=Depends(get_current_user)):
-    return appt_crud.create_appointment(db, data)
+async def create_appointment(data: AppointmentCreate, db: AsyncSession = Depends(get_async_db), _=Depends(get_current_user)):
+    return await appt_crud.create_appointment(db, data)
 
 
 @router.get("/{appointment_id}", response_model=AppointmentResponse)
-def get_appointment(appointment_id: str, db: Session = Depends(get_db), _=Depends(get_current_user)):
-    appt = appt_crud.get_appointment(db, appointment_id)
+async def get_appointment(appointment_id: str, db: AsyncSession = Depends(get_async_db), _=Depends(get_current_user)):
+    appt = await appt_crud.get_appointment(db, appointment_id)
     if not appt:
         raise HTTPException(status_code=404, detail="Appointment not found")
     return appt
 
 
 @router.put("/{appointment_id}", response_model=AppointmentResponse)
-def update_appointment(
+async def update_appointment(
     appointment_id: str,
     data: AppointmentUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(get_current_user),
 ):
-    appt = appt_crud.get_appointment(db, appointment_id)
+    appt = await appt_crud.get_appointment(db, appointment_id)
     if not appt:
         raise HTTPException(status_code=404, detail="Appointment not found")
-    return appt_crud.update_appointment(db, appt, data)
+    return await appt_crud.update_appointment(db, appt, data)
 
 
 @router.delete("/{appointment_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_appointment(appointment_id: str, db: Session = Depends(get_db), _=Depends(get_current_user)):
-    appt = appt_crud.get_appointment(db, appointment_id)
+async def delete_appointment(appointment_id: str, db: AsyncSession = Depends(get_async_db), _=Depends(get_current_user)):
+    appt = await appt_crud.get_appointment(db, appointment_id)
     if not appt:
         raise HTTPException(status_code=404, detail="Appointment not found")
-    appt_crud.delete_appointment(db, appt)
+    await appt_crud.delete_appointment(db, appt)
@@ -1,13 +1,13 @@
 from fastapi import APIRouter, HTTPException, status, Depends
-from auth import verify_password, create_access_token, get_current_user
+from auth import verify_password_async, create_access_token, get_current_user
 from schemas.auth import LoginRequest, TokenResponse
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(body: LoginRequest):
-    if not verify_password(body.password):
+async def login(body: LoginRequest):
+    if not await verify_password_async(body.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid password",
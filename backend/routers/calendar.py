@@ -1,98 +1,138 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from datetime import datetime, date, timezone
+from datetime import datetime, date, timezone, timedelta
+import calendar
 
 from auth import get_current_user
-from database import get_db
-from schemas.calendar import CalendarResponse, CalendarEvent
-import crud.appointment as appt_crud
-import crud.symptom_log as symptom_crud
-import crud.medication as med_crud
-import crud.patient as patient_crud
+import data_versions
+from database import get_async_db
+from schemas.calendar import CalendarResponse, CalendarEvent, CalendarSummaryResponse
+import crud.aio.calendar as calendar_crud
+from responses import blank, prepared
 
 router = APIRouter(prefix="/api/calendar", tags=["calendar"])
 
+_EVENT = blank(CalendarEvent)
+
 
 @router.get("", response_model=CalendarResponse)
-def get_calendar(
+async def get_calendar(
+    response: Response,
     from_dt: datetime = Query(..., alias="from"),
     to_dt: datetime = Query(..., alias="to"),
     patient_id: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    compact: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(get_current_user),
+    _etag=Depends(data_versions.conditional("patients", "appointments", "symptom_logs", "medications")),
 ):
-    # Build a patient lookup for name/color
-    patients = {p.id: p for p in patient_crud.get_patients(db)}
-
-    events: list[CalendarEvent] = []
-
-    # Appointments
-    appointments = appt_crud.get_appointments(db, patient_id=patient_id, from_dt=from_dt, to_dt=to_dt)
-    for appt in appointments:
-        p = patients.get(appt.patient_id)
-        if not p:
-            continue
-        events.append(CalendarEvent(
-            id=appt.id,
-            type="appointment",
-            patient_id=appt.patient_id,
-            patient_name=p.name,
-            patient_color=p.color,
-            datetime=appt.datetime,
-            title=appt.provider_name,
-            detail=appt.reason,
-            follow_up_required=appt.follow_up_required,
-        ))
-
-    # Symptom logs
-    symptoms = symptom_crud.get_symptom_logs(db, patient_id=patient_id, from_dt=from_dt, to_dt=to_dt)
-    for sym in symptoms:
-        p = patients.get(sym.patient_id)
-        if not p:
-            continue
-        events.append(CalendarEvent(
-            id=sym.id,
-            type="symptom",
-            patient_id=sym.patient_id,
-            patient_name=p.name,
-            patient_color=p.color,
-            datetime=sym.logged_at,
-            title=f"Symptom (severity {sym.severity})",
-            detail=sym.description,
-            severity=sym.severity,
-        ))
+    """
+    With compact=true, each active medication is returned as a single span
+    event (datetime = first visible day, end = last visible day) instead of
+    one event per day; the client expands spans itself.
 
-    # Active medications — emit one event per day they are active in range
+    Events are built as CalendarEvent-shaped dicts and encoded once (see responses.py).
+    """
+    events: list[dict] = []
     from_date = from_dt.date()
     to_date = to_dt.date()
-    meds = med_crud.get_active_medications_for_range(db, from_date, to_date, patient_id=patient_id)
-    from datetime import timedelta
-    for med in meds:
-        p = patients.get(med.patient_id)
-        if not p:
-            continue
-        # Clamp to visible range
-        med_start = max(med.start_date, from_date)
-        if med.is_ongoing:
-            med_end = to_date
-        else:
-            med_end = min(med.end_date, to_date) if med.end_date else to_date
-
-        current = med_start
-        while current <= med_end:
-            events.append(CalendarEvent(
-                id=f"{med.id}:{current.isoformat()}",
-                type="medication",
-                patient_id=med.patient_id,
-                patient_name=p.name,
-                patient_color=p.color,
-                datetime=datetime.combine(current, datetime.min.time(), tzinfo=timezone.utc),
-                title=f"{med.name} {med.dosage}",
-                detail=f"{med.frequency_per_day}x/day",
-                is_ongoing=med.is_ongoing,
+
+    for row in await calendar_crud.get_events(db, from_dt, to_dt, patient_id=patient_id):
+        patient = dict(
+            patient_id=row["patient_id"],
+            patient_name=row["patient_name"],
+            patient_color=row["patient_color"],
+        )
+        if row["kind"] == "appointment":
+            events.append(dict(
+                _EVENT,
+                id=row["id"],
+                type="appointment",
+                **patient,
+                datetime=row["at"],
+                title=row["title"],
+                detail=row["detail"],
+                follow_up_required=row["follow_up_required"],
             ))
-            current += timedelta(days=1)
+        elif row["kind"] == "symptom":
+            events.append(dict(
+                _EVENT,
+                id=row["id"],
+                type="symptom",
+                **patient,
+                datetime=row["at"],
+                title=f"Symptom (severity {row['severity']})",
+                detail=row["detail"],
+                severity=row["severity"],
+            ))
+        else:
+            events.extend(_medication_events(row, patient, from_date, to_date, compact))
+
+    events.sort(key=lambda e: _as_utc(e["datetime"]))
+    return prepared({"events": events}, response)
 
-    events.sort(key=lambda e: e.datetime)
-    return CalendarResponse(events=events)
+
+@router.get("/summary", response_model=CalendarSummaryResponse)
+async def get_calendar_summary(
+    year: int = Query(..., ge=1, le=9999),
+    month: int = Query(..., ge=1, le=12),
+    patient_id: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    _=Depends(get_current_user),
+    _etag=Depends(data_versions.conditional("patients", "appointments", "symptom_logs", "medications")),
+):
+    """
+    Month view: event counts and max symptom severity per UTC day and patient,
+    read from calendar_day_summary (see calendar_summary.py). Nothing is
+    decrypted; the client loads a day's events when it is opened.
+    """
+    first = date(year, month, 1)
+    last = date(year, month, calendar.monthrange(year, month)[1])
+    days = await calendar_crud.get_day_summary(db, first, last, patient_id=patient_id)
+    return {"year": year, "month": month, "days": days}
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite (benchmarks, local runs) returns naive datetimes; stored values are UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _medication_events(row: dict, patient: dict, from_date: date, to_date: date, compact: bool) -> list[dict]:
+    """One event per day the medication is active in range, or one span if compact."""
+    # Clamp to visible range
+    med_start = max(row["start_date"], from_date)
+    if row["is_ongoing"]:
+        med_end = to_date
+    else:
+        med_end = min(row["end_date"], to_date) if row["end_date"] else to_date
+
+    if med_end < med_start:
+        return []
+
+    common = dict(
+        _EVENT,
+        type="medication",
+        **patient,
+        title=f"{row['title']} {row['dosage']}",
+        detail=f"{row['frequency_per_day']}x/day",
+        is_ongoing=row["is_ongoing"],
+    )
+    if compact:
+        return [dict(
+            common,
+            id=row["id"],
+            datetime=datetime.combine(med_start, datetime.min.time(), tzinfo=timezone.utc),
+            end=datetime.combine(med_end, datetime.min.time(), tzinfo=timezone.utc),
+        )]
+
+    events = []
+    current = med_start
+    while current <= med_end:
+        events.append(dict(
+            common,
+            id=f"{row['id']}:{current.isoformat()}",
+            datetime=datetime.combine(current, datetime.min.time(), tzinfo=timezone.utc),
+        ))
+        current += timedelta(days=1)
+    return events
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+
+from auth import get_current_user
+import bulk_export
+import bulk_import
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+
+@router.get("")
+def export_records(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    type: Optional[str] = Query(None),
+    _=Depends(get_current_user),
+):
+    """
+    Stream the whole vault (or one record type) as NDJSON, or one record type
+    as CSV. The output can be fed back into /api/import unchanged.
+    """
+    if type is not None and type not in bulk_import.ENTITIES:
+        raise HTTPException(status_code=400, detail=f"Unknown type. Use one of: {', '.join(bulk_import.ENTITIES)}")
+    name = f"medvault-{type or 'export'}"
+    if format == "csv":
+        if type is None:
+            raise HTTPException(status_code=400, detail="CSV exports require ?type=")
+        body, media_type, name = bulk_export.csv_rows(type), "text/csv", name + ".csv"
+    else:
+        body, media_type, name = bulk_export.ndjson([type] if type else None), "application/x-ndjson", name + ".ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}"'},
+    )
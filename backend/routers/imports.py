@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from typing import Optional
+
+from auth import get_current_user
+from schemas.imports import ImportReport
+import bulk_import
+
+router = APIRouter(prefix="/api/import", tags=["import"])
+
+
+@router.post("", response_model=ImportReport)
+async def import_records(
+    request: Request,
+    type: Optional[str] = Query(None),
+    _=Depends(get_current_user),
+):
+    """
+    Stream NDJSON (application/x-ndjson, the default) or CSV (text/csv) records
+    into the vault. See bulk_import.py for the formats.
+    """
+    is_csv = request.headers.get("content-type", "").startswith("text/csv")
+    if type is not None and type not in bulk_import.ENTITIES:
+        raise HTTPException(status_code=400, detail=f"Unknown type. Use one of: {', '.join(bulk_import.ENTITIES)}")
+    if is_csv and type is None:
+        raise HTTPException(status_code=400, detail="CSV imports require ?type=")
+    return await bulk_import.run(request.stream(), is_csv, type)
@@ -1,81 +1,120 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+from datetime import date
 
 from auth import get_current_user
-from database import get_db
+import data_versions
+from database import get_async_db
+from pagination import PageParams, set_page_headers
+from projection import parse_fields, project
 from schemas.medication import (
     MedicationCreate, MedicationUpdate, MedicationResponse,
     MedicationDoseCreate, MedicationDoseResponse,
 )
-import crud.medication as med_crud
+from schemas.adherence import MedicationAdherence
+import crud.aio.medication as med_crud
+import crud.aio.adherence as adherence_crud
 
 router = APIRouter(prefix="/api/medications", tags=["medications"])
 
 
-@router.get("", response_model=List[MedicationResponse])
-def list_medications(
+@router.get("", response_model=List[MedicationResponse], response_model_exclude_unset=True)
+async def list_medications(
+    response: Response,
     patient_id: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None),
+    page_params: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(get_current_user),
+    _etag=Depends(data_versions.conditional("medications")),
 ):
-    return med_crud.get_medications(db, patient_id=patient_id)
+    selected = parse_fields(fields, MedicationResponse)
+    page = await med_crud.get_medications_page(db, page_params, patient_id=patient_id, fields=selected)
+    set_page_headers(response, page)
+    return project(page.items, selected)
 
 
 @router.post("", response_model=MedicationResponse, status_code=status.HTTP_201_CREATED)
-def create_medication(data: MedicationCreate, db: Session = Depends(get_db), _=Depends(get_current_user)):
-    return med_crud.create_medication(db, data)
+async def create_medication(data: MedicationCreate, db: AsyncSession = Depends(get_async_db), _=Depends(get_current_user)):
+    return await med_crud.create_medication(db, data)
 
 
 @router.get("/{medication_id}", response_model=MedicationResponse)
-def get_medication(medication_id: str, db: Session = Depends(get_db), _=Depends(get_current_user)):
-    med = med_crud.get_medication(db, medication_id)
+async def get_medication(medication_id: str, db: AsyncSession = Depends(get_async_db), _=Depends(get_current_user)):
+    med = await med_crud.get_medication(db, medication_id)
     if not med:
         raise HTTPException(status_code=404, detail="Medication not found")
     return med
 
 
 @router.put("/{medication_id}", response_model=MedicationResponse)
-def update_medication(
+async def update_medication(
     medication_id: str,
     data: MedicationUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(get_current_user),
 ):
-    med = med_crud.get_medication(db, medication_id)
+    med = await med_crud.get_medication(db, medication_id)
     if not med:
         raise HTTPException(status_code=404, detail="Medication not found")
-    return med_crud.update_medication(db, med, data)
+    return await med_crud.update_medication(db, med, data)
 
 
 @router.delete("/{medication_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_medication(medication_id: str, db: Session = Depends(get_db), _=Depends(get_current_user)):
-    med = med_crud.get_medication(db, medication_id)
+async def delete_medication(medication_id: str, db: AsyncSession = Depends(get_async_db), _=Depends(get_current_user)):
+    med = await med_crud.get_medication(db, medication_id)
     if not med:
         raise HTTPException(status_code=404, detail="Medication not found")
-    med_crud.delete_medication(db, med)
+    await med_crud.delete_medication(db, med)
 
 
 @router.post("/{medication_id}/doses", response_model=MedicationDoseResponse, status_code=status.HTTP_201_CREATED)
-def log_dose(
+async def log_dose(
     medication_id: str,
     data: MedicationDoseCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(get_current_user),
 ):
-    med = med_crud.get_medication(db, medication_id)
+    med = await med_crud.get_medication(db, medication_id)
     if not med:
         raise HTTPException(status_code=404, detail="Medication not found")
-    return med_crud.create_dose(db, medication_id, data)
+    return await med_crud.create_dose(db, medication_id, data)
 
 
-@router.get("/{medication_id}/doses", response_model=List[MedicationDoseResponse])
-def list_doses(
+@router.get("/{medication_id}/doses", response_model=List[MedicationDoseResponse], response_model_exclude_unset=True)
+async def list_doses(
     medication_id: str,
-    db: Session = Depends(get_db),
+    response: Response,
+    fields: Optional[str] = Query(None),
+    page_params: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(get_current_user),
+    _etag=Depends(data_versions.conditional("medication_doses")),
 ):
-    med = med_crud.get_medication(db, medication_id)
+    selected = parse_fields(fields, MedicationDoseResponse)
+    med = await med_crud.get_medication(db, medication_id)
     if not med:
         raise HTTPException(status_code=404, detail="Medication not found")
-    return med_crud.get_doses(db, medication_id)
+    page = await med_crud.get_doses_page(db, medication_id, page_params, fields=selected)
+    set_page_headers(response, page)
+    return project(page.items, selected)
+
+
+@router.get("/{medication_id}/adherence", response_model=MedicationAdherence)
+async def get_adherence(
+    medication_id: str,
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    db: AsyncSession = Depends(get_async_db),
+    _=Depends(get_current_user),
+    _etag=Depends(data_versions.conditional("medications", "medication_doses")),
+):
+    """Expected vs. taken doses per day in [from, to], from the daily dose rollup (see dose_rollup.py)."""
+    if to_date < from_date:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    med = await med_crud.get_medication(db, medication_id)
+    if not med:
+        raise HTTPException(status_code=404, detail="Medication not found")
+    result = await adherence_crud.get_medication_adherence(db, medication_id, from_date, to_date)
+    return MedicationAdherence(medication_id=medication_id, from_date=from_date, to_date=to_date, **result)
@@ -1,44 +1,71 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
+from datetime import date
 
 from auth import get_current_user
-from database import get_db
+import data_versions
+from database import get_async_db
 from schemas.patient import PatientCreate, PatientUpdate, PatientResponse
-import crud.patient as patient_crud
+from schemas.adherence import PatientAdherence
+import crud.aio.patient as patient_crud
+import crud.aio.adherence as adherence_crud
 
 router = APIRouter(prefix="/api/patients", tags=["patients"])
 
 
 @router.get("", response_model=List[PatientResponse])
-def list_patients(db: Session = Depends(get_db), _=Depends(get_current_user)):
-    return patient_crud.get_patients(db)
+async def list_patients(
+    db: AsyncSession = Depends(get_async_db),
+    _=Depends(get_current_user),
+    _etag=Depends(data_versions.conditional("patients")),
+):
+    return await patient_crud.get_patients(db)
 
 
 @router.post("", response_model=PatientResponse, status_code=status.HTTP_201_CREATED)
-def create_patient(data: PatientCreate, db: Session = Depends(get_db), _=Depends(get_current_user)):
-    return patient_crud.create_patient(db, data)
+async def create_patient(data: PatientCreate, db: AsyncSession = Depends(get_async_db), _=Depends(get_current_user)):
+    return await patient_crud.create_patient(db, data)
 
 
 @router.get("/{patient_id}", response_model=PatientResponse)
-def get_patient(patient_id: str, db: Session = Depends(get_db), _=Depends(get_current_user)):
-    patient = patient_crud.get_patient(db, patient_id)
+async def get_patient(patient_id: str, db: AsyncSession = Depends(get_async_db), _=Depends(get_current_user)):
+    patient = await patient_crud.get_patient(db, patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     return patient
 
 
 @router.put("/{patient_id}", response_model=PatientResponse)
-def update_patient(patient_id: str, data: PatientUpdate, db: Session = Depends(get_db), _=Depends(get_current_user)):
-    patient = patient_crud.get_patient(db, patient_id)
+async def update_patient(patient_id: str, data: PatientUpdate, db: AsyncSession = Depends(get_async_db), _=Depends(get_current_user)):
+    patient = await patient_crud.get_patient(db, patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
-    return patient_crud.update_patient(db, patient, data)
+    return await patient_crud.update_patient(db, patient, data)
 
 
 @router.delete("/{patient_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_patient(patient_id: str, db: Session = Depends(get_db), _=Depends(get_current_user)):
-    patient = patient_crud.get_patient(db, patient_id)
+async def delete_patient(patient_id: str, db: AsyncSession = Depends(get_async_db), _=Depends(get_current_user)):
+    patient = await patient_crud.get_patient(db, patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
-    patient_crud.delete_patient(db, patient)
+    await patient_crud.delete_patient(db, patient)
+
+
+@router.get("/{patient_id}/adherence", response_model=PatientAdherence)
+async def get_adherence(
+    patient_id: str,
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    db: AsyncSession = Depends(get_async_db),
+    _=Depends(get_current_user),
+    _etag=Depends(data_versions.conditional("patients", "medications", "medication_doses")),
+):
+    """Medication adherence per day in [from, to] across all of the patient's medications."""
+    if to_date < from_date:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    patient = await patient_crud.get_patient(db, patient_id)
+    if not patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    result = await adherence_crud.get_patient_adherence(db, patient_id, from_date, to_date)
+    return PatientAdherence(patient_id=patient_id, from_date=from_date, to_date=to_date, **result)
@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 import datetime as dt
 from datetime import timezone
 
 from auth import get_current_user
-from database import get_db
-import crud.appointment as appt_crud
-import crud.symptom_log as symptom_crud
-import crud.medication as med_crud
-import crud.patient as patient_crud
+import data_versions
+from database import get_async_db
+import crud.aio.appointment as appt_crud
+import crud.aio.symptom_log as symptom_crud
+import crud.aio.medication as med_crud
+import search_index
+import patient_directory
+from responses import blank, prepared
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/search", tags=["search"])
@@ -30,30 +33,48 @@ class SearchResponse(BaseModel):
     count: int
 
 
+_RESULT = blank(SearchResult)
+
+
 def _matches(query: str, *fields: Optional[str]) -> bool:
+    # Candidates from the blind index can be false positives; confirm on plaintext
     q = query.lower()
     return any(f and q in f.lower() for f in fields)
 
 
+def _sort_key(value: Optional[dt.datetime]) -> dt.datetime:
+    # Undated results (medications) last; SQLite returns naive datetimes, stored as UTC
+    if value is None:
+        return dt.datetime.min.replace(tzinfo=timezone.utc)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
 @router.get("", response_model=SearchResponse)
-def search(
+async def search(
+    response: Response,
     q: str = Query(..., min_length=1),
     type: Optional[str] = Query(None),
     patient_id: Optional[str] = Query(None),
     from_dt: Optional[dt.datetime] = Query(None, alias="from"),
     to_dt: Optional[dt.datetime] = Query(None, alias="to"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(get_current_user),
+    _etag=Depends(data_versions.conditional("patients", "appointments", "symptom_logs", "medications")),
 ):
-    patients = {p.id: p for p in patient_crud.get_patients(db)}
-    results: List[SearchResult] = []
+    patients = await patient_directory.get(db)
+    # SearchResult-shaped dicts, encoded once (see responses.py)
+    results: List[dict] = []
 
     if not type or type == "appointment":
-        appointments = appt_crud.get_appointments(db, patient_id=patient_id, from_dt=from_dt, to_dt=to_dt)
+        appointments = await appt_crud.get_appointments(
+            db, patient_id=patient_id, from_dt=from_dt, to_dt=to_dt,
+            ids=search_index.candidate_ids("appointment", q),
+        )
         for appt in appointments:
             if _matches(q, appt.provider_name, appt.reason, appt.location, appt.notes):
                 p = patients.get(appt.patient_id)
-                results.append(SearchResult(
+                results.append(dict(
+                    _RESULT,
                     id=appt.id,
                     type="appointment",
                     patient_id=appt.patient_id,
@@ -64,11 +85,15 @@ def search(
                 ))
 
     if not type or type == "symptom":
-        symptoms = symptom_crud.get_symptom_logs(db, patient_id=patient_id, from_dt=from_dt, to_dt=to_dt)
+        symptoms = await symptom_crud.get_symptom_logs(
+            db, patient_id=patient_id, from_dt=from_dt, to_dt=to_dt,
+            ids=search_index.candidate_ids("symptom", q),
+        )
         for sym in symptoms:
             if _matches(q, sym.description, sym.notes):
                 p = patients.get(sym.patient_id)
-                results.append(SearchResult(
+                results.append(dict(
+                    _RESULT,
                     id=sym.id,
                     type="symptom",
                     patient_id=sym.patient_id,
@@ -79,11 +104,14 @@ def search(
                 ))
 
     if not type or type == "medication":
-        medications = med_crud.get_medications(db, patient_id=patient_id)
+        medications = await med_crud.get_medications(
+            db, patient_id=patient_id, ids=search_index.candidate_ids("medication", q),
+        )
         for med in medications:
             if _matches(q, med.name, med.dosage, med.notes, med.schedule_notes):
                 p = patients.get(med.patient_id)
-                results.append(SearchResult(
+                results.append(dict(
+                    _RESULT,
                     id=med.id,
                     type="medication",
                     patient_id=med.patient_id,
@@ -93,5 +121,5 @@ def search(
                     datetime=None,
                 ))
 
-    results.sort(key=lambda r: r.datetime or dt.datetime.min.replace(tzinfo=timezone.utc), reverse=True)
-    return SearchResponse(results=results, count=len(results))
+    results.sort(key=lambda r: _sort_key(r["datetime"]), reverse=True)
+    return prepared({"results": results, "count": len(results)}, response)
@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel, Field
 
 import secrets_manager
-from auth import hash_password, create_access_token
+from auth import hash_password_async, create_access_token
 from schemas.auth import TokenResponse
 
 router = APIRouter(prefix="/api/setup", tags=["setup"])
@@ -19,7 +19,7 @@ def setup_status():
 
 
 @router.post("", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-def complete_setup(body: SetupRequest):
+async def complete_setup(body: SetupRequest):
     """
     One-time endpoint: set the application password.
     Returns a JWT so the user is immediately logged in after setup.
@@ -30,7 +30,13 @@ def complete_setup(body: SetupRequest):
             status_code=status.HTTP_409_CONFLICT,
             detail="Setup already completed. Use /api/auth/login to sign in.",
         )
-    hashed = hash_password(body.password)
+    hashed = await hash_password_async(body.password)
+    if secrets_manager.is_configured():
+        # Another setup request finished while this one was hashing
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Setup already completed. Use /api/auth/login to sign in.",
+        )
     secrets_manager.save_password_hash(hashed)
     token = create_access_token({"sub": "medvault"})
     return TokenResponse(access_token=token)
@@ -1,56 +1,96 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
 
 from auth import get_current_user
-from database import get_db
+import data_versions
+from database import get_async_db
+from pagination import PageParams, set_page_headers
+from projection import parse_fields, project
 from schemas.symptom_log import SymptomLogCreate, SymptomLogUpdate, SymptomLogResponse
-import crud.symptom_log as symptom_crud
+from schemas.symptom_trends import SymptomTrends
+import crud.aio.symptom_log as symptom_crud
+import crud.aio.symptom_trends as trends_crud
+from crud.symptom_trends import BUCKETS
 
 router = APIRouter(prefix="/api/symptoms", tags=["symptoms"])
 
 
-@router.get("", response_model=List[SymptomLogResponse])
-def list_symptoms(
+@router.get("", response_model=List[SymptomLogResponse], response_model_exclude_unset=True)
+async def list_symptoms(
+    response: Response,
     patient_id: Optional[str] = Query(None),
     from_dt: Optional[datetime] = Query(None, alias="from"),
     to_dt: Optional[datetime] = Query(None, alias="to"),
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None),
+    page_params: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(get_current_user),
+    _etag=Depends(data_versions.conditional("symptom_logs")),
 ):
-    return symptom_crud.get_symptom_logs(db, patient_id=patient_id, from_dt=from_dt, to_dt=to_dt)
+    selected = parse_fields(fields, SymptomLogResponse)
+    page = await symptom_crud.get_symptom_logs_page(
+        db, page_params, patient_id=patient_id, from_dt=from_dt, to_dt=to_dt, fields=selected,
+    )
+    set_page_headers(response, page)
+    return project(page.items, selected)
 
 
 @router.post("", response_model=SymptomLogResponse, status_code=status.HTTP_201_CREATED)
-def create_symptom(data: SymptomLogCreate, db: Session = Depends(get_db), _=Depends(get_current_user)):
-    return symptom_crud.create_symptom_log(db, data)
+async def create_symptom(data: SymptomLogCreate, db: AsyncSession = Depends(get_async_db), _=Depends(get_current_user)):
+    return await symptom_crud.create_symptom_log(db, data)
+
+
+@router.get("/trends", response_model=SymptomTrends)
+async def get_trends(
+    bucket: str = Query("week"),
+    window: Optional[int] = Query(None, ge=1, le=366),
+    patient_id: Optional[str] = Query(None),
+    from_dt: Optional[datetime] = Query(None, alias="from"),
+    to_dt: Optional[datetime] = Query(None, alias="to"),
+    db: AsyncSession = Depends(get_async_db),
+    _=Depends(get_current_user),
+    _etag=Depends(data_versions.conditional("symptom_logs")),
+):
+    """
+    Severity count/mean/max per patient per day, week or month, with a rolling
+    mean over the last `window` buckets and time-to-resolution stats (see
+    crud/symptom_trends.py). Nothing is decrypted.
+    """
+    if bucket not in BUCKETS:
+        raise HTTPException(status_code=400, detail=f"'bucket' must be one of: {', '.join(BUCKETS)}")
+    if from_dt and to_dt and to_dt < from_dt:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    return await trends_crud.get_symptom_trends(
+        db, bucket, window, patient_id=patient_id, from_dt=from_dt, to_dt=to_dt,
+    )
 
 
 @router.get("/{log_id}", response_model=SymptomLogResponse)
-def get_symptom(log_id: str, db: Session = Depends(get_db), _=Depends(get_current_user)):
-    log = symptom_crud.get_symptom_log(db, log_id)
+async def get_symptom(log_id: str, db: AsyncSession = Depends(get_async_db), _=Depends(get_current_user)):
+    log = await symptom_crud.get_symptom_log(db, log_id)
     if not log:
         raise HTTPException(status_code=404, detail="Symptom log not found")
     return log
 
 
 @router.put("/{log_id}", response_model=SymptomLogResponse)
-def update_symptom(
+async def update_symptom(
     log_id: str,
     data: SymptomLogUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(get_current_user),
 ):
-    log = symptom_crud.get_symptom_log(db, log_id)
+    log = await symptom_crud.get_symptom_log(db, log_id)
     if not log:
         raise HTTPException(status_code=404, detail="Symptom log not found")
-    return symptom_crud.update_symptom_log(db, log, data)
+    return await symptom_crud.update_symptom_log(db, log, data)
 
 
 @router.delete("/{log_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_symptom(log_id: str, db: Session = Depends(get_db), _=Depends(get_current_user)):
-    log = symptom_crud.get_symptom_log(db, log_id)
+async def delete_symptom(log_id: str, db: AsyncSession = Depends(get_async_db), _=Depends(get_current_user)):
+    log = await symptom_crud.get_symptom_log(db, log_id)
     if not log:
         raise HTTPException(status_code=404, detail="Symptom log not found")
-    symptom_crud.delete_symptom_log(db, log)
+    await symptom_crud.delete_symptom_log(db, log)
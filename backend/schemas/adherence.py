@@ -0,0 +1,39 @@
+import datetime as dt
+from pydantic import BaseModel
+from typing import Optional, List
+
+
+class AdherenceDay(BaseModel):
+    day: dt.date
+    expected: int  # frequency_per_day summed over the medications active that day
+    taken: int
+    missed: int  # expected doses not taken; extra doses never go negative
+
+
+class AdherenceSummary(BaseModel):
+    expected: int
+    taken: int
+    missed: int
+    missed_days: int
+    rate: Optional[float] = None  # (expected - missed) / expected; None when nothing was expected
+
+
+class MedicationAdherenceSummary(AdherenceSummary):
+    medication_id: str
+    name: str
+    dosage: str
+
+
+class MedicationAdherence(AdherenceSummary):
+    medication_id: str
+    from_date: dt.date
+    to_date: dt.date
+    days: List[AdherenceDay]
+
+
+class PatientAdherence(AdherenceSummary):
+    patient_id: str
+    from_date: dt.date
+    to_date: dt.date
+    days: List[AdherenceDay]
+    medications: List[MedicationAdherenceSummary]
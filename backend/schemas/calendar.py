@@ -10,6 +10,7 @@ class CalendarEvent(BaseModel):
     patient_name: str
     patient_color: str
     datetime: dt.datetime
+    end: Optional[dt.datetime] = None  # compact medication spans only; inclusive last day
     title: str
     detail: Optional[str] = None
     follow_up_required: Optional[bool] = None
@@ -19,3 +20,28 @@ class CalendarEvent(BaseModel):
 
 class CalendarResponse(BaseModel):
     events: List[CalendarEvent]
+
+
+class CalendarDayPatient(BaseModel):
+    patient_id: str
+    patient_name: str
+    patient_color: str
+    appointments: int
+    symptoms: int
+    medications: int  # active that day
+    max_severity: Optional[int] = None  # None when no symptom was logged
+
+
+class CalendarDay(BaseModel):
+    day: dt.date
+    appointments: int  # totals over patients
+    symptoms: int
+    medications: int
+    max_severity: Optional[int] = None
+    patients: List[CalendarDayPatient]  # patients with events that day, by name
+
+
+class CalendarSummaryResponse(BaseModel):
+    year: int
+    month: int
+    days: List[CalendarDay]  # days with at least one event
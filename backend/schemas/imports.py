@@ -0,0 +1,43 @@
+from pydantic import BaseModel
+from typing import Optional, List, Dict
+
+from schemas.patient import PatientCreate
+from schemas.appointment import AppointmentCreate
+from schemas.symptom_log import SymptomLogCreate
+from schemas.medication import MedicationCreate, MedicationDoseCreate
+
+
+# Import rows are the create schemas plus an optional id, so exported records
+# keep their identity and rows later in the same file can reference them.
+
+class PatientImport(PatientCreate):
+    id: Optional[str] = None
+
+
+class AppointmentImport(AppointmentCreate):
+    id: Optional[str] = None
+
+
+class SymptomLogImport(SymptomLogCreate):
+    id: Optional[str] = None
+
+
+class MedicationImport(MedicationCreate):
+    id: Optional[str] = None
+
+
+class MedicationDoseImport(MedicationDoseCreate):
+    id: Optional[str] = None
+    medication_id: str
+
+
+class ImportRowError(BaseModel):
+    line: int
+    type: Optional[str] = None
+    error: str
+
+
+class ImportReport(BaseModel):
+    imported: Dict[str, int]
+    error_count: int
+    errors: List[ImportRowError]  # capped; error_count has the full total
@@ -0,0 +1,30 @@
+import datetime as dt
+from pydantic import BaseModel
+from typing import Optional, List
+
+
+class SymptomTrendBucket(BaseModel):
+    patient_id: str
+    start: dt.date  # first UTC day of the bucket
+    count: int
+    mean_severity: float
+    max_severity: int
+    rolling_mean_severity: float  # over this and the previous window - 1 buckets, weighted by count
+    resolved: int
+    mean_resolution_hours: Optional[float] = None
+
+
+class ResolutionStats(BaseModel):
+    patient_id: str
+    resolved: int
+    unresolved: int
+    mean_hours: Optional[float] = None
+    median_hours: Optional[float] = None
+    p90_hours: Optional[float] = None
+
+
+class SymptomTrends(BaseModel):
+    bucket: str
+    window: int
+    buckets: List[SymptomTrendBucket]
+    resolution: List[ResolutionStats]
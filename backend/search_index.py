@@ -0,0 +1,152 @@
+"""
+Blind index for search over encrypted fields.
+
+Encrypted columns cannot be queried with SQL LIKE, so every searchable text
+field is broken into lowercase character n-grams and each n-gram is stored as
+a truncated HMAC-SHA256 token keyed with secrets_manager's search-index key.
+The database only ever sees opaque tokens — never plaintext.
+
+A query is tokenized the same way; rows containing every query token are
+candidates. Since "q is a substring of f" implies "every n-gram of q is an
+n-gram of f", the candidate set never misses a real match. It may contain a
+few false positives (n-grams spread across fields, truncated-HMAC collisions),
+so callers still verify candidates after decryption.
+
+Queries shorter than NGRAM characters cannot use the index and fall back to
+scanning every row.
+
+The index is maintained by the crud create/update/delete functions. For data
+written before the index existed, run:
+
+    python manage.py rebuild-search-index
+"""
+
+import hashlib
+import hmac
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+import secrets_manager
+from models.appointment import Appointment
+from models.medication import Medication
+from models.search_token import SearchToken
+from models.symptom_log import SymptomLog
+
+NGRAM = 3
+TOKEN_HEX_LENGTH = 16
+
+# entity_type -> attributes indexed for that entity (plaintext and encrypted)
+SEARCH_FIELDS: dict[str, tuple[str, ...]] = {
+    "appointment": ("provider_name", "reason", "location", "notes"),
+    "symptom": ("description", "notes"),
+    "medication": ("name", "dosage", "notes", "schedule_notes"),
+}
+
+_MODELS = {"appointment": Appointment, "symptom": SymptomLog, "medication": Medication}
+
+_key = secrets_manager.get_search_index_key().encode()
+
+
+def _token(gram: str) -> str:
+    digest = hmac.new(_key, gram.encode(), hashlib.sha256).hexdigest()
+    return digest[:TOKEN_HEX_LENGTH]
+
+
+def _grams(text: str) -> set[str]:
+    text = text.lower()
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def tokens_for(*fields: Optional[str]) -> set[str]:
+    """Return the blind-index tokens for all n-grams of the given fields."""
+    grams: set[str] = set()
+    for f in fields:
+        if f:
+            grams |= _grams(str(f))
+    return {_token(g) for g in grams}
+
+
+def query_tokens(q: str) -> Optional[set[str]]:
+    """Tokens a matching row must contain, or None if q is too short to index."""
+    if len(q.lower()) < NGRAM:
+        return None
+    return {_token(g) for g in _grams(q)}
+
+
+def candidate_ids(entity_type: str, q: str):
+    """
+    Subquery of entity IDs that may contain q, or None when the index cannot
+    be used and the caller must scan.
+    """
+    tokens = query_tokens(q)
+    if tokens is None:
+        return None
+    return (
+        select(SearchToken.entity_id)
+        .where(SearchToken.entity_type == entity_type)
+        .where(SearchToken.token.in_(tokens))
+        .group_by(SearchToken.entity_id)
+        .having(func.count() == len(tokens))
+    )
+
+
+def index_entity(db: Session, entity_type: str, obj) -> None:
+    """Replace the index entries for obj. Does not commit."""
+    remove_entity(db, entity_type, obj.id)
+    _insert_tokens(db, entity_type, obj)
+
+
+def _token_rows(entity_type: str, entity_id: str, patient_id: str, values) -> list[dict]:
+    return [
+        {"token": t, "entity_type": entity_type, "entity_id": entity_id, "patient_id": patient_id}
+        for t in tokens_for(*values)
+    ]
+
+
+def _insert_tokens(db: Session, entity_type: str, obj) -> None:
+    rows = _token_rows(entity_type, obj.id, obj.patient_id, (getattr(obj, f) for f in SEARCH_FIELDS[entity_type]))
+    if rows:
+        db.execute(insert(SearchToken), rows)
+
+
+def index_new_rows(db: Session, entity_type: str, records: list[dict]) -> None:
+    """Index freshly inserted records (plain dicts) in one executemany. Does not commit."""
+    rows = []
+    for r in records:
+        rows.extend(_token_rows(entity_type, r["id"], r["patient_id"], (r.get(f) for f in SEARCH_FIELDS[entity_type])))
+    if rows:
+        db.execute(insert(SearchToken), rows)
+
+
+def remove_entity(db: Session, entity_type: str, entity_id: str) -> None:
+    db.execute(
+        delete(SearchToken)
+        .where(SearchToken.entity_type == entity_type)
+        .where(SearchToken.entity_id == entity_id)
+    )
+
+
+def remove_patient(db: Session, patient_id: str) -> None:
+    """Drop every index entry for a patient (their records cascade-delete with them)."""
+    db.execute(delete(SearchToken).where(SearchToken.patient_id == patient_id))
+
+
+def is_stale(db: Session) -> bool:
+    """True when the index is empty but there are records that should be in it."""
+    if db.query(SearchToken.token).first() is not None:
+        return False
+    return any(db.query(model.id).first() is not None for model in _MODELS.values())
+
+
+def rebuild(db: Session, batch_size: int = 500) -> int:
+    """Rebuild the whole index from the source tables. Returns rows indexed."""
+    db.execute(delete(SearchToken))
+    count = 0
+    for entity_type, model in _MODELS.items():
+        for obj in db.query(model).yield_per(batch_size):
+            _insert_tokens(db, entity_type, obj)
+            count += 1
+    db.commit()
+    return count
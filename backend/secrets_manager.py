@@ -3,11 +3,17 @@ Secrets manager — generates and persists application secrets on first run.
 
 On the very first startup, this module:
   1. Creates /app/data/ (mapped to a Docker named volume)
-  2. Generates a Fernet encryption key and a JWT signing secret
+  2. Generates a Fernet encryption key, a JWT signing secret and a
+     search-index HMAC key
   3. Saves them to /app/data/secrets.json (mode 0600)
   4. Leaves app_password_hash as null → triggers the setup wizard in the browser
 
 Subsequent startups just read the existing file. No .env file required.
+
+Encryption keys are kept as a list, newest (primary) first, so that key
+rotation (key_rotation.py) can re-encrypt data online: the primary key encrypts,
+every listed key can decrypt. The legacy "encryption_key" entry always mirrors
+the primary key.
 """
 
 import json
@@ -22,14 +28,28 @@ from cryptography.fernet import Fernet
 _SECRETS_FILE = Path(os.environ.get("SECRETS_FILE", "/app/data/secrets.json"))
 
 _state: dict = {}
+_file_stamp: tuple | None = None  # (mtime_ns, size) of the file last read or written
+
+
+def _stamp() -> tuple | None:
+    try:
+        st = _SECRETS_FILE.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
 
 
 def _load() -> None:
-    global _state
+    global _state, _file_stamp
     if _SECRETS_FILE.exists():
         try:
             with open(_SECRETS_FILE) as f:
                 _state = json.load(f)
+            _file_stamp = _stamp()
+            # Secrets files written by older versions lack the search-index key
+            if not _state.get("search_index_key"):
+                _state["search_index_key"] = secrets.token_hex(32)
+                _persist()
             return
         except Exception as e:
             print(f"WARNING: Could not read secrets file ({e}), regenerating.", file=sys.stderr)
@@ -39,6 +59,7 @@ def _load() -> None:
     _state = {
         "jwt_secret_key": secrets.token_hex(32),
         "encryption_key": Fernet.generate_key().decode(),
+        "search_index_key": secrets.token_hex(32),
         "app_password_hash": None,  # Set when user completes the setup wizard
     }
     _persist()
@@ -46,12 +67,36 @@ def _load() -> None:
 
 
 def _persist() -> None:
-    with open(_SECRETS_FILE, "w") as f:
+    global _file_stamp
+    # Write-then-rename so other processes never read a half-written file
+    tmp = _SECRETS_FILE.with_suffix(".tmp")
+    with open(tmp, "w") as f:
         json.dump(_state, f, indent=2)
     try:
-        os.chmod(_SECRETS_FILE, 0o600)
+        os.chmod(tmp, 0o600)
     except OSError:
         pass  # Windows / some filesystems don't support chmod
+    os.replace(tmp, _SECRETS_FILE)
+    _file_stamp = _stamp()
+
+
+def reload_if_changed() -> bool:
+    """
+    Re-read the secrets file if another process (e.g. `manage.py rotate-key`)
+    has rewritten it. Returns True if anything was reloaded.
+    """
+    global _state, _file_stamp
+    stamp = _stamp()
+    if stamp is None or stamp == _file_stamp:
+        return False
+    try:
+        with open(_SECRETS_FILE) as f:
+            _state = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"WARNING: Could not reload secrets file ({e}), keeping current keys.", file=sys.stderr)
+        return False
+    _file_stamp = stamp
+    return True
 
 
 def is_configured() -> bool:
@@ -64,7 +109,33 @@ def get_jwt_key() -> str:
 
 
 def get_encryption_key() -> str:
-    return _state["encryption_key"]
+    """The primary key — used for all new encryption."""
+    return get_encryption_keys()[0]
+
+
+def get_encryption_keys() -> list[str]:
+    """All keys able to decrypt stored data, primary first."""
+    return _state.get("encryption_keys") or [_state["encryption_key"]]
+
+
+def add_encryption_key(key: str) -> None:
+    """Make key the new primary; older keys stay valid for decryption."""
+    _state["encryption_keys"] = [key] + get_encryption_keys()
+    _state["encryption_key"] = key
+    _persist()
+
+
+def retire_old_encryption_keys() -> list[str]:
+    """Drop every key except the primary. Returns the retired keys."""
+    keys = get_encryption_keys()
+    _state["encryption_keys"] = keys[:1]
+    _state["encryption_key"] = keys[0]
+    _persist()
+    return keys[1:]
+
+
+def get_search_index_key() -> str:
+    return _state["search_index_key"]
 
 
 def get_password_hash() -> str | None:
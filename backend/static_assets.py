@@ -0,0 +1,217 @@
+"""
+Frontend files served from memory, precompressed and cache-friendly.
+
+Every file under the frontend directory is read once and, if its type is
+compressible, compressed with brotli and gzip at maximum quality. Requests
+are answered from memory with the best encoding the client accepts, so
+nothing is compressed per request. A `.br`/`.gz` sibling on disk (e.g.
+produced at image build time) is used instead of compressing, as long as it
+is not older than the file itself.
+
+Caching:
+- Each file gets a content hash. index.html is rewritten so its css/js/asset
+  references point at hashed URLs (/js/api.3f9a1c2b7d.js), which are served
+  with `Cache-Control: immutable` — a changed file gets a new URL.
+- index.html, sw.js, manifest.json and unhashed URLs are served with an ETag
+  and `no-cache`, so revalidation is a 304 straight from memory.
+- sw.js gets its cache name and app-shell list from the asset manifest
+  (every file's hashed URL), so any asset change installs a new cache.
+
+The frontend directory is mounted read-only in docker-compose, so variants
+are kept in memory rather than written next to the files. The directory is
+rescanned at most every settings.static_check_seconds, so edits to a mounted
+frontend still show up without a restart while repeat requests never touch
+the disk.
+"""
+
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+
+from compression import compress, is_compressible, negotiate
+from config import get_settings
+
+settings = get_settings()
+
+mimetypes.add_type("application/javascript", ".js")
+mimetypes.add_type("application/manifest+json", ".json")
+
+_SIBLINGS = {"br": ".br", "gzip": ".gz"}
+MIN_COMPRESS_SIZE = 256
+HASH_LENGTH = 10
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Directories whose files get hashed URLs
+_HASHED_DIRS = ("css/", "js/", "assets/")
+_HASHED_URL = re.compile(r"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[^./]+)$" % HASH_LENGTH)
+_INDEX_REF = re.compile(r'(?P<attr>href|src)="/(?P<path>(?:css|js|assets)/[^"?#]+)"')
+_SW_VERSION = re.compile(r"^const ASSET_VERSION = .*;$", re.MULTILINE)
+_SW_SHELL = re.compile(r"^const APP_SHELL = .*;$", re.MULTILINE)
+
+
+@dataclass
+class Asset:
+    media_type: str
+    body: bytes
+    stamp: tuple  # (mtime_ns, size) of the source file
+    digest: str = ""
+    variants: Dict[str, bytes] = field(default_factory=dict)  # encoding -> body
+
+    @property
+    def etag(self) -> str:
+        # Weak: the same tag covers the identity, br and gzip representations
+        return f'W/"{self.digest}"'
+
+
+def _make_asset(body: bytes, media_type: str, stamp: tuple, full: Optional[str] = None) -> Asset:
+    asset = Asset(
+        media_type=media_type, body=body, stamp=stamp,
+        digest=hashlib.sha256(body).hexdigest()[:HASH_LENGTH],
+    )
+    if is_compressible(media_type) and len(body) >= MIN_COMPRESS_SIZE:
+        for encoding, suffix in _SIBLINGS.items():
+            if full is not None:
+                sibling = full + suffix
+                try:
+                    if os.stat(sibling).st_mtime_ns >= stamp[0]:
+                        with open(sibling, "rb") as f:
+                            asset.variants[encoding] = f.read()
+                        continue
+                except OSError:
+                    pass
+            asset.variants[encoding] = compress(body, encoding, static=True)
+    return asset
+
+
+def hashed_url(rel_path: str, digest: str) -> str:
+    stem, ext = os.path.splitext(rel_path)
+    return f"/{stem}.{digest}{ext}"
+
+
+class AssetStore:
+    def __init__(self, directory: str):
+        self.directory = os.path.realpath(directory)
+        self._files: Dict[str, Asset] = {}     # as on disk
+        self._rendered: Dict[str, Asset] = {}  # index.html and sw.js, rewritten
+        self.version = ""
+        self._checked = float("-inf")
+        self._lock = threading.Lock()
+
+    def preload(self) -> None:
+        """Load, hash and compress every file up front (called at startup)."""
+        self.refresh(force=True)
+
+    def refresh(self, force: bool = False) -> None:
+        """Rescan the directory if static_check_seconds have passed; reload changed files."""
+        now = time.monotonic()
+        if not force and now - self._checked < settings.static_check_seconds:
+            return
+        with self._lock:
+            if not force and now - self._checked < settings.static_check_seconds:
+                return
+            seen = {}
+            for root, _, names in os.walk(self.directory):
+                for name in names:
+                    if name.endswith(tuple(_SIBLINGS.values())):
+                        continue
+                    full = os.path.join(root, name)
+                    try:
+                        st = os.stat(full)
+                    except OSError:
+                        continue
+                    rel = os.path.relpath(full, self.directory).replace(os.sep, "/")
+                    stamp = (st.st_mtime_ns, st.st_size)
+                    asset = self._files.get(rel)
+                    if asset is None or asset.stamp != stamp:
+                        with open(full, "rb") as f:
+                            body = f.read()
+                        media_type = mimetypes.guess_type(full)[0] or "application/octet-stream"
+                        asset = _make_asset(body, media_type, stamp, full)
+                    seen[rel] = asset
+            changed = seen.keys() != self._files.keys() or any(
+                seen[rel] is not self._files.get(rel) for rel in seen
+            )
+            self._files = seen
+            if changed or force:
+                self._render()
+            self._checked = now
+
+    def _render(self) -> None:
+        hashed = {
+            rel: hashed_url(rel, asset.digest)
+            for rel, asset in sorted(self._files.items())
+            if rel.startswith(_HASHED_DIRS)
+        }
+        rendered = {}
+
+        index = self._files.get("index.html")
+        if index is not None:
+            html = _INDEX_REF.sub(
+                lambda m: f'{m["attr"]}="{hashed.get(m["path"], "/" + m["path"])}"',
+                index.body.decode(),
+            )
+            rendered["index.html"] = _make_asset(html.encode(), index.media_type, index.stamp)
+
+        manifest = {rel: url for rel, url in hashed.items()}
+        if "index.html" in rendered:
+            manifest["index.html"] = rendered["index.html"].digest
+        if "manifest.json" in self._files:
+            manifest["manifest.json"] = self._files["manifest.json"].digest
+        self.version = hashlib.sha256(json.dumps(manifest, sort_keys=True).encode()).hexdigest()[:HASH_LENGTH]
+
+        sw = self._files.get("sw.js")
+        if sw is not None:
+            shell = ["/", "/manifest.json", *hashed.values()]
+            js = _SW_VERSION.sub(f"const ASSET_VERSION = '{self.version}';", sw.body.decode(), count=1)
+            js = _SW_SHELL.sub(lambda _: f"const APP_SHELL = {json.dumps(shell)};", js, count=1)
+            rendered["sw.js"] = _make_asset(js.encode(), sw.media_type, sw.stamp)
+
+        self._rendered = rendered
+
+    def lookup(self, rel_path: str) -> Tuple[Optional[Asset], bool]:
+        """(asset, immutable). Hashed URLs resolve to their file; immutable only if the hash is current."""
+        self.refresh()
+        asset = self._rendered.get(rel_path) or self._files.get(rel_path)
+        if asset is not None:
+            return asset, False
+        m = _HASHED_URL.match(rel_path)
+        if m:
+            asset = self._files.get(m["stem"] + m["ext"])
+            if asset is not None:
+                # An outdated hash still gets the current file, just not cached for good
+                return asset, asset.digest == m["hash"]
+        return None, False
+
+
+def respond(asset: Asset, request: Request, immutable: bool = False) -> Response:
+    headers = {"ETag": asset.etag, "Cache-Control": IMMUTABLE if immutable else REVALIDATE}
+    if asset.variants:
+        headers["Vary"] = "Accept-Encoding"
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and asset.etag in {t.strip() for t in if_none_match.split(",")}:
+        return Response(status_code=304, headers=headers)
+
+    body = asset.body
+    if asset.variants:
+        encoding = negotiate(request.headers.get("accept-encoding"), tuple(asset.variants))
+        if encoding:
+            body = asset.variants[encoding]
+            headers["Content-Encoding"] = encoding
+    return Response(body, media_type=asset.media_type, headers=headers)
+
+
+def serve(store: AssetStore, rel_path: str, request: Request) -> Response:
+    asset, immutable = store.lookup(rel_path)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return respond(asset, request, immutable)
@@ -0,0 +1,114 @@
+"""
+Test setup.
+
+Tests run against a throwaway SQLite database by default:
+
+    pip install -r requirements-dev.txt
+    python -m pytest
+
+Set DATABASE_URL to an empty PostgreSQL database to run them there instead;
+tests of PostgreSQL-only SQL (adherence, symptom trends, query plans) are
+skipped otherwise. Every test that asks for `db` or `client` starts from
+freshly created tables. Secrets live in a temporary file, never a real
+vault's.
+"""
+
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="medvault-test-")
+os.environ["SECRETS_FILE"] = os.path.join(_tmp, "secrets.json")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+import database
+import query_profiler
+
+DATABASE_URL = make_url(os.environ.get("DATABASE_URL") or "sqlite:///" + os.path.join(_tmp, "test.db"))
+IS_POSTGRESQL = DATABASE_URL.get_backend_name() == "postgresql"
+
+
+
+def pytest_collection_modifyitems(config, items):
+    if IS_POSTGRESQL:
+        return
+    skip = pytest.mark.skip(reason="needs DATABASE_URL pointing at PostgreSQL")
+    for item in items:
+        if "postgresql" in item.keywords:
+            item.add_marker(skip)
+
+
+def _sqlite_foreign_keys(dbapi_connection, _record):
+    # Cascades (patients -> records -> summaries) behave as on PostgreSQL
+    dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+
+engine = create_engine(DATABASE_URL.set(drivername="postgresql+psycopg2") if IS_POSTGRESQL else DATABASE_URL)
+# Each TestClient runs its own event loop; asyncpg connections cannot be shared between loops
+async_engine = create_async_engine(DATABASE_URL.set(
+    drivername="postgresql+asyncpg" if IS_POSTGRESQL else "sqlite+aiosqlite",
+), poolclass=NullPool)
+if not IS_POSTGRESQL:
+    event.listen(engine, "connect", _sqlite_foreign_keys)
+    event.listen(async_engine.sync_engine, "connect", _sqlite_foreign_keys)
+
+database.engine = engine
+database.async_engine = async_engine
+database.SessionLocal.configure(bind=engine)
+database.AsyncSessionLocal.configure(bind=async_engine)
+query_profiler.instrument(engine)
+query_profiler.instrument(async_engine.sync_engine)
+
+import auth  # noqa: E402
+import encryption  # noqa: E402
+import main  # noqa: E402
+import models  # noqa: E402,F401
+import patient_directory  # noqa: E402
+import secrets_manager  # noqa: E402
+import crud.symptom_trends  # noqa: E402
+
+PASSWORD = "test-password"
+secrets_manager.save_password_hash(auth.hash_password(PASSWORD))
+
+
+def reset_database() -> None:
+    database.Base.metadata.drop_all(engine)
+    database.Base.metadata.create_all(engine)
+    # Process-wide caches keyed by data version would see versions restart at 0
+    patient_directory.invalidate()
+    encryption._cache.clear()
+    with crud.symptom_trends._lock:
+        crud.symptom_trends._cache.clear()
+
+
+@pytest.fixture
+def db():
+    reset_database()
+    session = database.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    with TestClient(main.app) as c:
+        c.headers["Authorization"] = "Bearer " + auth.create_access_token({"sub": "medvault"})
+        yield c
+
+
+@pytest.fixture
+def encryption_keys():
+    """Restore the secrets (key set, password hash) and the secrets file after a test that changes them."""
+    saved = dict(secrets_manager._state)
+    yield
+    secrets_manager._state.clear()
+    secrets_manager._state.update(saved)
+    secrets_manager._persist()
+    encryption.refresh_keys(force=True)
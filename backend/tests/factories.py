@@ -0,0 +1,40 @@
+"""Small builders for records, going through the crud layer like the API does."""
+
+from datetime import date, datetime, timezone
+
+import crud.appointment as appt_crud
+import crud.medication as med_crud
+import crud.patient as patient_crud
+import crud.symptom_log as symptom_crud
+from schemas.appointment import AppointmentCreate
+from schemas.medication import MedicationCreate
+from schemas.patient import PatientCreate
+from schemas.symptom_log import SymptomLogCreate
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def patient(db, name: str = "Alice", color: str = "#4A6FA5", **fields):
+    return patient_crud.create_patient(db, PatientCreate(name=name, color=color, **fields))
+
+
+def appointment(db, patient_id: str, at: datetime, provider_name: str = "Dr Martin", **fields):
+    return appt_crud.create_appointment(
+        db, AppointmentCreate(patient_id=patient_id, datetime=at, provider_name=provider_name, **fields),
+    )
+
+
+def symptom(db, patient_id: str, at: datetime, severity: int = 3, **fields):
+    return symptom_crud.create_symptom_log(
+        db, SymptomLogCreate(patient_id=patient_id, logged_at=at, severity=severity, **fields),
+    )
+
+
+def medication(db, patient_id: str, start: date, end: date = None, name: str = "Ibuprofen", **fields):
+    fields.setdefault("dosage", "200mg")
+    fields.setdefault("frequency_per_day", 1)
+    return med_crud.create_medication(
+        db, MedicationCreate(patient_id=patient_id, name=name, start_date=start, end_date=end, **fields),
+    )
@@ -0,0 +1,48 @@
+from datetime import date
+
+import pytest
+
+import crud.adherence as adherence_crud
+import crud.medication as med_crud
+from schemas.medication import MedicationDoseCreate
+
+from factories import medication, patient, utc
+
+pytestmark = pytest.mark.postgresql
+
+
+def _dose(db, medication_id, at):
+    med_crud.create_dose(db, medication_id, MedicationDoseCreate(taken_at=at))
+
+
+def test_expected_and_taken_per_day(db):
+    p = patient(db)
+    med = medication(db, p.id, date(2025, 3, 1), date(2025, 3, 3), frequency_per_day=2)
+    _dose(db, med.id, utc(2025, 3, 1, 8))
+    _dose(db, med.id, utc(2025, 3, 1, 20))
+    _dose(db, med.id, utc(2025, 3, 2, 8))
+    _dose(db, med.id, utc(2025, 3, 2, 9))
+    _dose(db, med.id, utc(2025, 3, 2, 10))
+
+    result = adherence_crud.get_medication_adherence(db, med.id, date(2025, 2, 27), date(2025, 3, 10))
+    assert [(d["day"], d["expected"], d["taken"], d["missed"]) for d in result["days"]] == [
+        (date(2025, 3, 1), 2, 2, 0),
+        (date(2025, 3, 2), 2, 3, 0),
+        (date(2025, 3, 3), 2, 0, 2),
+    ]
+    # The extra dose on the 2nd does not make up for the 3rd
+    assert (result["expected"], result["taken"], result["missed"], result["missed_days"]) == (6, 5, 2, 1)
+    assert result["rate"] == pytest.approx(4 / 6, abs=1e-4)
+
+
+def test_active_days_match_the_calendar(db):
+    p = patient(db)
+    ongoing = medication(db, p.id, date(2025, 3, 4), name="Vitamin D", is_ongoing=True)
+    medication(db, p.id, date(2025, 3, 1), name="Paracetamol")  # stopped, end date unknown
+    medication(db, p.id, date(2025, 2, 1), date(2025, 2, 28), name="Cetirizine")  # ended before
+
+    result = adherence_crud.get_patient_adherence(db, p.id, date(2025, 3, 1), date(2025, 3, 5))
+    assert [m["medication_id"] for m in result["medications"]] == [ongoing.id]
+    assert [d["day"] for d in result["days"]] == [date(2025, 3, 4), date(2025, 3, 5)]
+    active = med_crud.get_active_medications_for_range(db, date(2025, 3, 1), date(2025, 3, 5), patient_id=p.id)
+    assert [m.id for m in active] == [ongoing.id]
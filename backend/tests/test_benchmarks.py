@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+import database
+import encryption
+import secrets_manager
+from benchmarks import suite
+
+from conftest import async_engine, engine
+
+
+@pytest.fixture
+def restore_app(encryption_keys, monkeypatch):
+    """suite.main() points the app's sessions at its own database and sets its own password."""
+    monkeypatch.setattr(encryption.settings, "decrypt_cache_enabled", encryption.settings.decrypt_cache_enabled)
+    secrets_manager._state["app_password_hash"] = None
+    yield
+    database.SessionLocal.configure(bind=engine)
+    database.AsyncSessionLocal.configure(bind=async_engine)
+
+
+def test_suite_runs_every_case(restore_app, tmp_path, capsys):
+    output = tmp_path / "results.json"
+    suite.main(["--database-url", f"sqlite:///{tmp_path / 'bench.db'}", "--patients", "1", "--years", "1",
+                "--rounds", "1", "--output", str(output)])
+
+    results = json.loads(output.read_text())
+    names = [b["name"] for b in results["benchmarks"]]
+    assert names == [
+        "calendar_week", "calendar_month", "calendar_year", "search_short", "search_long",
+        "list_patients", "list_appointments", "list_symptoms", "list_medications",
+        "encrypted_string_short", "encrypted_string_long", "login",
+    ]
+    assert all(b["stats"]["rounds"] == 1 for b in results["benchmarks"])
+
+    suite.main(["--database-url", f"sqlite:///{tmp_path / 'bench.db'}", "--only", "list", "--rounds", "1",
+                "--compare", str(output)])
+    assert "list_patients" in capsys.readouterr().err
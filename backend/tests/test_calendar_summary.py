@@ -0,0 +1,146 @@
+import threading
+import time
+from datetime import date
+
+import pytest
+from sqlalchemy import delete, select
+
+import calendar_summary
+import database
+import crud.calendar as calendar_crud
+from models import CalendarDaySummary
+
+from factories import appointment, medication, patient, symptom, utc
+
+
+def _stored(db):
+    """(patient_id, day) -> (appointments, symptoms, medications, max_severity)"""
+    db.expire_all()
+    return {
+        (r.patient_id, r.day): (r.appointments, r.symptoms, r.medications, r.max_severity)
+        for r in db.execute(select(CalendarDaySummary.__table__))
+    }
+
+
+def _matches_rebuild(db):
+    kept = _stored(db)
+    calendar_summary.rebuild(db)
+    return _stored(db) == kept
+
+
+def test_creates_are_counted(db):
+    alice, bob = patient(db), patient(db, name="Bob", color="#C0392B")
+    appointment(db, alice.id, utc(2025, 3, 1, 10))
+    appointment(db, alice.id, utc(2025, 3, 1, 15))
+    symptom(db, alice.id, utc(2025, 3, 1, 9), severity=2)
+    symptom(db, alice.id, utc(2025, 3, 1, 21), severity=4)
+    symptom(db, bob.id, utc(2025, 3, 2, 23, 30), severity=1)
+    medication(db, bob.id, date(2025, 3, 1), date(2025, 3, 2))
+    medication(db, bob.id, date(2025, 3, 1), is_ongoing=True)  # read from medications, not stored
+    medication(db, bob.id, date(2025, 3, 1))  # stopped, end date unknown: on no day
+
+    assert _stored(db) == {
+        (alice.id, date(2025, 3, 1)): (2, 2, 0, 4),
+        (bob.id, date(2025, 3, 1)): (0, 0, 1, 0),
+        (bob.id, date(2025, 3, 2)): (0, 1, 1, 1),
+    }
+    assert _matches_rebuild(db)
+
+
+def test_updates_and_deletes_recount(client, db):
+    p = patient(db)
+    appt = appointment(db, p.id, utc(2025, 3, 1, 10))
+    mild = symptom(db, p.id, utc(2025, 3, 1, 9), severity=2)
+    severe = symptom(db, p.id, utc(2025, 3, 1, 12), severity=5)
+    med = medication(db, p.id, date(2025, 3, 1), date(2025, 3, 3))
+
+    assert client.put(f"/api/appointments/{appt.id}", json={"datetime": "2025-03-02T10:00:00Z"}).status_code == 200
+    assert client.delete(f"/api/symptoms/{severe.id}").status_code == 204
+    assert client.put(f"/api/medications/{med.id}", json={"end_date": "2025-03-02"}).status_code == 200
+    assert _stored(db) == {
+        (p.id, date(2025, 3, 1)): (0, 1, 1, 2),
+        (p.id, date(2025, 3, 2)): (1, 0, 1, 0),
+    }
+    assert _matches_rebuild(db)
+
+    assert client.put(f"/api/symptoms/{mild.id}", json={"logged_at": "2025-03-02T09:00:00Z"}).status_code == 200
+    assert client.put(f"/api/medications/{med.id}", json={"is_ongoing": True}).status_code == 200
+    assert _stored(db) == {(p.id, date(2025, 3, 2)): (1, 1, 0, 2)}
+    assert _matches_rebuild(db)
+
+    assert client.delete(f"/api/patients/{p.id}").status_code == 204
+    assert _stored(db) == {}
+
+
+def test_day_summary_per_patient(db):
+    alice, bob = patient(db), patient(db, name="Bob", color="#C0392B")
+    appointment(db, alice.id, utc(2025, 3, 2, 10))
+    symptom(db, bob.id, utc(2025, 3, 2, 9), severity=3)
+    medication(db, bob.id, date(2025, 2, 1), is_ongoing=True)
+    medication(db, alice.id, date(2025, 2, 1))  # stopped, end date unknown
+
+    days = calendar_crud.get_day_summary(db, date(2025, 3, 1), date(2025, 3, 3))
+    assert [(d["day"], d["appointments"], d["symptoms"], d["medications"], d["max_severity"]) for d in days] == [
+        (date(2025, 3, 1), 0, 0, 1, None),
+        (date(2025, 3, 2), 1, 1, 1, 3),
+        (date(2025, 3, 3), 0, 0, 1, None),
+    ]
+    assert days[1]["patients"] == [
+        {"patient_id": alice.id, "patient_name": "Alice", "patient_color": "#4A6FA5",
+         "appointments": 1, "symptoms": 0, "medications": 0, "max_severity": None},
+        {"patient_id": bob.id, "patient_name": "Bob", "patient_color": "#C0392B",
+         "appointments": 0, "symptoms": 1, "medications": 1, "max_severity": 3},
+    ]
+    only_alice = calendar_crud.get_day_summary(db, date(2025, 3, 1), date(2025, 3, 3), patient_id=alice.id)
+    assert [(d["day"], [p["patient_id"] for p in d["patients"]]) for d in only_alice] == [(date(2025, 3, 2), [alice.id])]
+
+
+def test_summary_endpoint_agrees_with_the_events(client, db):
+    p = patient(db)
+    appointment(db, p.id, utc(2025, 3, 2, 10))
+    medication(db, p.id, date(2025, 3, 30), date(2025, 4, 2))
+    medication(db, p.id, date(2025, 3, 1))  # stopped, end date unknown
+
+    r = client.get("/api/calendar/summary", params={"year": 2025, "month": 3})
+    assert r.status_code == 200
+    summary = {d["day"]: d["appointments"] + d["medications"] for d in r.json()["days"]}
+    assert summary == {"2025-03-02": 1, "2025-03-30": 1, "2025-03-31": 1}
+
+    r = client.get("/api/calendar", params={"from": "2025-03-01T00:00:00Z", "to": "2025-03-31T23:59:59Z"})
+    events = {}
+    for ev in r.json()["events"]:
+        events[ev["datetime"][:10]] = events.get(ev["datetime"][:10], 0) + 1
+    assert events == summary
+
+
+@pytest.mark.postgresql
+def test_concurrent_refreshes_of_a_day_do_not_conflict(db):
+    p = patient(db)
+    appt = appointment(db, p.id, utc(2025, 3, 1, 10))
+    db.execute(delete(CalendarDaySummary))
+    db.commit()
+    span = calendar_summary.span("appointment", appt)
+
+    first, second = database.SessionLocal(), database.SessionLocal()
+    errors = []
+
+    def refresh_second():
+        try:
+            calendar_summary.refresh(second, span)
+            second.commit()
+        except Exception as e:
+            errors.append(e)
+
+    try:
+        calendar_summary.refresh(first, span)  # row inserted, not yet committed
+        thread = threading.Thread(target=refresh_second)
+        thread.start()
+        time.sleep(0.2)  # second is now waiting on first's row
+        first.commit()
+        thread.join()
+    finally:
+        first.close()
+        second.close()
+
+    assert errors == []
+    assert _stored(db) == {(p.id, date(2025, 3, 1)): (1, 0, 0, 0)}
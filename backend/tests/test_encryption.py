@@ -0,0 +1,53 @@
+import pytest
+from cryptography.fernet import Fernet
+
+import encryption
+import secrets_manager
+
+
+@pytest.fixture
+def reloads(monkeypatch):
+    """Counts secrets file reloads; no periodic reload happens during the test."""
+    calls = []
+    reload_if_changed = secrets_manager.reload_if_changed
+
+    def counting():
+        calls.append(1)
+        return reload_if_changed()
+
+    monkeypatch.setattr(secrets_manager, "reload_if_changed", counting)
+    monkeypatch.setattr(encryption, "_next_key_check", float("inf"))
+    monkeypatch.setattr(encryption, "_next_forced_check", 0.0)
+    encryption._failed.clear()
+    return calls
+
+
+def test_round_trip():
+    token = encryption.encrypt("knee pain")
+    assert token != "knee pain"
+    assert encryption.decrypt(token) == "knee pain"
+    assert encryption.decrypt(token, use_cache=False) == "knee pain"
+
+
+def test_undecryptable_values_force_at_most_one_reload(reloads, monkeypatch):
+    stranger = Fernet(Fernet.generate_key())
+    tokens = [stranger.encrypt(f"value {i}".encode()).decode() for i in range(50)]
+
+    assert encryption.decrypt_many(tokens) == ["[decryption error]"] * 50
+    assert len(reloads) == 1
+
+    # Remembered until the key set changes, even once the interval has passed
+    monkeypatch.setattr(encryption, "_next_forced_check", 0.0)
+    assert encryption.decrypt_many(tokens, use_cache=False) == ["[decryption error]"] * 50
+    assert len(reloads) == 1
+
+
+def test_value_under_a_new_key_decrypts_once_the_key_set_changes(reloads, encryption_keys, monkeypatch):
+    key = Fernet.generate_key()
+    token = Fernet(key).encrypt(b"new key").decode()
+    assert encryption.decrypt(token) == "[decryption error]"
+
+    # Another process starts a rotation; this one picks it up on its next check
+    secrets_manager.add_encryption_key(key.decode())
+    monkeypatch.setattr(encryption, "_next_key_check", 0.0)
+    assert encryption.decrypt(token) == "new key"
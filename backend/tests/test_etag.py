@@ -0,0 +1,45 @@
+from factories import appointment, patient, symptom, utc
+
+
+def test_unchanged_data_answers_304(client, db):
+    p = patient(db)
+    appointment(db, p.id, utc(2025, 3, 1, 10))
+
+    r = client.get("/api/appointments")
+    etag = r.headers["ETag"]
+    assert r.status_code == 200 and etag.startswith('W/"')
+
+    r = client.get("/api/appointments", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["ETag"] == etag
+    assert r.content == b""
+    assert client.get("/api/appointments", headers={"If-None-Match": f'"x", {etag}'}).status_code == 304
+
+
+def test_write_changes_the_etag(client, db):
+    p = patient(db)
+    etag = client.get("/api/appointments").headers["ETag"]
+
+    appointment(db, p.id, utc(2025, 3, 1, 10))
+    r = client.get("/api/appointments", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["ETag"] != etag
+    assert len(r.json()) == 1
+
+
+def test_write_to_another_table_keeps_the_etag(client, db):
+    p = patient(db)
+    etag = client.get("/api/appointments").headers["ETag"]
+    symptoms_etag = client.get("/api/symptoms").headers["ETag"]
+
+    symptom(db, p.id, utc(2025, 3, 1, 10))
+    assert client.get("/api/appointments", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/api/symptoms", headers={"If-None-Match": symptoms_etag}).status_code == 200
+
+
+def test_query_string_is_part_of_the_etag(client, db):
+    patient(db)
+    everyone = client.get("/api/appointments").headers["ETag"]
+    r = client.get("/api/appointments", params={"limit": 1}, headers={"If-None-Match": everyone})
+    assert r.status_code == 200
+    assert r.headers["ETag"] != everyone
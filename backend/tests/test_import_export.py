@@ -0,0 +1,102 @@
+import json
+
+from sqlalchemy import func, select
+
+import crud.medication as med_crud
+from models import CalendarDaySummary, SearchToken
+from schemas.medication import MedicationDoseCreate
+
+from conftest import reset_database
+from factories import appointment, medication, patient, symptom, utc
+
+
+def _import(client, body, content_type="application/x-ndjson", **params):
+    r = client.post("/api/import", content=body, headers={"content-type": content_type}, params=params)
+    assert r.status_code == 200
+    return r.json()
+
+
+def _export(client, **params):
+    r = client.get("/api/export", params=params)
+    assert r.status_code == 200
+    return r.text
+
+
+def _vault(db):
+    alice = patient(db, notes="allergic to penicillin")
+    bob = patient(db, name="Bob", color="#C0392B")
+    appointment(db, alice.id, utc(2025, 3, 1, 10), reason="knee, \"left\"\nfollow-up")
+    symptom(db, bob.id, utc(2025, 3, 2, 9), severity=4, description="headache")
+    med = medication(db, alice.id, utc(2025, 3, 1).date(), utc(2025, 3, 10).date(), notes="with food")
+    med_crud.create_dose(db, med.id, MedicationDoseCreate(taken_at=utc(2025, 3, 2, 8), notes="late"))
+
+
+def _derived(db):
+    return (
+        db.scalar(select(func.count()).select_from(SearchToken)),
+        sorted(tuple(r) for r in db.execute(select(CalendarDaySummary.__table__))),
+    )
+
+
+def test_ndjson_round_trip(client, db):
+    _vault(db)
+    exported = _export(client)
+    derived = _derived(db)
+    assert len(exported.splitlines()) == 6
+
+    db.close()
+    reset_database()
+    report = _import(client, exported)
+    assert report["error_count"] == 0
+    assert report["imported"] == {"patient": 2, "appointment": 1, "symptom": 1, "medication": 1, "dose": 1}
+
+    assert sorted(_export(client).splitlines()) == sorted(exported.splitlines())
+    assert _derived(db) == derived
+
+
+def test_csv_round_trip(client, db):
+    _vault(db)
+    exported = {t: _export(client, format="csv", type=t) for t in ("patient", "appointment")}
+
+    db.close()
+    reset_database()
+    for t, body in exported.items():
+        assert _import(client, body, "text/csv", type=t)["imported"][t] == 1 + (t == "patient")
+
+    for t, body in exported.items():
+        lines = _export(client, format="csv", type=t).splitlines()
+        assert lines[0] == body.splitlines()[0]
+        assert sorted(lines) == sorted(body.splitlines())
+    r = client.get("/api/appointments")
+    assert r.json()[0]["reason"] == "knee, \"left\"\nfollow-up"
+
+
+def test_bad_rows_are_reported_and_skipped(client, db):
+    existing = patient(db)
+    rows = [
+        json.dumps({"type": "patient", "id": "p-1", "name": "Carol"}),
+        "{not json",
+        json.dumps({"type": "prescription", "name": "x"}),
+        json.dumps({"type": "appointment", "patient_id": "p-1", "provider_name": "Dr Martin"}),
+        json.dumps({"type": "appointment", "patient_id": "nobody", "datetime": "2025-03-01T10:00:00Z",
+                    "provider_name": "Dr Martin"}),
+        json.dumps({"type": "patient", "id": existing.id, "name": "Alice again"}),
+        "",
+        json.dumps({"type": "appointment", "patient_id": "p-1", "datetime": "2025-03-01T10:00:00Z",
+                    "provider_name": "Dr Martin"}),
+    ]
+    report = _import(client, "\n".join(rows))
+
+    assert report["imported"]["patient"] == 1
+    assert report["imported"]["appointment"] == 1
+    assert report["error_count"] == 5
+    errors = {e["line"]: e["error"] for e in report["errors"]}
+    assert sorted(errors) == [2, 3, 4, 5, 6]
+    assert errors[2] == "Invalid JSON"
+    assert errors[5] == "Unknown patient_id nobody"
+    assert errors[6] == f"Record {existing.id} already exists"
+
+
+def test_csv_import_requires_a_type(client, db):
+    r = client.post("/api/import", content="name\nAlice\n", headers={"content-type": "text/csv"})
+    assert r.status_code == 400
@@ -0,0 +1,90 @@
+import pytest
+import sqlalchemy as sa
+from cryptography.fernet import Fernet, MultiFernet
+
+import encryption
+import key_rotation
+import secrets_manager
+from models import Patient, RotationCheckpoint
+
+from factories import patient
+
+
+def _raw_notes(db):
+    return dict(db.execute(sa.text("SELECT id, notes FROM patients")).all())
+
+
+def _patients(db, n):
+    return [patient(db, name=f"Patient {i}", notes=f"note {i}") for i in range(n)]
+
+
+def _begin():
+    key_rotation.begin()
+    encryption.refresh_keys(force=True)
+    return Fernet(secrets_manager.get_encryption_key().encode())
+
+
+def test_rotation_re_encrypts_under_the_new_primary(client, db, encryption_keys):
+    patients = _patients(db, 5)
+    primary = _begin()
+
+    key_rotation.run(db, batch_size=2, pause=0, log=lambda _: None)
+
+    for value in _raw_notes(db).values():
+        primary.decrypt(value.encode())
+    assert key_rotation.is_complete(db)
+    assert db.get(RotationCheckpoint, "patients").rows_rotated == 5
+
+    assert key_rotation.retire_old_keys(db) == 1
+    encryption.refresh_keys(force=True)
+    encryption._cache.clear()
+    r = client.get(f"/api/patients/{patients[3].id}")
+    assert r.json()["notes"] == "note 3"
+
+
+def test_interrupted_rotation_resumes_from_its_checkpoint(db, encryption_keys, monkeypatch):
+    _patients(db, 5)
+    _begin()
+    rotate_batch = key_rotation._rotate_batch
+    calls = []
+
+    def failing_second_batch(*args, **kwargs):
+        calls.append(args[1])
+        if len(calls) == 2:
+            raise RuntimeError("killed")
+        return rotate_batch(*args, **kwargs)
+
+    monkeypatch.setattr(key_rotation, "_rotate_batch", failing_second_batch)
+    with pytest.raises(RuntimeError):
+        key_rotation.run(db, batch_size=2, pause=0, log=lambda _: None)
+    db.rollback()
+    cp = db.get(RotationCheckpoint, "patients")
+    assert (cp.rows_rotated, cp.done) == (2, False)
+    assert not key_rotation.is_complete(db)
+    with pytest.raises(RuntimeError):
+        key_rotation.retire_old_keys(db)
+
+    monkeypatch.setattr(key_rotation, "_rotate_batch", rotate_batch)
+    key_rotation.run(db, batch_size=2, pause=0, log=lambda _: None)
+    db.refresh(cp)
+    assert (cp.rows_rotated, cp.done) == (5, True)
+    assert key_rotation.is_complete(db)
+
+
+def test_concurrent_edit_is_not_overwritten(db, encryption_keys, monkeypatch):
+    edited = patient(db, notes="before")
+    _begin()
+    rotate = MultiFernet.rotate
+
+    def rotate_while_the_app_writes(self, token):
+        new = rotate(self, token)
+        # The app saves the record between the job's read and its write
+        db.execute(sa.update(Patient).where(Patient.id == edited.id).values(notes="edited by user"))
+        return new
+
+    monkeypatch.setattr(MultiFernet, "rotate", rotate_while_the_app_writes)
+    key_rotation.run(db, pause=0, log=lambda _: None)
+
+    encryption._cache.clear()
+    db.expire_all()
+    assert db.get(Patient, edited.id).notes == "edited by user"
@@ -0,0 +1,77 @@
+from datetime import date, timedelta
+
+import pagination
+
+from factories import appointment, medication, patient, utc
+
+
+def _pages(client, path, limit, **params):
+    ids, cursor, totals = [], None, set()
+    while True:
+        query = {"limit": limit, **params}
+        if cursor:
+            query["cursor"] = cursor
+        r = client.get(path, params=query)
+        assert r.status_code == 200
+        assert len(r.json()) <= limit
+        ids.extend(item["id"] for item in r.json())
+        totals.add(r.headers.get("X-Total-Count"))
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids, totals
+
+
+def test_pages_cover_the_list_once_in_order_despite_ties(client, db):
+    p = patient(db)
+    # Three appointments share each timestamp, so only the id breaks ties
+    for hour in (9, 10, 11):
+        for _ in range(3):
+            appointment(db, p.id, utc(2025, 3, 1, hour))
+
+    full = [a["id"] for a in client.get("/api/appointments").json()]
+    ids, totals = _pages(client, "/api/appointments", 2)
+    assert ids == full
+    assert len(set(ids)) == 9
+    assert totals == {"9"}
+
+
+def test_date_sorted_lists_page_too(client, db):
+    p = patient(db)
+    for i in range(5):
+        medication(db, p.id, date(2025, 1, 1) + timedelta(days=i % 2))
+    full = [m["id"] for m in client.get("/api/medications").json()]
+    ids, _ = _pages(client, "/api/medications", 2)
+    assert ids == full
+
+
+def test_rows_added_mid_walk_do_not_shift_later_pages(client, db):
+    p = patient(db)
+    for day in range(1, 5):
+        appointment(db, p.id, utc(2025, 3, day, 10))
+    first = client.get("/api/appointments", params={"limit": 2})
+    seen = [a["id"] for a in first.json()]
+
+    # Newer than everything already listed: an OFFSET would repeat a row here
+    appointment(db, p.id, utc(2025, 4, 1, 10))
+    rest = client.get("/api/appointments", params={"limit": 10, "cursor": first.headers["X-Next-Cursor"]})
+    assert len(rest.json()) == 2
+    assert not set(seen) & {a["id"] for a in rest.json()}
+
+
+def test_count_can_be_skipped(client, db):
+    p = patient(db)
+    appointment(db, p.id, utc(2025, 3, 1, 10))
+    r = client.get("/api/appointments", params={"limit": 1, "count": "false"})
+    assert "X-Total-Count" not in r.headers
+    assert "X-Next-Cursor" not in r.headers
+
+
+def test_cursor_round_trip():
+    at = utc(2025, 3, 1, 10, 30)
+    assert pagination.decode_cursor(pagination.encode_cursor(at, "abc"), type(at)) == (at, "abc")
+
+
+def test_invalid_cursor_is_a_400(client, db):
+    for cursor in ("not-a-cursor", pagination.encode_cursor(date(2025, 1, 1), "x")[:-3]):
+        r = client.get("/api/appointments", params={"limit": 2, "cursor": cursor})
+        assert r.status_code == 400
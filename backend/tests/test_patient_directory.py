@@ -0,0 +1,34 @@
+import asyncio
+
+import database
+import patient_directory
+
+from factories import patient
+
+
+async def _concurrent_gets(n=4):
+    sessions = [database.AsyncSessionLocal() for _ in range(n)]
+    try:
+        return await asyncio.gather(*(patient_directory.get(s) for s in sessions))
+    finally:
+        for s in sessions:
+            await s.close()
+
+
+def test_reloads_after_a_write(db):
+    alice = patient(db)
+    [entries] = asyncio.run(_concurrent_gets(1))
+    assert entries[alice.id] == (alice.id, "Alice", "#4A6FA5")
+
+    bob = patient(db, name="Bob", color="#C0392B")
+    [entries] = asyncio.run(_concurrent_gets(1))
+    assert set(entries) == {alice.id, bob.id}
+
+
+def test_concurrent_reloads_from_several_event_loops(db):
+    p = patient(db)
+    for _ in range(3):
+        # Each asyncio.run() is a new event loop, like each TestClient
+        patient_directory.invalidate()
+        results = asyncio.run(_concurrent_gets())
+        assert all(entries[p.id].name == "Alice" for entries in results)
@@ -0,0 +1,36 @@
+import crud.appointment as appt_crud
+import query_profiler
+from pagination import PageParams
+
+from factories import appointment, patient, utc
+
+
+def test_fields_limit_the_response_to_requested_and_required_fields(client, db):
+    p = patient(db)
+    appointment(db, p.id, utc(2025, 3, 1, 10), reason="knee pain", notes="bring scans", location="City hospital")
+
+    r = client.get("/api/appointments", params={"fields": "notes"})
+    assert r.status_code == 200
+    [item] = r.json()
+    assert set(item) == {"id", "patient_id", "datetime", "provider_name", "notes"}
+    assert item["notes"] == "bring scans"
+
+
+def test_unrequested_encrypted_columns_are_not_selected(db):
+    p = patient(db)
+    appointment(db, p.id, utc(2025, 3, 1, 10), reason="knee pain", notes="bring scans")
+
+    fields = ["id", "patient_id", "datetime", "provider_name", "notes"]
+    with query_profiler.profile(strict=True) as prof:
+        page = appt_crud.get_appointments_page(db, PageParams(limit=None, cursor=None, count=False), fields=fields)
+    assert page.items[0].notes == "bring scans"
+    [select_rows] = prof.statements
+    assert "appointments.notes" in select_rows
+    assert "appointments.reason" not in select_rows
+    assert "appointments.location" not in select_rows
+
+
+def test_unknown_fields_are_a_400(client, db):
+    r = client.get("/api/appointments", params={"fields": "notes,password"})
+    assert r.status_code == 400
+    assert "password" in r.json()["detail"]
@@ -0,0 +1,58 @@
+"""
+No hot crud query plans a sequential scan over a large table, on the schema
+the migrations build (not create_all): see benchmarks/explain_plans.py.
+"""
+
+import os
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+import database
+from benchmarks import explain_plans, generator
+
+from conftest import engine
+
+pytestmark = pytest.mark.postgresql
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATIENTS, YEARS = 30, 3
+MIN_ROWS = 1000
+
+
+def _drop_all() -> None:
+    database.Base.metadata.drop_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+
+
+@pytest.fixture(scope="module")
+def plans():
+    _drop_all()
+    config = Config()
+    config.set_main_option("script_location", os.path.join(BACKEND, "alembic"))
+    with engine.begin() as conn:
+        config.attributes["connection"] = conn
+        command.upgrade(config, "head")
+    with Session(engine) as db:
+        generator.seed(db, PATIENTS, YEARS)
+        db.execute(text("ANALYZE"))
+        db.commit()
+    try:
+        yield explain_plans.check(engine, MIN_ROWS)
+    finally:
+        _drop_all()
+
+
+def test_large_tables_are_checked(plans):
+    large = {t for t, rows in plans["table_rows"].items() if rows >= MIN_ROWS}
+    assert {"appointments", "symptom_logs", "medication_doses", "search_tokens"} <= large
+
+
+def test_no_sequential_scans_on_large_tables(plans):
+    assert plans["cases"]
+    failures = {name: case["failures"] for name, case in plans["cases"].items() if case["failures"]}
+    assert failures == {}
@@ -0,0 +1,72 @@
+import logging
+
+import pytest
+
+import crud.appointment as appt_crud
+import crud.calendar as calendar_crud
+import crud.medication as med_crud
+import crud.patient as patient_crud
+import crud.symptom_log as symptom_crud
+import database
+import query_profiler
+from query_profiler import NPlusOneError
+
+from factories import appointment, medication, patient, symptom, utc
+
+# Statements per call, however many rows come back
+LIST_QUERIES = {
+    "get_patients": (patient_crud.get_patients, 1),
+    "get_medications": (med_crud.get_medications, 1),
+    "get_appointments": (appt_crud.get_appointments, 1),
+    "get_symptom_logs": (symptom_crud.get_symptom_logs, 1),
+    "get_events": (lambda db: calendar_crud.get_events(db, utc(2025, 3, 1), utc(2025, 3, 31, 23, 59)), 1),
+}
+
+
+@pytest.fixture
+def family(db):
+    for i in range(3):
+        p = patient(db, name=f"Patient {i}")
+        for day in (1, 2):
+            appointment(db, p.id, utc(2025, 3, day + i, 10))
+            symptom(db, p.id, utc(2025, 3, day + i, 9))
+        medication(db, p.id, utc(2025, 3, 1).date())
+    session = database.SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.mark.parametrize("name", LIST_QUERIES)
+def test_list_queries_run_a_fixed_number_of_statements(family, name):
+    fn, limit = LIST_QUERIES[name]
+    with query_profiler.profile(strict=True) as p:
+        rows = fn(family)
+    assert rows
+    assert p.count <= limit, p.statements
+    assert not p.lazy_loads
+
+
+def test_lazy_load_per_object_raises_under_strict(family):
+    patients = patient_crud.get_patients(family)
+    with pytest.raises(NPlusOneError, match="Patient.appointments"):
+        with query_profiler.profile(strict=True):
+            for p in patients:
+                len(p.appointments)
+
+
+def test_single_lazy_load_is_allowed(family):
+    p = patient_crud.get_patients(family)[0]
+    with query_profiler.profile(strict=True) as prof:
+        assert len(p.appointments) == 2
+    assert prof.lazy_loads == {"Patient.appointments": 1}
+    assert prof.n_plus_one == []
+
+
+def test_lazy_load_per_object_is_logged_outside_strict(family, caplog):
+    meds = med_crud.get_medications(family)
+    with caplog.at_level(logging.WARNING, logger="medvault.sql"):
+        with query_profiler.profile("report") as prof:
+            for m in meds:
+                m.patient.name
+    assert prof.n_plus_one == ["Medication.patient"]
+    assert [r.getMessage() for r in caplog.records] == ["N+1: Medication.patient lazily loaded per object in report"]
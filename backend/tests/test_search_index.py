@@ -0,0 +1,67 @@
+from sqlalchemy import func, select
+
+import search_index
+from models import SearchToken
+
+from factories import appointment, medication, patient, symptom, utc
+
+
+def _search(client, q, **params):
+    r = client.get("/api/search", params={"q": q, **params})
+    assert r.status_code == 200
+    return {(res["type"], res["id"]) for res in r.json()["results"]}
+
+
+def test_finds_substrings_of_encrypted_fields(client, db):
+    p = patient(db)
+    appt = appointment(db, p.id, utc(2025, 3, 1, 10), reason="Follow-up for knee pain")
+    sym = symptom(db, p.id, utc(2025, 3, 2, 9), description="Swollen KNEE after running")
+    med = medication(db, p.id, utc(2025, 3, 1).date(), schedule_notes="with food")
+
+    assert _search(client, "knee") == {("appointment", appt.id), ("symptom", sym.id)}
+    assert _search(client, "FOLLOW-UP") == {("appointment", appt.id)}
+    assert _search(client, "knee", type="symptom") == {("symptom", sym.id)}
+    assert _search(client, "with fo") == {("medication", med.id)}
+    assert _search(client, "ankle") == set()
+
+
+def test_tokens_are_opaque(db):
+    p = patient(db)
+    appointment(db, p.id, utc(2025, 3, 1, 10), reason="knee")
+    tokens = set(db.scalars(select(SearchToken.token)))
+    assert tokens == search_index.tokens_for("Dr Martin", "knee")
+    assert not {"kne", "nee"} & tokens
+
+
+def test_update_and_delete_keep_the_index_current(client, db):
+    p = patient(db)
+    appt = appointment(db, p.id, utc(2025, 3, 1, 10), reason="knee pain")
+
+    r = client.put(f"/api/appointments/{appt.id}", json={"reason": "sore throat"})
+    assert r.status_code == 200
+    assert _search(client, "knee") == set()
+    assert _search(client, "throat") == {("appointment", appt.id)}
+
+    assert client.delete(f"/api/appointments/{appt.id}").status_code == 204
+    assert _search(client, "throat") == set()
+    assert db.scalar(select(func.count()).select_from(SearchToken)) == 0
+
+
+def test_short_queries_scan(client, db):
+    p = patient(db)
+    sym = symptom(db, p.id, utc(2025, 3, 2, 9), description="Ear ache")
+    assert search_index.query_tokens("ea") is None
+    assert _search(client, "ea") == {("symptom", sym.id)}
+
+
+def test_rebuild_restores_a_lost_index(client, db):
+    p = patient(db)
+    appt = appointment(db, p.id, utc(2025, 3, 1, 10), notes="bring vaccination booklet")
+    db.query(SearchToken).delete()
+    db.commit()
+    assert search_index.is_stale(db)
+    assert _search(client, "booklet") == set()
+
+    assert search_index.rebuild(db) == 1
+    assert not search_index.is_stale(db)
+    assert _search(client, "booklet") == {("appointment", appt.id)}
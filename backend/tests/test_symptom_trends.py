@@ -0,0 +1,57 @@
+from datetime import date, timedelta
+
+import pytest
+
+import crud.symptom_trends as trends_crud
+
+from factories import patient, symptom, utc
+
+pytestmark = pytest.mark.postgresql
+
+
+@pytest.fixture
+def alice(db):
+    p = patient(db)
+    for at, severity, hours in [
+        (utc(2025, 3, 3, 9), 1, 4),
+        (utc(2025, 3, 4, 9), 3, 10),
+        (utc(2025, 3, 12, 9), 5, None),
+        (utc(2025, 3, 24, 9), 2, None),  # nothing in the week of the 17th
+    ]:
+        resolved_at = at + timedelta(hours=hours) if hours else None
+        symptom(db, p.id, at, severity=severity, resolved_at=resolved_at)
+    return p
+
+
+def test_weekly_buckets_with_rolling_mean(db, alice):
+    result = trends_crud.get_symptom_trends(db, "week", window=2)
+    assert [
+        (b["start"], b["count"], b["mean_severity"], b["max_severity"], b["rolling_mean_severity"], b["resolved"])
+        for b in result["buckets"]
+    ] == [
+        (date(2025, 3, 3), 2, 2.0, 3, 2.0, 2),
+        (date(2025, 3, 10), 1, 5.0, 5, 3.0, 0),
+        (date(2025, 3, 24), 1, 2.0, 2, 2.0, 0),
+    ]
+    assert result["buckets"][0]["mean_resolution_hours"] == 7.0
+
+    [stats] = result["resolution"]
+    assert (stats["resolved"], stats["unresolved"]) == (2, 2)
+    assert (stats["mean_hours"], stats["median_hours"], stats["p90_hours"]) == (7.0, 7.0, 9.4)
+
+
+def test_cached_until_a_symptom_is_written(db, alice):
+    first = trends_crud.get_symptom_trends(db, "month")
+    assert trends_crud.get_symptom_trends(db, "month") is first
+    assert [b["count"] for b in first["buckets"]] == [4]
+
+    symptom(db, alice.id, utc(2025, 3, 30, 9), severity=4)
+    again = trends_crud.get_symptom_trends(db, "month")
+    assert [(b["count"], b["mean_severity"]) for b in again["buckets"]] == [(5, 3.0)]
+
+
+def test_route_validates_the_bucket(client, alice):
+    r = client.get("/api/symptoms/trends", params={"bucket": "day", "patient_id": alice.id, "from": "2025-03-04T00:00:00Z"})
+    assert r.status_code == 200
+    assert [b["start"] for b in r.json()["buckets"]] == ["2025-03-04", "2025-03-12", "2025-03-24"]
+    assert client.get("/api/symptoms/trends", params={"bucket": "year"}).status_code == 400
@@ -1,8 +1,12 @@
 /**
  * Centralized API client.
  * Injects Authorization header, handles 401 → logout, provides typed helpers.
+ * GET responses that carry an ETag are kept in memory and revalidated with
+ * If-None-Match, so unchanged data comes back as an empty 304.
  */
 const API_BASE = '/api';
+const ETAG_CACHE_MAX = 50;
+const etagCache = new Map();  // path → { etag, data }
 
 function getToken() {
   return localStorage.getItem('medvault_token');
@@ -14,6 +18,7 @@ function setToken(token) {
 
 function clearToken() {
   localStorage.removeItem('medvault_token');
+  etagCache.clear();
 }
 
 async function apiFetch(path, options = {}) {
@@ -21,7 +26,11 @@ async function apiFetch(path, options = {}) {
   const headers = { 'Content-Type': 'application/json', ...(options.headers || {}) };
   if (token) headers['Authorization'] = `Bearer ${token}`;
 
-  const res = await fetch(`${API_BASE}${path}`, { ...options, headers });
+  const isGet = !options.method || options.method === 'GET';
+  const cached = isGet ? etagCache.get(path) : undefined;
+  if (cached) headers['If-None-Match'] = cached.etag;
+
+  const res = await fetch(`${API_BASE}${path}`, { ...options, headers, cache: 'no-store' });
 
   if (res.status === 401) {
     clearToken();
@@ -31,11 +40,25 @@ async function apiFetch(path, options = {}) {
 
   if (res.status === 204) return null;
 
+  if (res.status === 304 && cached) {
+    // Refresh recency so the entry is evicted last
+    etagCache.delete(path);
+    etagCache.set(path, cached);
+    return cached.data;
+  }
+
   const data = await res.json();
   if (!res.ok) {
     const msg = data?.detail || `HTTP ${res.status}`;
     throw new Error(Array.isArray(msg) ? msg.map(e => e.msg).join(', ') : msg);
   }
+
+  const etag = res.headers.get('ETag');
+  if (isGet && etag) {
+    etagCache.delete(path);
+    etagCache.set(path, { etag, data });
+    if (etagCache.size > ETAG_CACHE_MAX) etagCache.delete(etagCache.keys().next().value);
+  }
   return data;
 }
 
@@ -79,6 +102,7 @@ const api = {
 
   // Calendar
   getCalendar: (params) => apiFetch('/calendar?' + new URLSearchParams(params)),
+  getCalendarSummary: (params) => apiFetch('/calendar/summary?' + new URLSearchParams(params)),
 
   // Search
   search: (params) => apiFetch('/search?' + new URLSearchParams(params)),
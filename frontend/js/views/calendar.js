@@ -106,48 +106,66 @@ async function renderCal() {
   container.innerHTML = '<div class="loading"><div class="spinner"></div> Loading…</div>';
 
   try {
-    const { from, to } = getDateRange();
     const title = document.getElementById('cal-title');
     if (title) title.textContent = getRangeLabel();
 
-    const params = {
-      from: from.toISOString(),
-      to: to.toISOString(),
-    };
-    if (CAL_STATE.patientId) params.patient_id = CAL_STATE.patientId;
-
-    const { events } = await api.getCalendar(params);
-
-    // Group events by date key YYYY-MM-DD
-    const byDate = {};
-    for (const ev of events) {
-      const key = ev.datetime.slice(0, 10);
-      if (!byDate[key]) byDate[key] = [];
-      byDate[key].push(ev);
-    }
-
     if (CAL_STATE.view === 'month') {
-      renderMonthView(container, from, to, byDate);
+      // Counts per day and patient only; a day's events load when it is opened
+      const params = { year: CAL_STATE.year, month: CAL_STATE.month + 1 };
+      if (CAL_STATE.patientId) params.patient_id = CAL_STATE.patientId;
+      const { days } = await api.getCalendarSummary(params);
+      const byDay = {};
+      for (const day of days) byDay[day.day] = day;
+      renderMonthView(container, byDay);
     } else {
-      renderWeekView(container, byDate);
+      const { from, to } = getWeekRange();
+      const { events } = await api.getCalendar(eventParams(from.toISOString(), to.toISOString()));
+      renderWeekView(container, groupByDate(events));
     }
   } catch (err) {
     container.innerHTML = `<div class="empty-state"><p>Error loading calendar: ${escapeHtml(err.message)}</p></div>`;
   }
 }
 
-function getDateRange() {
-  if (CAL_STATE.view === 'month') {
-    const from = new Date(CAL_STATE.year, CAL_STATE.month, 1);
-    const to = new Date(CAL_STATE.year, CAL_STATE.month + 1, 0, 23, 59, 59);
-    return { from, to };
-  } else {
-    const from = new Date(CAL_STATE.weekStart);
-    const to = new Date(CAL_STATE.weekStart);
-    to.setDate(to.getDate() + 6);
-    to.setHours(23, 59, 59);
-    return { from, to };
+function eventParams(from, to) {
+  const params = { from, to, compact: 'true' };
+  if (CAL_STATE.patientId) params.patient_id = CAL_STATE.patientId;
+  return params;
+}
+
+// Group events by date key YYYY-MM-DD
+function groupByDate(events) {
+  const byDate = {};
+  for (const ev of expandSpans(events)) {
+    const key = ev.datetime.slice(0, 10);
+    if (!byDate[key]) byDate[key] = [];
+    byDate[key].push(ev);
+  }
+  return byDate;
+}
+
+// Compact medication events span [datetime, end]; expand to one event per day
+function expandSpans(events) {
+  const out = [];
+  for (const ev of events) {
+    if (!ev.end) { out.push(ev); continue; }
+    const cur = new Date(ev.datetime);
+    const last = new Date(ev.end);
+    while (cur <= last) {
+      const key = cur.toISOString().slice(0, 10);
+      out.push({ ...ev, id: `${ev.id}:${key}`, datetime: `${key}T00:00:00Z`, end: null });
+      cur.setUTCDate(cur.getUTCDate() + 1);
+    }
   }
+  return out;
+}
+
+function getWeekRange() {
+  const from = new Date(CAL_STATE.weekStart);
+  const to = new Date(CAL_STATE.weekStart);
+  to.setDate(to.getDate() + 6);
+  to.setHours(23, 59, 59);
+  return { from, to };
 }
 
 function getRangeLabel() {
@@ -163,7 +181,7 @@ function getRangeLabel() {
   }
 }
 
-function renderMonthView(container, from, to, byDate) {
+function renderMonthView(container, byDay) {
   const today = new Date().toISOString().slice(0, 10);
   const DAY_NAMES = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'];
 
@@ -191,9 +209,13 @@ function renderMonthView(container, from, to, byDate) {
     const key = d.toISOString().slice(0, 10);
     const isCurrentMonth = d.getMonth() === CAL_STATE.month;
     const isToday = key === today;
-    const events = byDate[key] || [];
-    const dots = events.slice(0, 8).map(ev => dotHtml(ev)).join('');
-    return `<div class="cal-cell${!isCurrentMonth ? ' cal-cell--other-month' : ''}${isToday ? ' cal-cell--today' : ''}" data-date="${key}">
+    const summary = isCurrentMonth ? byDay[key] : null;
+    const dots = summary ? summaryDots(summary).slice(0, 8).join('') : '';
+    const heatClass = summary?.max_severity ? ` cal-cell--heat-${summary.max_severity}` : '';
+    const heatTitle = summary
+      ? ` title="${countLabel(summary.appointments, 'appointment')}, ${countLabel(summary.symptoms, 'symptom')}${summary.max_severity ? ` (max severity ${summary.max_severity})` : ''}, ${countLabel(summary.medications, 'medication')}"`
+      : '';
+    return `<div class="cal-cell${!isCurrentMonth ? ' cal-cell--other-month' : ''}${isToday ? ' cal-cell--today' : ''}${summary ? ' cal-cell--has-events' : ''}${heatClass}" data-date="${key}"${heatTitle}>
       <span class="cal-date-num">${d.getDate()}</span>
       <div class="cal-dots">${dots}</div>
     </div>`;
@@ -201,12 +223,57 @@ function renderMonthView(container, from, to, byDate) {
 
   container.innerHTML = `<div class="cal-month">${headers}${cellsHtml}</div>`;
 
-  // Dot click → detail modal
-  container.querySelectorAll('.cal-dot[data-event]').forEach(dot => {
-    dot.addEventListener('click', (e) => {
-      e.stopPropagation();
-      const ev = JSON.parse(dot.dataset.event);
-      showEventModal(ev);
+  // Day click → that day's events
+  container.querySelectorAll('.cal-cell--has-events').forEach(cell => {
+    cell.addEventListener('click', () => openDay(cell.dataset.date));
+  });
+}
+
+// One dot per patient and event type, in the patient's color
+function summaryDots(day) {
+  const dots = [];
+  for (const p of day.patients) {
+    for (const [type, count] of [['appointment', p.appointments], ['symptom', p.symptoms], ['medication', p.medications]]) {
+      if (!count) continue;
+      const typeClass = type === 'symptom' ? 'cal-dot--symptom' : type === 'medication' ? 'cal-dot--medication' : '';
+      dots.push(`<span class="cal-dot ${typeClass}" style="--patient-color:${p.patient_color}" title="${escapeHtml(p.patient_name)}: ${countLabel(count, type)}"></span>`);
+    }
+  }
+  return dots;
+}
+
+function countLabel(n, noun) {
+  return `${n} ${noun}${n === 1 ? '' : 's'}`;
+}
+
+async function openDay(key) {
+  try {
+    const { events } = await api.getCalendar(eventParams(`${key}T00:00:00Z`, `${key}T23:59:59Z`));
+    const dayEvents = groupByDate(events)[key] || [];
+    const label = new Date(`${key}T00:00:00Z`)
+      .toLocaleDateString(undefined, { weekday: 'long', month: 'long', day: 'numeric', year: 'numeric', timeZone: 'UTC' });
+    const m = modal.open({
+      title: label,
+      body: `<div class="cal-day-events">${dayEvents.map(eventCardHtml).join('') || '<p>No events.</p>'}</div>`,
+    });
+    bindEventCards(m.el, (ev) => { m.close(); showEventModal(ev); });
+  } catch (err) {
+    toast.error(err.message);
+  }
+}
+
+function eventCardHtml(ev) {
+  return `
+      <div class="cal-event-card" data-event='${JSON.stringify(ev).replace(/'/g, "&#39;")}' style="--patient-color:${ev.patient_color}">
+        <div class="cal-event-card__title">${escapeHtml(ev.title)}</div>
+        <div class="cal-event-card__meta">${escapeHtml(ev.patient_name)}${ev.datetime ? ' · ' + new Date(ev.datetime).toLocaleTimeString(undefined, {hour:'2-digit',minute:'2-digit'}) : ''}</div>
+      </div>`;
+}
+
+function bindEventCards(root, onOpen) {
+  root.querySelectorAll('.cal-event-card').forEach(card => {
+    card.addEventListener('click', () => {
+      onOpen(JSON.parse(card.dataset.event.replace(/&#39;/g, "'")));
     });
   });
 }
@@ -225,11 +292,7 @@ function renderWeekView(container, byDate) {
     const isToday = key === today;
     const events = byDate[key] || [];
     const dayLabel = d.toLocaleDateString(undefined, { weekday: 'short', month: 'short', day: 'numeric' });
-    const cards = events.map(ev => `
-      <div class="cal-event-card" data-event='${JSON.stringify(ev).replace(/'/g, "&#39;")}' style="--patient-color:${ev.patient_color}">
-        <div class="cal-event-card__title">${escapeHtml(ev.title)}</div>
-        <div class="cal-event-card__meta">${escapeHtml(ev.patient_name)}${ev.datetime ? ' · ' + new Date(ev.datetime).toLocaleTimeString(undefined, {hour:'2-digit',minute:'2-digit'}) : ''}</div>
-      </div>`).join('');
+    const cards = events.map(eventCardHtml).join('');
 
     return `<div class="cal-week-col">
       <div class="cal-week-header${isToday ? ' today' : ''}">${dayLabel}</div>
@@ -239,18 +302,7 @@ function renderWeekView(container, byDate) {
 
   container.innerHTML = `<div class="cal-week">${cols}</div>`;
 
-  container.querySelectorAll('.cal-event-card').forEach(card => {
-    card.addEventListener('click', () => {
-      const ev = JSON.parse(card.dataset.event.replace(/&#39;/g, "'"));
-      showEventModal(ev);
-    });
-  });
-}
-
-function dotHtml(ev) {
-  const typeClass = ev.type === 'symptom' ? 'cal-dot--symptom' : ev.type === 'medication' ? 'cal-dot--medication' : '';
-  const safe = JSON.stringify(ev).replace(/"/g, '&quot;');
-  return `<span class="cal-dot ${typeClass}" style="--patient-color:${ev.patient_color}" data-event="${safe}" title="${escapeHtml(ev.title)}"></span>`;
+  bindEventCards(container, showEventModal);
 }
 
 function showEventModal(ev) {
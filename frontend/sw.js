@@ -1,29 +1,9 @@
-const CACHE = 'medvault-v1';
-
-const APP_SHELL = [
-  '/',
-  '/manifest.json',
-  '/css/variables.css',
-  '/css/base.css',
-  '/css/components.css',
-  '/css/calendar.css',
-  '/js/components/toast.js',
-  '/js/components/modal.js',
-  '/js/components/patientBadge.js',
-  '/js/api.js',
-  '/js/views/setup.js',
-  '/js/views/login.js',
-  '/js/views/calendar.js',
-  '/js/views/patients.js',
-  '/js/views/appointments.js',
-  '/js/views/symptoms.js',
-  '/js/views/medications.js',
-  '/js/views/search.js',
-  '/js/app.js',
-  '/assets/favicon.svg',
-  '/assets/icon-192.png',
-  '/assets/icon-512.png',
-];
+// Both lines are rewritten when sw.js is served (backend/static_assets.py): the
+// version is a hash of the asset manifest and the shell lists content-hashed
+// URLs, so any frontend change installs a fresh cache.
+const ASSET_VERSION = 'dev';
+const APP_SHELL = ['/', '/manifest.json'];
+const CACHE = `medvault-${ASSET_VERSION}`;
 
 self.addEventListener('install', (event) => {
   event.waitUntil(